@@ -1,48 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.deps.auth import get_current_user
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List
+from app.deps.auth import Principal, get_current_principal
 from app.core.database import get_db
 from app.services.meal_plan_service import MealPlanService
 from app.schemas.meal_plan import (
-    MealPlan, MealPlanCreate, MealPlanUpdate,
-    PlannedMeal, PlannedMealCreate, PlannedMealUpdate,
-    ShoppingList, NutritionSummary
+    MealPlan, MealPlanCreate, MealPlanUpdate, MealPlanFromTemplate, MealPlanTemplate,
+    PlannedMeal, PlannedMealCreate, PlannedMealBulkCreate, PlannedMealUpdate, WeekCopy,
+    ShoppingList, NutritionSummary, CalendarDay
 )
-from app.schemas.user import User
 
 router = APIRouter()
 
 @router.post("/meal-plans", response_model=MealPlan, status_code=status.HTTP_201_CREATED)
 async def create_meal_plan(
     meal_plan_data: MealPlanCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new meal plan"""
     service = MealPlanService(db)
-    return service.create_meal_plan(meal_plan_data, current_user.id)
+    return await service.create_meal_plan(meal_plan_data, current_user.id)
 
 @router.get("/meal-plans", response_model=List[MealPlan])
 async def get_meal_plans(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    include_recipes: bool = False,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all meal plans for the current user"""
+    """Get all meal plans for the current user; ``include_recipes`` adds a recipe summary to each planned meal"""
     service = MealPlanService(db)
-    return service.get_meal_plans(current_user.id, skip, limit)
+    return await service.get_meal_plans(current_user.id, skip, limit, include_recipes)
+
+@router.get("/meal-plans/calendar", response_model=List[CalendarDay])
+async def get_meal_calendar(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Planned meals between two dates across all of the user's meal plans, grouped by day"""
+    service = MealPlanService(db)
+    days = service.calendar(current_user.id, start, end)
+
+    async def body() -> AsyncIterator[str]:
+        # A JSON array written one day at a time, so long ranges are never held in memory
+        separator = "["
+        async for day in days:
+            yield separator + day.model_dump_json()
+            separator = ","
+        yield "]" if separator == "," else "[]"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+@router.get("/meal-plans/templates", response_model=List[MealPlanTemplate])
+async def get_meal_plan_templates(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the meal plan templates"""
+    service = MealPlanService(db)
+    return service.get_templates()
+
+@router.post("/meal-plans/from-template", response_model=MealPlan, status_code=status.HTTP_201_CREATED)
+async def create_meal_plan_from_template(
+    template_data: MealPlanFromTemplate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a meal plan with all of a template's meals in one request"""
+    service = MealPlanService(db)
+    return await service.create_from_template(template_data, current_user.id)
 
 @router.get("/meal-plans/{meal_plan_id}", response_model=MealPlan)
 async def get_meal_plan(
     meal_plan_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    include_recipes: bool = False,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific meal plan"""
+    """Get a specific meal plan; ``include_recipes`` adds a recipe summary to each planned meal"""
     service = MealPlanService(db)
-    meal_plan = service.get_meal_plan(meal_plan_id, current_user.id)
+    meal_plan = await service.get_meal_plan(meal_plan_id, current_user.id, include_recipes)
     
     if not meal_plan:
         raise HTTPException(
@@ -56,12 +99,12 @@ async def get_meal_plan(
 async def update_meal_plan(
     meal_plan_id: int,
     update_data: MealPlanUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a meal plan"""
     service = MealPlanService(db)
-    meal_plan = service.update_meal_plan(meal_plan_id, current_user.id, update_data)
+    meal_plan = await service.update_meal_plan(meal_plan_id, current_user.id, update_data)
     
     if not meal_plan:
         raise HTTPException(
@@ -74,12 +117,12 @@ async def update_meal_plan(
 @router.delete("/meal-plans/{meal_plan_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_meal_plan(
     meal_plan_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a meal plan"""
     service = MealPlanService(db)
-    success = service.delete_meal_plan(meal_plan_id, current_user.id)
+    success = await service.delete_meal_plan(meal_plan_id, current_user.id)
     
     if not success:
         raise HTTPException(
@@ -91,12 +134,12 @@ async def delete_meal_plan(
 async def add_planned_meal(
     meal_plan_id: int,
     planned_meal_data: PlannedMealCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Add a meal to a meal plan"""
     service = MealPlanService(db)
-    planned_meal = service.add_planned_meal(meal_plan_id, current_user.id, planned_meal_data)
+    planned_meal = await service.add_planned_meal(meal_plan_id, current_user.id, planned_meal_data)
     
     if not planned_meal:
         raise HTTPException(
@@ -106,26 +149,65 @@ async def add_planned_meal(
     
     return planned_meal
 
+@router.post("/meal-plans/{meal_plan_id}/meals/bulk", response_model=List[PlannedMeal], status_code=status.HTTP_201_CREATED)
+async def add_planned_meals(
+    meal_plan_id: int,
+    bulk_data: PlannedMealBulkCreate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Add many meals to a meal plan in one transaction"""
+    service = MealPlanService(db)
+    planned_meals = await service.add_planned_meals(meal_plan_id, current_user.id, bulk_data.meals)
+    
+    if planned_meals is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Meal plan not found"
+        )
+    
+    return planned_meals
+
+@router.post("/meal-plans/{meal_plan_id}/copy-week", response_model=List[PlannedMeal], status_code=status.HTTP_201_CREATED)
+async def copy_week(
+    meal_plan_id: int,
+    copy_data: WeekCopy,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Copy one week of a meal plan into another (by default the following) week"""
+    service = MealPlanService(db)
+    planned_meals = await service.copy_week(meal_plan_id, current_user.id, copy_data)
+    
+    if planned_meals is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Meal plan not found"
+        )
+    
+    return planned_meals
+
 @router.get("/meal-plans/{meal_plan_id}/meals", response_model=List[PlannedMeal])
 async def get_planned_meals(
     meal_plan_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    include_recipes: bool = False,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all planned meals for a meal plan"""
     service = MealPlanService(db)
-    return service.get_planned_meals(meal_plan_id, current_user.id)
+    return await service.get_planned_meals(meal_plan_id, current_user.id, include_recipes)
 
 @router.put("/planned-meals/{planned_meal_id}", response_model=PlannedMeal)
 async def update_planned_meal(
     planned_meal_id: int,
     update_data: PlannedMealUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a planned meal"""
     service = MealPlanService(db)
-    planned_meal = service.update_planned_meal(planned_meal_id, current_user.id, update_data)
+    planned_meal = await service.update_planned_meal(planned_meal_id, current_user.id, update_data)
     
     if not planned_meal:
         raise HTTPException(
@@ -138,12 +220,12 @@ async def update_planned_meal(
 @router.delete("/planned-meals/{planned_meal_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_planned_meal(
     planned_meal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a planned meal"""
     service = MealPlanService(db)
-    success = service.delete_planned_meal(planned_meal_id, current_user.id)
+    success = await service.delete_planned_meal(planned_meal_id, current_user.id)
     
     if not success:
         raise HTTPException(
@@ -154,12 +236,12 @@ async def delete_planned_meal(
 @router.post("/meal-plans/{meal_plan_id}/shopping-list", response_model=ShoppingList, status_code=status.HTTP_201_CREATED)
 async def generate_shopping_list(
     meal_plan_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Generate shopping list from meal plan"""
     service = MealPlanService(db)
-    shopping_list = service.generate_shopping_list(meal_plan_id, current_user.id)
+    shopping_list = await service.generate_shopping_list(meal_plan_id, current_user.id)
     
     if not shopping_list:
         raise HTTPException(
@@ -172,12 +254,12 @@ async def generate_shopping_list(
 @router.get("/meal-plans/{meal_plan_id}/shopping-list", response_model=ShoppingList)
 async def get_shopping_list(
     meal_plan_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get shopping list for a meal plan"""
     service = MealPlanService(db)
-    shopping_list = service.get_shopping_list(meal_plan_id, current_user.id)
+    shopping_list = await service.get_shopping_list(meal_plan_id, current_user.id)
     
     if not shopping_list:
         raise HTTPException(
@@ -191,12 +273,12 @@ async def get_shopping_list(
 async def toggle_shopping_item(
     item_id: int,
     is_purchased: bool,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark shopping list item as purchased/unpurchased"""
     service = MealPlanService(db)
-    item = service.update_shopping_item(item_id, current_user.id, is_purchased)
+    item = await service.update_shopping_item(item_id, current_user.id, is_purchased)
     
     if not item:
         raise HTTPException(
@@ -209,12 +291,12 @@ async def toggle_shopping_item(
 @router.get("/meal-plans/{meal_plan_id}/nutrition", response_model=NutritionSummary)
 async def get_nutrition_summary(
     meal_plan_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get nutrition summary for a meal plan"""
     service = MealPlanService(db)
-    nutrition = service.get_nutrition_summary(meal_plan_id, current_user.id)
+    nutrition = await service.get_nutrition_summary(meal_plan_id, current_user.id)
     
     if not nutrition:
         raise HTTPException(
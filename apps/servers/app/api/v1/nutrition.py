@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.deps.auth import Principal, get_current_principal
+from app.core.database import get_db
+from app.services.nutrition_service import NutritionService
+from app.schemas.nutrition import NutritionBatch, NutritionBatchRequest
+
+router = APIRouter()
+
+@router.post("/nutrition/batch", response_model=NutritionBatch)
+async def nutrition_batch(
+    request: NutritionBatchRequest,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Nutrition summaries for many recipes and meal plans in one call"""
+    recipes, meal_plans = await NutritionService(db).batch(
+        request.recipe_ids, request.meal_plan_ids, current_user.id
+    )
+    return NutritionBatch(
+        recipes=recipes,
+        meal_plans=meal_plans,
+        missing_recipe_ids=sorted(set(request.recipe_ids) - set(recipes)),
+        missing_meal_plan_ids=sorted(set(request.meal_plan_ids) - set(meal_plans)),
+    )
@@ -1,3 +1,91 @@
-from fastapi import APIRouter
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.deps.auth import Principal, get_current_principal
+from app.schemas.rating import Rating, RatingCreate, RatingSummary
+from app.services.rating_service import RatingService
 
 router = APIRouter()
+
+@router.get("/recipes/{recipe_id}/ratings", response_model=List[Rating])
+async def get_ratings(
+    recipe_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a recipe's ratings, newest first"""
+    service = RatingService(db)
+    return await service.get_ratings(recipe_id, skip, limit)
+
+@router.get("/recipes/{recipe_id}/ratings/summary", response_model=RatingSummary)
+async def get_rating_summary(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the number of ratings and the average rating of a recipe"""
+    service = RatingService(db)
+    summary = await service.get_summary(recipe_id)
+
+    if not summary:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found"
+        )
+
+    return summary
+
+@router.get("/recipes/{recipe_id}/rating", response_model=Rating)
+async def get_my_rating(
+    recipe_id: int,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the current user's rating of a recipe"""
+    service = RatingService(db)
+    rating = await service.get_rating(recipe_id, current_user.id)
+
+    if not rating:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rating not found"
+        )
+
+    return rating
+
+@router.put("/recipes/{recipe_id}/rating", response_model=Rating)
+async def rate_recipe(
+    recipe_id: int,
+    rating_data: RatingCreate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Rate a recipe, replacing the current user's earlier rating"""
+    service = RatingService(db)
+    rating = await service.rate_recipe(recipe_id, current_user.id, rating_data.rating)
+
+    if not rating:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found"
+        )
+
+    return rating
+
+@router.delete("/recipes/{recipe_id}/rating", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_rating(
+    recipe_id: int,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Remove the current user's rating of a recipe"""
+    service = RatingService(db)
+    success = await service.delete_rating(recipe_id, current_user.id)
+
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rating not found"
+        )
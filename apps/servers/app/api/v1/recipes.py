@@ -1,8 +1,127 @@
-from fastapi import APIRouter
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.deps.auth import Principal, get_current_principal
+from app.deps.pagination import CursorParams, cursor_params
+from app.schemas.recipe import (
+    Recipe, RecipeCreate, RecipeUpdate, RecipePage, RecipeSearchResults, RecipeIngredientMatch, TopRecipePage
+)
+from app.services.recipe_service import RecipeService
+from app.services.search_service import RecipeSearchIndex
 
 router = APIRouter()
 
-@router.get("/")
-async def get_recipes():
-    return [{"id": 1, "name": "Pasta"}, {"id": 2, "name": "Pizza"}]
-#  just a minimal setup will update the rest later
\ No newline at end of file
+@router.get("/recipes", response_model=RecipePage)
+async def get_recipes(
+    page: CursorParams = Depends(cursor_params),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,name,image_url"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List recipes newest first using keyset pagination"""
+    service = RecipeService(db)
+    selected = service.resolve_fields(fields)
+    items, next_cursor = await service.list_recipes(page, selected)
+    return RecipePage(items=items, next_cursor=next_cursor, limit=page.limit)
+
+@router.post("/recipes", response_model=Recipe, status_code=status.HTTP_201_CREATED)
+async def create_recipe(
+    recipe_data: RecipeCreate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a new recipe"""
+    service = RecipeService(db)
+    return await service.create_recipe(recipe_data, current_user.id)
+
+@router.get("/recipes/search", response_model=RecipeSearchResults)
+async def search_recipes(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text; every term is prefix-matched"),
+    cuisine: Optional[str] = Query(None),
+    difficulty: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text recipe search ranked by relevance, with facet counts"""
+    index = RecipeSearchIndex(db)
+    return await index.search(
+        q, min(limit, settings.MAX_PAGE_SIZE),
+        cuisine=cuisine, difficulty=difficulty, tag=tag
+    )
+
+@router.get("/recipes/by-ingredients", response_model=List[RecipeIngredientMatch])
+async def recipes_by_ingredients(
+    have: List[str] = Query(..., min_length=1, max_length=50, description="Ingredients on hand, e.g. have=eggs&have=flour"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """Recipes that can be cooked with the ingredients on hand, fewest missing first"""
+    service = RecipeService(db)
+    return await service.find_by_ingredients(have, min(limit, settings.MAX_PAGE_SIZE))
+
+@router.get("/recipes/top", response_model=TopRecipePage)
+async def top_recipes(
+    cuisine: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None),
+    page: CursorParams = Depends(cursor_params),
+    db: AsyncSession = Depends(get_db)
+):
+    """Best rated recipes first, ranked by a damped mean so a few ratings don't top the list"""
+    service = RecipeService(db)
+    items, next_cursor = await service.top_recipes(page, cuisine, tag)
+    return TopRecipePage(items=items, next_cursor=next_cursor, limit=page.limit)
+
+@router.get("/recipes/{recipe_id}", response_model=Recipe)
+async def get_recipe(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a specific recipe"""
+    service = RecipeService(db)
+    recipe = await service.get_recipe(recipe_id)
+
+    if not recipe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found"
+        )
+
+    return recipe
+
+@router.put("/recipes/{recipe_id}", response_model=Recipe)
+async def update_recipe(
+    recipe_id: int,
+    update_data: RecipeUpdate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update a recipe"""
+    service = RecipeService(db)
+    recipe = await service.update_recipe(recipe_id, current_user.id, update_data)
+
+    if not recipe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found"
+        )
+
+    return recipe
+
+@router.delete("/recipes/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_recipe(
+    recipe_id: int,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a recipe"""
+    service = RecipeService(db)
+    success = await service.delete_recipe(recipe_id, current_user.id)
+
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found"
+        )
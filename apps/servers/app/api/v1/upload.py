@@ -1 +0,0 @@
-print('upload')
\ No newline at end of file
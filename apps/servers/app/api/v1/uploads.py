@@ -1,3 +1,47 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.deps.auth import Principal, get_current_principal
+from app.schemas.upload import ImageUpload
+from app.services.image_service import ImageService
 
 router = APIRouter()
+
+
+@router.post("/uploads/images", response_model=ImageUpload, status_code=status.HTTP_201_CREATED)
+async def upload_image(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Upload an image as the raw request body (e.g. ``Content-Type: image/png``).
+    The body is streamed to disk, so oversized uploads are refused with 413
+    as soon as they pass MAX_FILE_SIZE. An image that was uploaded before is
+    not stored again: its existing record comes back with 200. Variants are
+    rendered in the background; poll GET /uploads/images/{sha256} until
+    ``status`` is "ready".
+    """
+    declared = request.headers.get("content-length")
+    image, created = await ImageService(db).store_upload(
+        request.stream(), int(declared) if declared and declared.isdigit() else None, current_user.id
+    )
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return ImageService.to_schema(image)
+
+
+@router.get("/uploads/images/{sha256}", response_model=ImageUpload)
+async def get_image(sha256: str, db: AsyncSession = Depends(get_db)):
+    """
+    Get an uploaded image's details and the URLs of its variants
+    """
+    image = await ImageService(db).get_image(sha256)
+    if not image:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    return ImageService.to_schema(image)
@@ -1,16 +1,23 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.revocation import deny_list
 from app.deps.auth import (
+    Principal,
+    check_not_revoked,
+    get_current_principal,
+    get_token_claims,
+    token_claims,
     get_current_user, 
     get_current_active_user, 
     require_superuser,
     get_optional_current_user
 )
+from app.deps.pagination import CursorParams, cursor_params
 from app.models.user import User
 from app.schemas.user import (
     UserCreate, 
@@ -19,7 +26,10 @@ from app.schemas.user import (
     UserLogin, 
     UserPasswordUpdate,
     UserProfile,
-    Token
+    UserSearchPage,
+    Token,
+    TokenRefresh,
+    Logout
 )
 from app.services.user_service import UserService
 from app.services.auth_service import AuthService
@@ -28,26 +38,28 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_create: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register a new user
     """
-    return UserService.create_user(db, user_create)
+    return await UserService.create_user(db, user_create)
 
 
 @router.post("/login", response_model=Token)
-def login_user(
+async def login_user(
     user_login: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Login user and return access token
     """
     # Get user by username or email
-    user = UserService.get_user_by_username_or_email(db, user_login.username_or_email)
+    user = await UserService.get_user_by_username_or_email(db, user_login.username_or_email)
+    # End the read transaction so the password hash doesn't hold a snapshot
+    await db.commit()
     
     if not user:
         raise HTTPException(
@@ -56,7 +68,7 @@ def login_user(
         )
     
     # Verify password
-    if not AuthService.verify_password(user_login.password, user.password_hash):
+    if not await AuthService.verify_password_async(user_login.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username/email or password"
@@ -70,9 +82,13 @@ def login_user(
         )
     
     # Update last login
-    UserService.update_last_login(db, user)
+    await UserService.update_last_login(db, user)
     
-    # Create access token
+    return _issue_tokens(user)
+
+
+def _issue_tokens(user: User) -> Token:
+    """A fresh access and refresh token pair for a user"""
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = AuthService.create_access_token(
         data={"sub": str(user.id)},
@@ -83,159 +99,206 @@ def login_user(
         access_token=access_token,
         token_type="bearer",
         expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=AuthService.create_refresh_token(user.id),
         user=UserResponse.from_orm(user)
     )
 
 
+@router.post("/refresh", response_model=Token)
+async def refresh_token(
+    token_refresh: TokenRefresh,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Exchange a refresh token for a new token pair. The refresh token is
+    single use: it is revoked here, so a replayed one is refused.
+    """
+    claims = token_claims(token_refresh.refresh_token, token_type="refresh")
+    user = await UserService.get_user_by_id(db, int(claims["sub"]))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    check_not_revoked(await UserService.get_principal(db, user.id), claims)
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is inactive"
+        )
+    
+    # Of two concurrent refreshes with the same token only one revokes it
+    if not await deny_list.revoke(db, claims):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    return _issue_tokens(user)
+
+
+@router.post("/logout", response_model=dict)
+async def logout_user(
+    logout: Logout,
+    claims: dict = Depends(get_token_claims),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Revoke the access token of this request, and the refresh token if given
+    """
+    refresh_claims = None
+    if logout.refresh_token:
+        refresh_claims = token_claims(logout.refresh_token, token_type="refresh")
+        if int(refresh_claims["sub"]) != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Refresh token belongs to another user"
+            )
+    # Each in its own transaction: an already revoked refresh token must not
+    # undo the access token's revocation
+    await deny_list.revoke(db, claims)
+    if refresh_claims:
+        await deny_list.revoke(db, refresh_claims)
+    return {"message": "Logged out successfully"}
+
+
 @router.get("/me", response_model=UserProfile)
-def get_current_user_profile(
+async def get_current_user_profile(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get current user's profile with extended information
     """
-    # Get user statistics (recipe count, ratings, etc.)
-    # This would be implemented when recipe and rating models are available
-    profile_data = UserProfile.from_orm(current_user)
-    profile_data.recipe_count = 0  # TODO: Count user's recipes
-    profile_data.total_ratings = 0  # TODO: Count user's ratings
-    profile_data.average_rating = 0.0  # TODO: Calculate average rating
-    
-    return profile_data
+    return UserService.build_profile(current_user)
 
 
 @router.put("/me", response_model=UserResponse)
-def update_current_user(
+async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update current user's profile information
     """
-    return UserService.update_user(db, current_user, user_update)
+    return await UserService.update_user(db, current_user, user_update)
 
 
 @router.put("/me/password", response_model=dict)
-def update_current_user_password(
+async def update_current_user_password(
     password_update: UserPasswordUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update current user's password
     """
-    UserService.update_password(db, current_user, password_update)
+    await UserService.update_password(db, current_user, password_update)
     return {"message": "Password updated successfully"}
 
 
 @router.delete("/me", response_model=dict)
-def deactivate_current_user(
+async def deactivate_current_user(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Deactivate current user's account
     """
-    UserService.deactivate_user(db, current_user)
+    await UserService.deactivate_user(db, current_user)
     return {"message": "Account deactivated successfully"}
 
 
 @router.get("/users", response_model=List[UserResponse])
-def get_users(
+async def get_users(
     skip: int = Query(0, ge=0, description="Number of users to skip"),
     limit: int = Query(100, ge=1, le=100, description="Number of users to return"),
     search: Optional[str] = Query(None, description="Search users by username, email, or name"),
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[Principal] = Depends(get_optional_current_user)
 ):
     """
     Get list of users (public endpoint with optional authentication)
     """
     if search:
-        users = UserService.search_users(db, search, skip, limit)
+        users = await UserService.search_users(db, search, skip, limit)
     else:
-        users = UserService.get_users(db, skip, limit)
+        users = await UserService.get_users(db, skip, limit)
     
     return [UserResponse.from_orm(user) for user in users]
 
 
+@router.get("/users/search", response_model=UserSearchPage)
+async def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Substring of a username, email or name"),
+    page: CursorParams = Depends(cursor_params),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search active users, best match first, with keyset pagination
+    """
+    users, next_cursor = await UserService.search_users_page(db, q, page.limit, page.cursor)
+    return UserSearchPage(
+        items=[UserResponse.from_orm(user) for user in users],
+        next_cursor=next_cursor,
+        limit=page.limit
+    )
+
+
 @router.get("/users/{user_id}", response_model=UserProfile)
-def get_user_by_id(
+async def get_user_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[Principal] = Depends(get_optional_current_user)
 ):
     """
     Get user profile by ID (public endpoint)
     """
-    user = UserService.get_user_by_id(db, user_id)
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    profile = await UserService.get_public_profile(db, user_id=user_id)
     
-    if not user.is_active:
+    # Unknown and inactive users look the same
+    if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Get user statistics
-    profile_data = UserProfile.from_orm(user)
-    profile_data.recipe_count = 0  # TODO: Count user's recipes
-    profile_data.total_ratings = 0  # TODO: Count user's ratings
-    profile_data.average_rating = 0.0  # TODO: Calculate average rating
-    
-    return profile_data
+    return profile
 
 
 @router.get("/users/username/{username}", response_model=UserProfile)
-def get_user_by_username(
+async def get_user_by_username(
     username: str,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[Principal] = Depends(get_optional_current_user)
 ):
     """
     Get user profile by username (public endpoint)
     """
-    user = UserService.get_user_by_username(db, username)
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    profile = await UserService.get_public_profile(db, username=username)
     
-    if not user.is_active:
+    # Unknown and inactive users look the same
+    if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Get user statistics
-    profile_data = UserProfile.from_orm(user)
-    profile_data.recipe_count = 0  # TODO: Count user's recipes
-    profile_data.total_ratings = 0  # TODO: Count user's ratings
-    profile_data.average_rating = 0.0  # TODO: Calculate average rating
-    
-    return profile_data
+    return profile
 
 
 # Admin endpoints (require superuser permissions)
 @router.put("/admin/users/{user_id}/activate", response_model=UserResponse)
-def activate_user(
+async def activate_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_superuser)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_superuser)
 ):
     """
     Activate a user account (admin only)
     """
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -243,19 +306,19 @@ def activate_user(
             detail="User not found"
         )
     
-    return UserService.activate_user(db, user)
+    return await UserService.activate_user(db, user)
 
 
 @router.put("/admin/users/{user_id}/deactivate", response_model=UserResponse)
-def deactivate_user(
+async def deactivate_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_superuser)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_superuser)
 ):
     """
     Deactivate a user account (admin only)
     """
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -263,19 +326,19 @@ def deactivate_user(
             detail="User not found"
         )
     
-    return UserService.deactivate_user(db, user)
+    return await UserService.deactivate_user(db, user)
 
 
 @router.put("/admin/users/{user_id}/verify", response_model=UserResponse)
-def verify_user(
+async def verify_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_superuser)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_superuser)
 ):
     """
     Verify a user account (admin only)
     """
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -283,19 +346,19 @@ def verify_user(
             detail="User not found"
         )
     
-    return UserService.verify_user(db, user)
+    return await UserService.verify_user(db, user)
 
 
 @router.delete("/admin/users/{user_id}", response_model=dict)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_superuser)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_superuser)
 ):
     """
     Permanently delete a user account (admin only)
     """
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -303,5 +366,5 @@ def delete_user(
             detail="User not found"
         )
     
-    UserService.delete_user(db, user)
+    await UserService.delete_user(db, user)
     return {"message": f"User {user.username} deleted successfully"}
@@ -8,26 +8,96 @@ class Settings(BaseSettings):
     """
     # Database
     DATABASE_URL: str = "sqlite:///./recipe_hub.db"
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds
+
+    # SQLite connection pragmas (ignored for other databases)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB, i.e. ~64MB
+    SQLITE_BUSY_TIMEOUT: int = 5000  # milliseconds
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    # How often each worker picks up tokens revoked by the others
+    TOKEN_DENYLIST_SYNC_INTERVAL: float = 5.0  # seconds
     
     # CORS
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
     
     # File uploads
-    UPLOAD_DIR: str = "uploads"
+    UPLOAD_DIR: str = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "uploads"))
+    # Uploads in progress; kept out of UPLOAD_DIR so partial files are never
+    # served, but should share its filesystem so finished ones move in by rename
+    UPLOAD_TMP_DIR: str = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "uploads-tmp"))
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
     ALLOWED_EXTENSIONS: List[str] = [".jpg", ".jpeg", ".png", ".gif"]
+    # Uploaded files are served from here
+    MEDIA_URL: str = "/media"
+    # Every upload is also rendered at these widths (capped at its own) in
+    # each format, on a pool of IMAGE_WORKERS processes
+    IMAGE_VARIANT_WIDTHS: List[int] = [160, 480, 1024]
+    IMAGE_VARIANT_FORMATS: List[str] = ["webp", "jpeg"]
+    IMAGE_QUALITY: int = 82
+    IMAGE_WORKERS: int = 2
+    # An image still "processing" after this many seconds is rendered again
+    # when the same bytes are uploaded
+    IMAGE_RENDER_TIMEOUT: float = 300.0
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
+
+    # Top recipes rank by a damped mean, as if every recipe started with
+    # RATING_PRIOR_WEIGHT ratings of RATING_PRIOR_MEAN. Scores are stored on
+    # each rating write, so changing these only affects recipes rated afterwards.
+    RATING_PRIOR_MEAN: float = 3.0
+    RATING_PRIOR_WEIGHT: int = 5
+
+    # Public profiles are served from a per-process cache for this long
+    PROFILE_CACHE_TTL: float = 30.0  # seconds; 0 disables the cache
+    PROFILE_CACHE_SIZE: int = 10_000
+    # Authenticated requests take the user's id and account flags from a
+    # per-process cache; account changes in another process show up after the TTL
+    PRINCIPAL_CACHE_TTL: float = 60.0  # seconds; 0 disables the cache
+    PRINCIPAL_CACHE_SIZE: int = 50_000
+
+    # Password hashing (argon2id). Every hash records its own parameters, so
+    # changes apply to new hashes while existing ones keep verifying.
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB per hash in flight
+    ARGON2_PARALLELISM: int = 4
+    # Hashes run on this many threads; once PASSWORD_HASH_MAX_PENDING are
+    # queued or running, further sign-ins get 503 with Retry-After
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    PASSWORD_HASH_RETRY_AFTER: int = 1  # seconds
+
+    # Touch-style column writes (last_login) are buffered and flushed in
+    # batches this often, or sooner once this many rows are pending
+    TOUCH_FLUSH_INTERVAL: float = 5.0  # seconds
+    TOUCH_FLUSH_MAX_ENTRIES: int = 1000
+
+    # Nutrition: per-ingredient nutrient table (data/nutrition/nutrition_data.json)
+    NUTRITION_DATA_PATH: str = os.path.normpath(os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "..", "data", "nutrition", "nutrition_data.json"
+    ))
+    # Meal plan templates instantiated by POST /meal-plans/from-template
+    MEAL_PLAN_TEMPLATES_PATH: str = os.path.normpath(os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "..", "data", "meal_plans", "weekly_plans.json"
+    ))
     
     class Config:
         env_file = ".env"
         case_sensitive = True
+        extra = "ignore"
 
 settings = Settings()
@@ -1,13 +1,116 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from typing import Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-DATABASE_URL = "sqlite+aiosqlite:///./recipehub.db"
+from app.core.config import settings
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,       
-    future=True
-)
+# Sync driver URLs in settings are upgraded to their asyncio counterparts
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+# INSERT constructs supporting ON CONFLICT, by dialect name
+UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def driver_insert(dialect, table: str, columns: Sequence[str]) -> str:
+    """INSERT statement in the DBAPI's own paramstyle, for cursor.executemany"""
+    style = dialect.paramstyle
+    if style == "qmark":
+        marks = ["?"] * len(columns)
+    elif style in ("format", "pyformat"):
+        marks = ["%s"] * len(columns)
+    elif style == "numeric_dollar":
+        marks = [f"${n}" for n in range(1, len(columns) + 1)]
+    else:
+        marks = [f":{n}" for n in range(1, len(columns) + 1)]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(marks)})"
+
+
+def to_async_url(url: str) -> str:
+    """Return ``url`` with its driver swapped for an asyncio driver when needed"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver:
+        parsed = parsed.set(drivername=driver)
+    return parsed.render_as_string(hide_password=False)
+
+
+def is_sqlite_url(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def sqlite_pragmas() -> dict:
+    """PRAGMA values applied to every new SQLite connection"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "temp_store": "MEMORY",
+        # Off by default in SQLite; the models' ON DELETE CASCADE rely on it
+        "foreign_keys": "ON",
+    }
+
+
+def _install_sqlite_pragmas(engine: AsyncEngine, pragmas: dict) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if value is not None:
+                    cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_engine_from_settings(
+    url: Optional[str] = None,
+    pragmas: Optional[dict] = None,
+    **overrides
+) -> AsyncEngine:
+    """
+    Build the application's async engine from ``Settings``.
+
+    Pool sizing, pre-ping and recycle come from the ``DB_*`` settings; SQLite
+    connections additionally get the ``SQLITE_*`` pragmas on connect. Keyword
+    ``overrides`` are passed straight to ``create_async_engine``.
+    """
+    url = to_async_url(url or settings.DATABASE_URL)
+    options = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if is_sqlite_url(url) and make_url(url).database in (None, "", ":memory:"):
+        # In-memory databases live inside a single connection
+        options.update(poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    options.update(overrides)
+
+    engine = create_async_engine(url, **options)
+    if is_sqlite_url(url):
+        _install_sqlite_pragmas(engine, sqlite_pragmas() if pragmas is None else pragmas)
+    return engine
+
+
+engine = create_engine_from_settings()
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -16,6 +119,5 @@ SessionLocal = sessionmaker(
 )
 
 async def get_db():
-  
     async with SessionLocal() as session:
         yield session
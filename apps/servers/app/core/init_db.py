@@ -6,6 +6,9 @@ from app.models.base import Base
 from app.models.user import User
 from app.models.recipe import Recipe
 from app.models.rating import Rating
+from app.models.meal_plan import MealPlan, PlannedMeal, ShoppingList, ShoppingListItem
+from app.models.token import RevokedToken
+from app.models.image import Image
 
 
 async def init_db():
@@ -0,0 +1,129 @@
+"""
+Token revocation. Revoked ``jti``s live in the revoked_tokens table and, for
+the per-request check, in memory: a dict lookup instead of a query. Rows
+without a ``jti`` announce that all of a user's tokens were revoked, so that
+every worker drops what it cached about the user.
+"""
+
+import asyncio
+import logging
+import time
+from calendar import timegm
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class TokenDenyList:
+    """
+    Revoked token ids with their expiry. ``start`` loads the unexpired rows
+    and keeps reading new ones every ``sync_interval`` seconds, so tokens
+    revoked by other workers are refused here too; expired entries are
+    dropped along the way. Each ``user_listeners`` callback is called with
+    the id of every user whose tokens were revoked wholesale.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], sync_interval: float):
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self._expiry: Dict[str, int] = {}
+        self._pending: Set[str] = set()
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self.user_listeners: List[Callable[[int], None]] = []
+
+    def __contains__(self, jti: Optional[str]) -> bool:
+        return jti in self._expiry
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    async def revoke(self, db: AsyncSession, claims: dict) -> bool:
+        """
+        Deny a token from now on, given its decoded claims, committing the
+        session. False if it was already revoked, by this worker or another.
+        """
+        jti = claims.get("jti")
+        if jti is None or jti in self._expiry or jti in self._pending:
+            return False
+        # Claimed before the first await, so of two concurrent revocations in
+        # this worker only one gets through; the unique jti settles it across
+        # workers. Memory only learns of the revocation once it is committed.
+        self._pending.add(jti)
+        try:
+            db.add(RevokedToken(jti=jti, user_id=int(claims["sub"]), expires_at=datetime.utcfromtimestamp(claims["exp"])))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return False
+        finally:
+            self._pending.discard(jti)
+        self._expiry[jti] = claims["exp"]
+        return True
+
+    def revoke_user(self, db: AsyncSession, user_id: int) -> None:
+        """
+        Announce that every token of a user issued so far is revoked; the
+        caller commits. The row only has to outlive the principal caches it
+        invalidates, which are reloaded from the user's row after that.
+        """
+        lifetime = timedelta(seconds=settings.PRINCIPAL_CACHE_TTL + self.sync_interval)
+        db.add(RevokedToken(jti=None, user_id=user_id, expires_at=datetime.utcnow() + lifetime))
+
+    async def sync(self) -> None:
+        """Read revocations recorded since the last sync and forget expired ones"""
+        now = int(time.time())
+        async with self.session_factory() as db:
+            if not self._last_id:
+                await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+                await db.commit()
+            rows = await db.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.user_id, RevokedToken.expires_at)
+                .where(RevokedToken.id > self._last_id)
+                .order_by(RevokedToken.id)
+            )
+            revoked_users = []
+            for row_id, jti, user_id, expires_at in rows:
+                if jti is None:
+                    revoked_users.append(user_id)
+                else:
+                    self._expiry[jti] = timegm(expires_at.utctimetuple())
+                self._last_id = row_id
+        self._expiry = {jti: exp for jti, exp in self._expiry.items() if exp > now}
+        for user_id in revoked_users:
+            for listener in self.user_listeners:
+                listener(user_id)
+
+    async def start(self) -> None:
+        await self.sync()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Error syncing revoked tokens: {str(e)}")
+
+
+deny_list = TokenDenyList(SessionLocal, settings.TOKEN_DENYLIST_SYNC_INTERVAL)
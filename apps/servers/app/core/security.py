@@ -1 +1,113 @@
-print('security.py')
\ No newline at end of file
+"""
+Password hashing. argon2 is slow and memory hungry by design, so hashes are
+computed on a few dedicated threads (argon2-cffi releases the GIL while it
+works) rather than on the event loop, and a burst beyond the queue limit is
+turned away with 503 instead of piling up CPU and memory.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+from calendar import timegm
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from jose import jwt
+from jose.utils import base64url_encode
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+
+class HashingPool:
+    """
+    A fixed set of hashing threads with admission control: at most
+    ``max_pending`` operations may be queued or running; the next one is
+    refused with 503 and a Retry-After header.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password checks in progress, please retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(fn, *args)
+        self.pending += 1
+        # Released when the thread is done, even if the request was cancelled meanwhile
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING, settings.PASSWORD_HASH_RETRY_AFTER
+)
+
+
+HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+class JWTSigner:
+    """
+    Issues JWTs with the encoded header and the keyed HMAC state prepared
+    once; each token then costs a JSON dump and one HMAC over its claims.
+    Tokens are byte-for-byte what ``jose.jwt.encode`` produces. Non-HMAC
+    algorithms go through jose.
+    """
+
+    def __init__(self, secret: str, algorithm: str):
+        self.secret = secret
+        self.algorithm = algorithm
+        self._mac = None
+        if algorithm in HMAC_DIGESTS:
+            header = json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":"), sort_keys=True)
+            self._header = base64url_encode(header.encode("utf-8")) + b"."
+            self._mac = hmac.new(secret.encode("utf-8"), digestmod=HMAC_DIGESTS[algorithm])
+
+    def sign(self, claims: dict) -> str:
+        if self._mac is None:
+            return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+        claims = {
+            name: timegm(value.utctimetuple()) if isinstance(value, datetime) else value
+            for name, value in claims.items()
+        }
+        signing_input = self._header + base64url_encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return (signing_input + b"." + base64url_encode(mac.digest())).decode("utf-8")
+
+
+jwt_signer = JWTSigner(settings.SECRET_KEY, settings.ALGORITHM)
@@ -0,0 +1,156 @@
+"""
+Write-behind buffering for touch-style column updates (last_login, view
+counters): values are coalesced per row in memory and written in batches, so
+hot paths never take SQLite's writer lock for them. A crash loses at most the
+last flush interval.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Column, bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# First pause after a failed flush; it doubles per failure, up to the interval
+FLUSH_RETRY_DELAY = 0.1
+
+
+class WriteBehindBuffer:
+    """
+    Pending column writes keyed by row id. ``set`` keeps the latest value per
+    row, ``increment`` sums deltas. ``start`` runs a task that flushes every
+    ``interval`` seconds, or sooner once ``max_entries`` rows are pending;
+    ``stop`` lets a flush in progress finish and ends it with a final flush.
+    After a failed flush the task backs off exponentially, up to ``interval``,
+    before trying again. Each column is written with one executemany UPDATE
+    by primary key, leaving ``updated_at`` untouched.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], interval: float, max_entries: int):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_entries = max_entries
+        self._latest: Dict[Column, Dict[int, Any]] = defaultdict(dict)
+        self._deltas: Dict[Column, Dict[int, int]] = defaultdict(dict)
+        self._pending = 0
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.failures = 0  # consecutive failed flushes
+
+    def set(self, column, row_id: int, value: Any) -> None:
+        self._add(self._latest, column, row_id, value, lambda old, new: new)
+
+    def increment(self, column, row_id: int, by: int = 1) -> None:
+        self._add(self._deltas, column, row_id, by, lambda old, new: old + new)
+
+    def _add(self, pending: dict, column, row_id: int, value: Any, combine: Callable) -> None:
+        # Mapped attributes (User.last_login) are keyed by their table column
+        if hasattr(column, "property"):
+            column = column.property.columns[0]
+        rows = pending[column]
+        if row_id in rows:
+            rows[row_id] = combine(rows[row_id], value)
+        else:
+            rows[row_id] = value
+            self._pending += 1
+            if self._pending >= self.max_entries:
+                self._wake.set()
+
+    def __len__(self) -> int:
+        return self._pending
+
+    async def flush(self) -> int:
+        """Write everything pending; returns the number of rows written"""
+        latest, deltas = self._latest, self._deltas
+        self._latest, self._deltas = defaultdict(dict), defaultdict(dict)
+        count, self._pending = self._pending, 0
+        if not count:
+            return 0
+        committed = False
+        try:
+            async with self.session_factory() as db:
+                for column, rows in latest.items():
+                    await self._write(db, column, bindparam("value"), rows)
+                for column, rows in deltas.items():
+                    await self._write(db, column, column + bindparam("value"), rows)
+                await db.commit()
+                committed = True
+        except Exception as e:
+            logger.error(f"Error flushing {count} buffered writes: {str(e)}")
+            if not committed:
+                self.failures += 1
+                self._restore(latest, deltas)
+                return 0
+        except BaseException:
+            # Cancelled mid-write: keep the batch for the next flush
+            if not committed:
+                self._restore(latest, deltas)
+            raise
+        self.failures = 0
+        return count
+
+    @staticmethod
+    async def _write(db: AsyncSession, column: Column, value, rows: Dict[int, Any]) -> None:
+        table = column.table
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values({column.name: value, "updated_at": table.c.updated_at})
+        )
+        params: List[dict] = [{"row_id": row_id, "value": v} for row_id, v in rows.items()]
+        await db.execute(statement, params)
+
+    def _restore(self, latest: dict, deltas: dict) -> None:
+        """Put back a batch that failed to write, behind anything newer"""
+        for column, rows in latest.items():
+            for row_id, value in rows.items():
+                if row_id not in self._latest[column]:
+                    self.set(column, row_id, value)
+        for column, rows in deltas.items():
+            for row_id, value in rows.items():
+                self.increment(column, row_id, value)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Not cancelled: a flush in progress would lose its batch
+            self._stop.set()
+            self._wake.set()
+            await self._task
+            self._task = None
+            self._stop.clear()
+            self._wake.clear()
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._stop.is_set():
+                return
+            self._wake.clear()
+            await self.flush()
+            if self.failures:
+                # A restored batch may re-arm the wake at once; don't spin on
+                # a database that keeps failing
+                delay = min(self.interval, FLUSH_RETRY_DELAY * 2 ** min(self.failures - 1, 16))
+                try:
+                    await asyncio.wait_for(self._stop.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+
+touch_buffer = WriteBehindBuffer(SessionLocal, settings.TOUCH_FLUSH_INTERVAL, settings.TOUCH_FLUSH_MAX_ENTRIES)
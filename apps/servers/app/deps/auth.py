@@ -1,64 +1,105 @@
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.revocation import deny_list
 from app.models.user import User
 from app.services.auth_service import AuthService
-from app.services.user_service import UserService
+from app.services.user_service import Principal, UserService
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
+# Same scheme for endpoints that also serve anonymous requests
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def _credentials_error(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def token_claims(token: str, token_type: str = "access") -> dict:
     """
-    Dependency to get the current authenticated user from JWT token
+    The claims of a valid, unrevoked token of ``token_type``; 401 otherwise.
+    Revocation is checked against the in-memory deny list, not the database.
     """
-    token = credentials.credentials
-    
     try:
-        # Decode token and get user
-        payload = AuthService.decode_token(token)
-        user_id: str = payload.get("sub")
-        
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Get user from database
-        user = UserService.get_user_by_id(db, user_id=int(user_id))
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Check if user is active
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Inactive user"
-            )
-        
-        return user
-        
+        claims = AuthService.decode_token(token)
+        int(claims["sub"])
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
+        raise _credentials_error()
+    if claims.get("type") != token_type:
+        raise _credentials_error()
+    if claims.get("jti") in deny_list:
+        raise _credentials_error("Token has been revoked")
+    return claims
+
+
+def check_not_revoked(principal: Principal, claims: dict) -> None:
+    """401 for a token issued before the user's tokens were revoked wholesale"""
+    if principal.tokens_revoked_at is not None and claims.get("iat", 0) < principal.tokens_revoked_at:
+        raise _credentials_error("Token has been revoked")
+
+
+def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Dependency to get the claims of the request's access token"""
+    return token_claims(credentials.credentials)
+
+
+async def get_current_principal(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Dependency to get the id and account flags of the authenticated user.
+    Served from the principal cache, so it usually costs no query.
+    """
+    principal = await UserService.get_principal(db, int(claims["sub"]))
+    if principal is None:
+        raise _credentials_error("User not found")
+    check_not_revoked(principal, claims)
+    
+    # Check if user is active
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    
+    return principal
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Dependency to get the authenticated user's row, for endpoints that read
+    or change the account itself; everything else should use the principal
+    """
+    user = await UserService.get_user_by_id(db, user_id=principal.id)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # The principal may be cached from before a deactivation elsewhere
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    
+    return user
 
 
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -73,7 +114,7 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
-def get_current_verified_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_verified_user(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """
     Dependency to get the current verified user
     """
@@ -85,7 +126,7 @@ def get_current_verified_user(current_user: User = Depends(get_current_user)) ->
     return current_user
 
 
-def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+def get_current_superuser(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """
     Dependency to get the current superuser
     """
@@ -97,10 +138,10 @@ def get_current_superuser(current_user: User = Depends(get_current_user)) -> Use
     return current_user
 
 
-def get_optional_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+async def get_optional_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[Principal]:
     """
     Dependency to optionally get the current user (for endpoints that work with or without auth)
     """
@@ -108,21 +149,16 @@ def get_optional_current_user(
         return None
     
     try:
-        token = credentials.credentials
-        payload = AuthService.decode_token(token)
-        user_id: str = payload.get("sub")
-        
-        if user_id is None:
-            return None
-        
-        user = UserService.get_user_by_id(db, user_id=int(user_id))
-        if user is None or not user.is_active:
-            return None
-        
-        return user
-        
-    except Exception:
+        claims = token_claims(credentials.credentials)
+        principal = await UserService.get_principal(db, int(claims["sub"]))
+        if principal is not None:
+            check_not_revoked(principal, claims)
+    except HTTPException:
         return None
+    if principal is None or not principal.is_active:
+        return None
+    
+    return principal
 
 
 # Alternative dependencies for different authentication requirements
@@ -131,11 +167,11 @@ def require_active_user(current_user: User = Depends(get_current_active_user)) -
     return current_user
 
 
-def require_verified_user(current_user: User = Depends(get_current_verified_user)) -> User:
+def require_verified_user(current_user: Principal = Depends(get_current_verified_user)) -> Principal:
     """Require a verified user"""
     return current_user
 
 
-def require_superuser(current_user: User = Depends(get_current_superuser)) -> User:
+def require_superuser(current_user: Principal = Depends(get_current_superuser)) -> Principal:
     """Require a superuser"""
     return current_user
\ No newline at end of file
@@ -1 +1,60 @@
-print('pagination.py')
\ No newline at end of file
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+
+from app.core.config import settings
+
+
+@dataclass
+class CursorParams:
+    """Keyset pagination parameters: an opaque cursor plus a capped page size"""
+    cursor: Optional[Tuple[Any, ...]]
+    limit: int
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor.
+    Datetimes are tagged so they round-trip exactly.
+    """
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ...]:
+    """Decode a cursor produced by ``encode_cursor``"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list):
+            raise ValueError("cursor payload must be a list")
+        return tuple(
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        )
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def cursor_params(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description="Page size (capped at MAX_PAGE_SIZE)")
+) -> CursorParams:
+    """
+    Dependency for keyset-paginated endpoints
+    """
+    return CursorParams(
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=min(limit, settings.MAX_PAGE_SIZE)
+    )
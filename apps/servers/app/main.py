@@ -1,12 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
-from app.api.v1 import health, recipes, users, ratings, uploads, meal_plans
+from app.core.revocation import deny_list
+from app.core.security import hashing_pool
+from app.core.write_behind import touch_buffer
+from app.services.image_service import image_pipeline
+from app.api.v1 import health, recipes, users, ratings, uploads, meal_plans, nutrition
+# Import every model module so all mappers are registered before the first query
+from app.models import user, recipe, rating, meal_plan, token, image  # noqa: F401
+import os
 import time
 import logging
 
-app = FastAPI(title="Recipe Hub API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Served from MEDIA_URL, so it must exist before the first request
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    os.makedirs(settings.UPLOAD_TMP_DIR, exist_ok=True)
+    touch_buffer.start()
+    await deny_list.start()
+    await image_pipeline.start()
+    yield
+    await deny_list.stop()
+    # Finish renders in flight
+    await image_pipeline.stop()
+    # Let in-flight password hashes finish, then write out buffered touches
+    hashing_pool.shutdown()
+    await touch_buffer.stop()
+
+app = FastAPI(title="Recipe Hub API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +60,7 @@ async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=exc.headers,
     )
 
 # Include routers
@@ -44,6 +70,10 @@ app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(ratings.router, prefix="/api/v1", tags=["ratings"])
 app.include_router(uploads.router, prefix="/api/v1", tags=["uploads"])
 app.include_router(meal_plans.router, prefix="/api/v1", tags=["meal-plans"])
+app.include_router(nutrition.router, prefix="/api/v1", tags=["nutrition"])
+
+# Uploaded originals and their variants
+app.mount(settings.MEDIA_URL, StaticFiles(directory=settings.UPLOAD_DIR, check_dir=False), name="media")
 
 @app.get("/")
 async def root():
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from .base import BaseModel
+
+
+class Image(BaseModel):
+    """
+    An uploaded image, stored once per content hash. Its resized variants are
+    rendered in the background; ``status`` says whether they are there yet.
+    """
+    __tablename__ = "images"
+
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    content_type = Column(String(50), nullable=False)
+    extension = Column(String(10), nullable=False)
+    size = Column(Integer, nullable=False)
+    # Filled in once the image has been decoded
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False, default="processing")  # processing, ready, failed
+    uploaded_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
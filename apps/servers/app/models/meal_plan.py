@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 from datetime import datetime
 
 class MealPlan(Base):
     __tablename__ = "meal_plans"
+    __table_args__ = (
+        # A user's plans by date range: listings and calendar lookups
+        Index("ix_meal_plans_user_dates", "user_id", "start_date", "end_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
@@ -22,10 +26,15 @@ class MealPlan(Base):
 
 class PlannedMeal(Base):
     __tablename__ = "planned_meals"
+    __table_args__ = (
+        # A plan's meals by date: calendar and weekly views are range scans;
+        # also serves every lookup by meal_plan_id alone
+        Index("ix_planned_meals_plan_date_type", "meal_plan_id", "meal_date", "meal_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    meal_plan_id = Column(Integer, ForeignKey("meal_plans.id"), nullable=False)
-    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False)
+    meal_plan_id = Column(Integer, ForeignKey("meal_plans.id", ondelete="CASCADE"), nullable=False)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
     meal_date = Column(DateTime, nullable=False)
     meal_type = Column(String(50), nullable=False)  # breakfast, lunch, dinner, snack
     servings = Column(Integer, default=1)
@@ -36,11 +45,17 @@ class PlannedMeal(Base):
     meal_plan = relationship("MealPlan", back_populates="planned_meals")
     recipe = relationship("Recipe", back_populates="planned_meals")
 
+    @property
+    def loaded_recipe(self):
+        """The recipe if a query eagerly loaded it, else None; never triggers a lazy load"""
+        return self.__dict__.get("recipe")
+
 class ShoppingList(Base):
     __tablename__ = "shopping_lists"
     
     id = Column(Integer, primary_key=True, index=True)
-    meal_plan_id = Column(Integer, ForeignKey("meal_plans.id"), nullable=False)
+    # Goes with its meal plan; MealPlan has no relationship to cascade it
+    meal_plan_id = Column(Integer, ForeignKey("meal_plans.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(200), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -51,11 +66,20 @@ class ShoppingList(Base):
 
 class ShoppingListItem(Base):
     __tablename__ = "shopping_list_items"
+    __table_args__ = (
+        # One generated line per ingredient and base unit (g, ml, count, ...)
+        Index("ux_shopping_list_items_list_ingredient_unit", "shopping_list_id", "ingredient_id", "unit", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    shopping_list_id = Column(Integer, ForeignKey("shopping_lists.id"), nullable=False)
+    shopping_list_id = Column(Integer, ForeignKey("shopping_lists.id", ondelete="CASCADE"), nullable=False)
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=True)
     ingredient_name = Column(String(200), nullable=False)
     quantity = Column(String(100))  # e.g., "2 cups", "3 lbs", "1 piece"
+    base_quantity = Column(Float, nullable=True)  # numeric total in ``unit``; None for "to taste" items
+    # Recipe ingredient rows of planned meals that add up to this item; planned
+    # meal changes adjust it and the item is removed when it drops to zero
+    uses = Column(Integer, nullable=False, default=0)
     unit = Column(String(50))
     category = Column(String(100))  # e.g., "Produce", "Dairy", "Meat"
     is_purchased = Column(Boolean, default=False)
@@ -1,15 +1,22 @@
-from sqlalchemy import Column, Integer, ForeignKey, Float, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.models.base import Base
+from datetime import datetime
 
 class Rating(Base):
     __tablename__ = "ratings"
-    __table_args__ = (UniqueConstraint("user_id", "recipe_id", name="user_recipe_unique"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "recipe_id", name="user_recipe_unique"),
+        # A recipe's ratings, newest first
+        Index("ix_ratings_recipe_id", "recipe_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False)
     rating = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    user = relationship("User", backref="ratings")
-    recipe = relationship("Recipe", backref="ratings")
+    user = relationship("User", back_populates="ratings")
+    recipe = relationship("Recipe", back_populates="ratings")
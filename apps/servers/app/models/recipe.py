@@ -1,13 +1,113 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, LargeBinary, DDL, event
 from sqlalchemy.orm import relationship
 from app.models.base import Base
+from datetime import datetime
 
 class Recipe(Base):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Serves keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_recipes_created_at_id", "created_at", "id"),
+        # Serve GET /recipes/top, overall and by cuisine: ORDER BY rating_score DESC, id DESC
+        Index("ix_recipes_score_id", "rating_score", "id"),
+        Index("ix_recipes_cuisine_score_id", "cuisine", "rating_score", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
+    cuisine = Column(String(50), nullable=True)
+    difficulty = Column(String(20), nullable=True)  # Easy, Medium, Hard
+    prep_time = Column(Integer, nullable=True)  # minutes
+    cook_time = Column(Integer, nullable=True)  # minutes
+    servings = Column(Integer, nullable=True)
+    image_url = Column(String(500), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    # "<file>#<id>" for recipes loaded by scripts/seed_db.py; the ingestion upsert key
+    source_id = Column(String(255), unique=True, nullable=True)
+    # Running totals of ratings.rating for this recipe, kept by RatingService
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    # Damped mean of the ratings (see RATING_PRIOR_MEAN); 0 until the first rating
+    rating_score = Column(Float, nullable=False, default=0.0, server_default="0")
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    owner = relationship("User", backref="recipes")
+    author = relationship("User", back_populates="recipes")
+    ingredients = relationship(
+        "RecipeIngredient", back_populates="recipe",
+        cascade="all, delete-orphan", order_by="RecipeIngredient.position"
+    )
+    tags = relationship("RecipeTag", back_populates="recipe", cascade="all, delete-orphan")
+    ratings = relationship("Rating", back_populates="recipe", cascade="all, delete-orphan")
+    # Removed with the recipe: MealPlanService.forget_recipes first takes them
+    # off their shopping lists, the FK cascade is the backstop
+    planned_meals = relationship("PlannedMeal", back_populates="recipe", passive_deletes=True)
+    nutrition = relationship("RecipeNutrition", uselist=False, cascade="all, delete-orphan")
+
+    @property
+    def average_rating(self):
+        """Mean rating, or None before the first rating"""
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+class Ingredient(Base):
+    """Canonical ingredient shared by every spelling, e.g. "egg" for "2 large eggs" and "Eggs"."""
+    __tablename__ = "ingredients"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(200), unique=True, nullable=False)  # ingredient_parser.canonical_name()
+
+class RecipeIngredient(Base):
+    __tablename__ = "recipe_ingredients"
+    __table_args__ = (
+        # "Which recipes use these ingredients" lookups and per-ingredient aggregation
+        Index("ix_recipe_ingredients_ingredient_recipe", "ingredient_id", "recipe_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False, default=0)
+    name = Column(String(200), nullable=False)
+    amount = Column(String(100), nullable=True)  # e.g. "2 cups", "400g"
+    notes = Column(String(200), nullable=True)
+    # Parsed from name/amount by app.services.ingredient_parser
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=True)
+    quantity = Column(Float, nullable=True)  # e.g. 2.0; None for "to taste"
+    unit = Column(String(20), nullable=True)  # canonical unit, e.g. "cup"; None for counted items
+
+    recipe = relationship("Recipe", back_populates="ingredients")
+    ingredient = relationship("Ingredient")
+
+class RecipeNutrition(Base):
+    """Whole-recipe nutrient totals cached by NutritionService, one row per recipe"""
+    __tablename__ = "recipe_nutrition"
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    # NutritionEngine.version the row was computed with; rows from any other version are stale
+    version = Column(String(32), nullable=False)
+    lines = Column(Integer, nullable=False, default=0)  # ingredient lines with a quantity
+    matched = Column(Integer, nullable=False, default=0)  # of those, lines with nutrition data
+    totals = Column(LargeBinary, nullable=False)  # little-endian float64 per NutritionEngine.nutrients
+
+class RecipeTag(Base):
+    __tablename__ = "recipe_tags"
+    __table_args__ = (
+        # A tag's recipes best first, for GET /recipes/top?tag=; also serves lookups by tag
+        Index("ix_recipe_tags_tag_score", "tag", "rating_score", "recipe_id"),
+    )
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String(30), primary_key=True)
+    # Copy of recipes.rating_score, so a tag's leaderboard is one index scan
+    rating_score = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    recipe = relationship("Recipe", back_populates="tags")
+
+# Full-text index over recipe text (SQLite FTS5), keyed by recipe id through
+# rowid and kept in sync by RecipeSearchIndex on every recipe write.
+RECIPES_FTS_DDL = DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5("
+    "name, description, ingredients, tags, cuisine, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+event.listen(Recipe.__table__, "after_create", RECIPES_FTS_DDL.execute_if(dialect="sqlite"))
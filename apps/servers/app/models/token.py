@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.models.base import Base
+from datetime import datetime
+
+
+class RevokedToken(Base):
+    """
+    A token revoked before its expiry (logout, refresh rotation), by its
+    ``jti`` claim; without one, every token of ``user_id`` issued before
+    ``revoked_at`` (deactivation)
+    """
+    __tablename__ = "revoked_tokens"
+    # Workers sync by id > the last id they saw, so ids freed by purging
+    # expired rows must never be handed out again
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), unique=True, nullable=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    # The token's own expiry (for a user-wide row, the principal cache's); the
+    # row is useless after it and gets purged
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
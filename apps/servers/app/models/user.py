@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Computed, Integer, Float, String, Boolean, DateTime, Text, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import BaseModel
@@ -13,6 +13,8 @@ class User(BaseModel):
     # Basic user information
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
+    # Case-folded email kept by the database, for case-insensitive lookups
+    email_lower = Column(String(255), Computed("lower(email)", persisted=True), unique=True, index=True)
     password_hash = Column(String(255), nullable=False)
     
     # Profile information
@@ -26,6 +28,15 @@ class User(BaseModel):
     is_verified = Column(Boolean, default=False)
     is_superuser = Column(Boolean, default=False)
     
+    # Number of recipes the user wrote, kept by RecipeService
+    recipe_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Running totals of the ratings the user's recipes received, kept by RatingService
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    
+    # Tokens issued at or before this instant are refused (set on deactivation)
+    tokens_revoked_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Timestamps
     last_login = Column(DateTime(timezone=True), nullable=True)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -33,6 +44,7 @@ class User(BaseModel):
     # Relationships
     recipes = relationship("Recipe", back_populates="author", cascade="all, delete-orphan")
     ratings = relationship("Rating", back_populates="user", cascade="all, delete-orphan")
+    meal_plans = relationship("MealPlan", back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
@@ -47,3 +59,17 @@ class User(BaseModel):
         elif self.last_name:
             return self.last_name
         return self.username
+
+    @property
+    def average_rating(self):
+        """Mean rating across the user's recipes, or None before the first rating"""
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+
+# Trigram index (SQLite FTS5) over the searchable user columns, keyed by user
+# id through rowid and kept in sync by UserSearchIndex on every user write.
+USERS_FTS_DDL = DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "username, email, first_name, last_name, tokenize = 'trigram')"
+)
+event.listen(User.__table__, "after_create", USERS_FTS_DDL.execute_if(dialect="sqlite"))
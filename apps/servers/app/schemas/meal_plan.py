@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Dict, List, Optional
 from enum import Enum
 
+from app.schemas.recipe import RecipeSummary
+
 class MealType(str, Enum):
     BREAKFAST = "breakfast"
     LUNCH = "lunch"
@@ -43,10 +45,36 @@ class PlannedMealUpdate(BaseModel):
     servings: Optional[int] = Field(None, ge=1)
     notes: Optional[str] = None
 
+class PlannedMealBulkCreate(BaseModel):
+    meals: List[PlannedMealCreate] = Field(..., min_length=1, max_length=200)
+
+class WeekCopy(BaseModel):
+    """Copy the meals of week ``from_week`` (1 = the week starting on the plan's start date)"""
+    from_week: int = Field(..., ge=1, le=52)
+    to_week: Optional[int] = Field(None, ge=1, le=52)  # defaults to the following week
+    replace: bool = False  # remove the target week's meals first
+
+class MealPlanFromTemplate(BaseModel):
+    template_id: str = Field(..., min_length=1, max_length=50)
+    start_date: date
+    name: Optional[str] = Field(None, min_length=1, max_length=200)
+    servings: int = Field(default=1, ge=1)
+    is_public: bool = False
+
+class MealPlanTemplate(BaseModel):
+    id: str
+    title: str
+    description: Optional[str] = None
+    duration: Optional[str] = None
+    days: int
+    meals: int  # meals across all days; ones missing from the catalog are skipped
+
 class PlannedMeal(PlannedMealBase):
     id: int
     meal_plan_id: int
     created_at: datetime
+    # Only when requested with include_recipes; never lazy-loaded
+    recipe: Optional[RecipeSummary] = Field(None, validation_alias="loaded_recipe")
     
     class Config:
         from_attributes = True
@@ -61,6 +89,23 @@ class MealPlan(MealPlanBase):
     class Config:
         from_attributes = True
 
+class CalendarMeal(BaseModel):
+    id: int
+    meal_plan_id: int
+    meal_plan_name: str
+    recipe_id: int
+    recipe_name: str
+    recipe_image_url: Optional[str] = None
+    meal_date: datetime
+    meal_type: str
+    servings: Optional[int] = None
+    notes: Optional[str] = None
+
+class CalendarDay(BaseModel):
+    """Planned meals of one day across all of a user's meal plans"""
+    day: date
+    meals: List[CalendarMeal]
+
 class ShoppingListItemBase(BaseModel):
     ingredient_name: str = Field(..., min_length=1, max_length=200)
     quantity: Optional[str] = Field(None, max_length=100)
@@ -83,6 +128,8 @@ class ShoppingListItemUpdate(BaseModel):
 class ShoppingListItem(ShoppingListItemBase):
     id: int
     shopping_list_id: int
+    ingredient_id: Optional[int] = None
+    base_quantity: Optional[float] = None
     
     class Config:
         from_attributes = True
@@ -103,9 +150,19 @@ class ShoppingList(ShoppingListBase):
     class Config:
         from_attributes = True
 
+class DailyNutrition(BaseModel):
+    day: date
+    meals_count: int
+    nutrients: Dict[str, float]
+
 class NutritionSummary(BaseModel):
     total_calories: float
     total_protein: float
     total_carbs: float
     total_fat: float
-    meals_count: int
\ No newline at end of file
+    meals_count: int
+    nutrients: Dict[str, float] = {}
+    units: Dict[str, str] = {}  # nutrient -> unit, e.g. "sodium": "mg"
+    by_day: List[DailyNutrition] = []
+    by_meal_type: Dict[str, Dict[str, float]] = {}
+    coverage: float = 0.0  # share of measured ingredient lines that had nutrition data
\ No newline at end of file
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field, validator
+from typing import Dict, List
+
+from app.schemas.meal_plan import NutritionSummary
+
+class NutritionBatchRequest(BaseModel):
+    recipe_ids: List[int] = Field(default_factory=list, max_length=500)
+    meal_plan_ids: List[int] = Field(default_factory=list, max_length=500)
+
+    @validator('meal_plan_ids', always=True)
+    def require_ids(cls, v, values):
+        if not v and not values.get('recipe_ids'):
+            raise ValueError('Provide recipe_ids, meal_plan_ids or both')
+        return v
+
+class RecipeNutritionSummary(NutritionSummary):
+    """Totals for the whole recipe, plus the same nutrients per serving"""
+    recipe_id: int
+    servings: int
+    per_serving: Dict[str, float] = {}
+
+class NutritionBatch(BaseModel):
+    recipes: Dict[int, RecipeNutritionSummary] = {}
+    meal_plans: Dict[int, NutritionSummary] = {}
+    missing_recipe_ids: List[int] = []
+    missing_meal_plan_ids: List[int] = []  # unknown, or another user's private plan
@@ -1 +1,31 @@
-print('rating.py')
\ No newline at end of file
+from pydantic import BaseModel, Field, validator
+from datetime import datetime
+from typing import Optional
+
+class RatingBase(BaseModel):
+    rating: float = Field(..., ge=1, le=5)
+
+    @validator('rating')
+    def half_stars(cls, v):
+        """Ratings go in half stars, which also keeps the running sums exact"""
+        if (v * 2) % 1:
+            raise ValueError('Rating must be a multiple of 0.5')
+        return v
+
+class RatingCreate(RatingBase):
+    pass
+
+class Rating(RatingBase):
+    id: int
+    user_id: int
+    recipe_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class RatingSummary(BaseModel):
+    recipe_id: int
+    rating_count: int
+    average_rating: Optional[float] = None
@@ -1 +1,149 @@
-print('recipe.py')
\ No newline at end of file
+from pydantic import BaseModel, Field, validator
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from enum import Enum
+
+class Difficulty(str, Enum):
+    EASY = "Easy"
+    MEDIUM = "Medium"
+    HARD = "Hard"
+
+class RecipeBase(BaseModel):
+    name: str = Field(..., min_length=3, max_length=100)
+    description: Optional[str] = Field(None, max_length=500)
+    cuisine: Optional[str] = Field(None, max_length=50)
+    difficulty: Optional[Difficulty] = None
+    prep_time: Optional[int] = Field(None, ge=0, le=1440)
+    cook_time: Optional[int] = Field(None, ge=0, le=1440)
+    servings: Optional[int] = Field(None, ge=1, le=20)
+    image_url: Optional[str] = Field(None, max_length=500)
+
+class RecipeIngredientBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=200)
+    amount: Optional[str] = Field(None, max_length=100)
+    notes: Optional[str] = Field(None, max_length=200)
+
+class RecipeIngredientCreate(RecipeIngredientBase):
+    pass
+
+class RecipeIngredient(RecipeIngredientBase):
+    id: int
+    position: int
+    ingredient_id: Optional[int] = None
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+def _normalize_tags(tags):
+    """Lowercase, strip and de-duplicate tags while keeping their order"""
+    if tags is None:
+        return tags
+    cleaned = [tag.strip().lower() for tag in tags if tag and tag.strip()]
+    if any(len(tag) > 30 for tag in cleaned):
+        raise ValueError('Tags must be at most 30 characters')
+    return list(dict.fromkeys(cleaned))
+
+class RecipeCreate(RecipeBase):
+    ingredients: List[RecipeIngredientCreate] = []
+    tags: List[str] = Field(default_factory=list, max_length=10)
+
+    @validator('tags')
+    def normalize_tags(cls, v):
+        return _normalize_tags(v)
+
+class RecipeUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=3, max_length=100)
+    description: Optional[str] = Field(None, max_length=500)
+    cuisine: Optional[str] = Field(None, max_length=50)
+    difficulty: Optional[Difficulty] = None
+    prep_time: Optional[int] = Field(None, ge=0, le=1440)
+    cook_time: Optional[int] = Field(None, ge=0, le=1440)
+    servings: Optional[int] = Field(None, ge=1, le=20)
+    image_url: Optional[str] = Field(None, max_length=500)
+    ingredients: Optional[List[RecipeIngredientCreate]] = None
+    tags: Optional[List[str]] = Field(None, max_length=10)
+
+    @validator('tags')
+    def normalize_tags(cls, v):
+        return _normalize_tags(v)
+
+class Recipe(RecipeBase):
+    id: int
+    user_id: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    ingredients: List[RecipeIngredient] = []
+    tags: List[str] = []
+    rating_count: int = 0
+    average_rating: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+    @validator('tags', pre=True)
+    def tag_names(cls, v):
+        """Accept RecipeTag rows as well as plain strings"""
+        return [getattr(tag, "tag", tag) for tag in v]
+
+class RecipeSummary(BaseModel):
+    """The recipe columns a card or list row needs, without ingredients or tags"""
+    id: int
+    name: str
+    cuisine: Optional[str] = None
+    difficulty: Optional[str] = None
+    prep_time: Optional[int] = None
+    cook_time: Optional[int] = None
+    servings: Optional[int] = None
+    image_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class TopRecipe(RecipeSummary):
+    """A leaderboard entry: ranked by ``score``, the damped mean rating"""
+    rating_count: int
+    average_rating: Optional[float] = None
+    score: float
+
+class TopRecipePage(BaseModel):
+    """One page of the keyset-paginated top recipes leaderboard"""
+    items: List[TopRecipe]
+    next_cursor: Optional[str] = None
+    limit: int
+
+class RecipePage(BaseModel):
+    """One page of a keyset-paginated recipe listing"""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    limit: int
+
+class FacetCount(BaseModel):
+    value: Optional[str]
+    count: int
+
+class RecipeIngredientMatch(BaseModel):
+    """A recipe ranked by how many of the requested ingredients it uses"""
+    id: int
+    name: str
+    cuisine: Optional[str] = None
+    image_url: Optional[str] = None
+    matched: int
+    missing: int
+
+class RecipeSearchHit(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    cuisine: Optional[str] = None
+    difficulty: Optional[str] = None
+    image_url: Optional[str] = None
+    score: float
+
+class RecipeSearchResults(BaseModel):
+    query: str
+    total: int
+    items: List[RecipeSearchHit]
+    facets: Dict[str, List[FacetCount]]
+    facets_exact: bool = True  # False when facets were counted over a sample of the matches
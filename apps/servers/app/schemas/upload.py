@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, Optional
+
+class ImageUpload(BaseModel):
+    sha256: str
+    content_type: str
+    size: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    status: str
+    url: str
+    # Resized copies by "<width>.<format>", once status is "ready"
+    variants: Dict[str, str] = {}
+    created_at: Optional[datetime] = None
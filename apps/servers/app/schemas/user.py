@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field, validator
 import re
 
@@ -132,6 +132,13 @@ class UserResponse(UserBase):
         return username
 
 
+class UserSearchPage(BaseModel):
+    """One page of keyset-paginated user search results"""
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+    limit: int
+
+
 class UserProfile(UserResponse):
     """Extended user profile with additional information"""
     recipe_count: Optional[int] = 0
@@ -158,9 +165,20 @@ class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int
+    refresh_token: Optional[str] = None
     user: UserResponse
 
 
+class TokenRefresh(BaseModel):
+    """Schema for exchanging a refresh token for a new token pair"""
+    refresh_token: str
+
+
+class Logout(BaseModel):
+    """Schema for logout; the refresh token, if given, is revoked as well"""
+    refresh_token: Optional[str] = None
+
+
 class TokenData(BaseModel):
     """Schema for token data"""
     user_id: Optional[int] = None
@@ -1,17 +1,17 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+from uuid import uuid4
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.security import hashing_pool, jwt_signer, pwd_context
 from app.models.user import User
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-
 class AuthService:
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -20,7 +20,17 @@ class AuthService:
     @staticmethod
     def get_password_hash(password: str) -> str:
         return pwd_context.hash(password)
-# 
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """``verify_password`` on the hashing pool; 503 when the pool is saturated"""
+        return await hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """``get_password_hash`` on the hashing pool; 503 when the pool is saturated"""
+        return await hashing_pool.run(pwd_context.hash, password)
+
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         to_encode = data.copy()
@@ -28,14 +38,11 @@ class AuthService:
         expire = now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
         # Ensure standard claims
         to_encode.setdefault("type", "access")
-        to_encode.update({"iat": int(now.timestamp()), "exp": expire})
+        to_encode.setdefault("jti", uuid4().hex)
+        # iat to the microsecond: compared with the user's tokens_revoked_at
+        to_encode.update({"iat": now.timestamp(), "exp": expire})
         try:
-            encoded_jwt = jwt.encode(
-                to_encode,
-                settings.SECRET_KEY,
-                algorithm=settings.ALGORITHM
-            )
-            return encoded_jwt
+            return jwt_signer.sign(to_encode)
         except Exception as e:
             logger.error(f"Error creating access token: {str(e)}")
             raise HTTPException(
@@ -43,6 +50,13 @@ class AuthService:
                 detail="Could not create access token"
             )
 
+    @staticmethod
+    def create_refresh_token(user_id: int) -> str:
+        return AuthService.create_access_token(
+            data={"sub": str(user_id), "type": "refresh"},
+            expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+
     @staticmethod
     def decode_token(token: str) -> dict:
         try:
@@ -61,15 +75,16 @@ class AuthService:
             )
 
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> User:
-        user = db.query(User).filter(User.email == email).first()
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> User:
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
             )
         
-        if not AuthService.verify_password(password, user.hashed_password):
+        if not await AuthService.verify_password_async(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
@@ -78,7 +93,7 @@ class AuthService:
         return user
 
     @staticmethod
-    def get_current_user(db: Session, token: str) -> User:
+    async def get_current_user(db: AsyncSession, token: str) -> User:
         payload = AuthService.decode_token(token)
         email: str = payload.get("sub")
         if email is None:
@@ -88,7 +103,8 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        user = db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
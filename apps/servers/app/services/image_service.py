@@ -0,0 +1,301 @@
+"""
+Image uploads. The request body is streamed to disk in chunks, hashed as it
+goes and cut off past MAX_FILE_SIZE, so no upload is ever held in memory.
+Originals are stored once per content hash; resized WebP/JPEG variants are
+rendered off the event loop on a process pool.
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.image import Image
+from app.schemas.upload import ImageUpload
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of the accepted formats: (signature, content type, extension).
+# The file's own bytes decide its type, not the request's Content-Type.
+SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+    (b"RIFF", "image/webp", ".webp"),
+]
+SNIFF_BYTES = 12
+PIL_FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+
+
+def sniff(head: bytes) -> Optional[Tuple[str, str]]:
+    """Content type and extension of an image from its first bytes, if accepted"""
+    for signature, content_type, extension in SIGNATURES:
+        if head.startswith(signature):
+            if extension == ".webp" and head[8:12] != b"WEBP":
+                continue
+            if extension == ".jpg":
+                allowed = {".jpg", ".jpeg"} & set(settings.ALLOWED_EXTENSIONS)
+            else:
+                allowed = {extension} & set(settings.ALLOWED_EXTENSIONS)
+            return (content_type, extension) if allowed else None
+    return None
+
+
+def original_path(sha256: str, extension: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, "originals", sha256[:2], sha256 + extension)
+
+
+def variant_dir(sha256: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, "variants", sha256)
+
+
+def variant_widths(width: int, widths: List[int]) -> List[int]:
+    """The configured widths, none wider than the image itself"""
+    return sorted({min(w, width) for w in widths})
+
+
+def render_variants(source: str, target_dir: str, widths: List[int], formats: List[str], quality: int) -> Tuple[int, int]:
+    """
+    Write ``<width>.<format>`` copies of ``source`` into ``target_dir`` and
+    return its (width, height). Runs in a worker process.
+    """
+    from PIL import Image as PILImage, ImageOps
+
+    os.makedirs(target_dir, exist_ok=True)
+    with PILImage.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        for target_width in variant_widths(width, widths):
+            resized = image.resize(
+                (target_width, max(1, round(height * target_width / width))), PILImage.LANCZOS
+            ) if target_width != width else image
+            for fmt in formats:
+                out = resized
+                if fmt == "jpeg" and has_alpha:
+                    # JPEG has no alpha: flatten onto white
+                    out = PILImage.new("RGB", resized.size, "white")
+                    out.paste(resized, mask=resized.getchannel("A"))
+                path = os.path.join(target_dir, f"{target_width}.{fmt}")
+                # Written aside and renamed, so a variant is never served half-done
+                out.save(path + ".part", PIL_FORMATS[fmt], quality=quality)
+                os.replace(path + ".part", path)
+    return width, height
+
+
+class ImagePipeline:
+    """
+    Renders variants on a process pool in background tasks and records the
+    outcome on the image row. ``start`` picks up images a previous process
+    left "processing"; ``stop`` waits for renders in flight.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], workers: int):
+        self.session_factory = session_factory
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: Dict[int, asyncio.Task] = {}  # by image id
+
+    def submit(self, image: Image) -> None:
+        self._submit(image.id, image.sha256, image.extension)
+
+    def _submit(self, image_id: int, sha256: str, extension: str) -> None:
+        if image_id in self._tasks:
+            return
+        task = asyncio.create_task(self._render(image_id, sha256, extension))
+        self._tasks[image_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(image_id, None))
+
+    def needs_render(self, image: Image) -> bool:
+        """
+        Whether an image should be rendered again: its render failed, or it
+        has been "processing" for IMAGE_RENDER_TIMEOUT seconds with no render
+        in flight here (the process rendering it died)
+        """
+        if image.status == "failed":
+            return True
+        if image.status != "processing" or image.id in self._tasks:
+            return False
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.IMAGE_RENDER_TIMEOUT)
+        return image.updated_at is None or image.updated_at.replace(tzinfo=None) < cutoff
+
+    async def start(self) -> None:
+        """
+        Render again the images a stopped or crashed process left
+        "processing". Workers starting together may each render one; the
+        variants are replaced atomically, so that only costs time.
+        """
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Image.id, Image.sha256, Image.extension).where(Image.status == "processing")
+            )
+            rows = result.all()
+        for image_id, sha256, extension in rows:
+            self._submit(image_id, sha256, extension)
+        if rows:
+            logger.info(f"Resubmitted {len(rows)} unfinished image renders")
+
+    async def _render(self, image_id: int, sha256: str, extension: str) -> None:
+        if self._executor is None:
+            # spawn: forking a process that runs threads (hashing, aiosqlite) is unsafe
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        values = {"status": "failed"}
+        try:
+            width, height = await asyncio.get_running_loop().run_in_executor(
+                self._executor, render_variants, original_path(sha256, extension), variant_dir(sha256),
+                settings.IMAGE_VARIANT_WIDTHS, settings.IMAGE_VARIANT_FORMATS, settings.IMAGE_QUALITY
+            )
+            values = {"status": "ready", "width": width, "height": height}
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            logger.error(f"Error rendering image {sha256}: {str(e)}")
+            self._executor = None
+        except Exception as e:
+            logger.error(f"Error rendering image {sha256}: {str(e)}")
+        async with self.session_factory() as db:
+            await db.execute(update(Image).where(Image.id == image_id).values(**values))
+            await db.commit()
+
+    async def stop(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+image_pipeline = ImagePipeline(SessionLocal, settings.IMAGE_WORKERS)
+
+
+class ImageService:
+    """Service class for image uploads"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_image(self, sha256: str) -> Optional[Image]:
+        result = await self.db.execute(select(Image).where(Image.sha256 == sha256))
+        return result.scalars().first()
+
+    async def store_upload(
+        self, chunks: AsyncIterator[bytes], declared_size: Optional[int], user_id: int
+    ) -> Tuple[Image, bool]:
+        """
+        Stream an upload to disk and store it unless the same bytes already
+        are; returns the image and whether it is new.
+        """
+        limit = settings.MAX_FILE_SIZE
+        if declared_size is not None and declared_size > limit:
+            raise self._too_large()
+
+        os.makedirs(settings.UPLOAD_TMP_DIR, exist_ok=True)
+        digest, size, head, kind = hashlib.sha256(), 0, b"", None
+        fd, tmp_path = tempfile.mkstemp(dir=settings.UPLOAD_TMP_DIR)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > limit:
+                        raise self._too_large()
+                    if kind is None:
+                        head += chunk[:SNIFF_BYTES - len(head)]
+                        if len(head) >= SNIFF_BYTES:
+                            kind = self._sniff(head)
+                    digest.update(chunk)
+                    # Local disk: a 64 KiB write lands in the page cache in microseconds
+                    tmp.write(chunk)
+            if kind is None:
+                kind = self._sniff(head)
+            content_type, extension = kind
+
+            sha256 = digest.hexdigest()
+            existing = await self.get_image(sha256)
+            if existing is not None:
+                if image_pipeline.needs_render(existing):
+                    await self._render_again(existing, tmp_path)
+                return existing, False
+
+            path = original_path(sha256, extension)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        image = Image(
+            sha256=sha256, content_type=content_type, extension=extension, size=size, uploaded_by=user_id
+        )
+        self.db.add(image)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # The same image finished uploading concurrently
+            await self.db.rollback()
+            return await self.get_image(sha256), False
+        await self.db.refresh(image)
+        image_pipeline.submit(image)
+        return image, True
+
+    async def _render_again(self, image: Image, upload_path: str) -> None:
+        """Resubmit a failed or stuck image, restoring its original from the upload if it is gone"""
+        path = original_path(image.sha256, image.extension)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(upload_path, path)
+        image.status = "processing"
+        await self.db.commit()
+        await self.db.refresh(image)
+        image_pipeline.submit(image)
+
+    @staticmethod
+    def _sniff(head: bytes) -> Tuple[str, str]:
+        kind = sniff(head)
+        if kind is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Only {', '.join(settings.ALLOWED_EXTENSIONS)} images are accepted"
+            )
+        return kind
+
+    @staticmethod
+    def _too_large() -> HTTPException:
+        return HTTPException(
+            status_code=413,  # Content Too Large; the constant was renamed across Starlette versions
+            detail=f"File exceeds the {settings.MAX_FILE_SIZE} byte limit"
+        )
+
+    @staticmethod
+    def to_schema(image: Image) -> ImageUpload:
+        """The API view of an image, with URLs for the original and its variants"""
+        base = settings.MEDIA_URL.rstrip("/")
+        variants: Dict[str, str] = {}
+        if image.status == "ready":
+            for width in variant_widths(image.width, settings.IMAGE_VARIANT_WIDTHS):
+                for fmt in settings.IMAGE_VARIANT_FORMATS:
+                    variants[f"{width}.{fmt}"] = f"{base}/variants/{image.sha256}/{width}.{fmt}"
+        return ImageUpload(
+            sha256=image.sha256,
+            content_type=image.content_type,
+            size=image.size,
+            width=image.width,
+            height=image.height,
+            status=image.status,
+            url=f"{base}/originals/{image.sha256[:2]}/{image.sha256}{image.extension}",
+            variants=variants,
+            created_at=image.created_at,
+        )
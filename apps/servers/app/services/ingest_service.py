@@ -0,0 +1,671 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import (
+    Any, AsyncIterator, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+)
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import UPSERT_INSERTS, driver_insert
+from app.models.recipe import Recipe, RecipeIngredient, RecipeTag
+from app.services.ingredient_parser import parse_ingredient
+from app.services.ingredient_service import IngredientService
+from app.services.nutrition_service import NutritionService
+from app.services.search_service import INDEX_BATCH_SIZE, RecipeSearchIndex
+
+logger = logging.getLogger(__name__)
+
+RECIPE_FILE_SUFFIXES = (".json", ".jsonl")
+DEFAULT_BATCH_SIZE = 2000
+FILES_PER_TASK = 64  # small files are sent to workers in groups to amortize IPC
+CHUNK_SIZE = 1 << 16
+
+# Limits from templates/recipe_template.json "validation_rules"
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+TITLE_MAX_LENGTH = 100
+DESCRIPTION_MAX_LENGTH = 500
+MAX_MINUTES = 1440
+SERVINGS_RANGE = (1, 20)
+MAX_TAGS = 10
+TAG_MAX_LENGTH = 30
+
+# Recipe columns refreshed when a source id is ingested again
+UPSERT_COLUMNS = (
+    "name", "description", "cuisine", "difficulty", "prep_time",
+    "cook_time", "servings", "image_url", "updated_at",
+)
+
+_WHITESPACE_RE = re.compile(r"\s*")
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(hours?|hrs?|h|minutes?|mins?|m)?", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"\d+")
+
+
+@dataclass
+class IngestStats:
+    """Running totals reported by RecipeIngestor"""
+    files: int = 0
+    recipes: int = 0
+    skipped: int = 0
+    unchanged: int = 0
+    failed_files: List[str] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.recipes / self.elapsed if self.elapsed else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Discovery and streaming parse
+# ---------------------------------------------------------------------------
+
+def discover_files(paths: Iterable[Path]) -> List[Path]:
+    """Expand files and directories into the recipe files to ingest, in a stable order"""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.extend(
+                sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() in RECIPE_FILE_SUFFIXES)
+            )
+        elif path.is_file():
+            found.append(path)
+    return list(dict.fromkeys(found))
+
+
+class _JsonStream:
+    """
+    Pull-based decoder that reads a JSON document in chunks and hands out one
+    value at a time, so a file holding millions of recipes never has to be
+    loaded whole.
+    """
+
+    def __init__(self, fp, chunk_size: int = CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > self.chunk_size:
+            self.buf, self.pos = self.buf[self.pos:], 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)"""
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number or literal ending exactly at the buffer edge may continue
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def array(self) -> Iterator[Any]:
+        """Yield the items of the array starting at the current position"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def _is_collection_key(key: str) -> bool:
+    """``recipes`` or ``<category>_recipes``, e.g. ``breakfast_recipes``"""
+    key = key.lower()
+    return key == "recipes" or key.endswith("_recipes")
+
+
+def iter_raw_recipes(path: Path, source_prefix: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream (source_id, raw recipe) pairs out of one file.
+
+    Understands top-level recipe arrays, objects holding a ``recipes`` /
+    ``*_recipes`` array, single-recipe objects and JSON Lines. Source ids
+    are ``<file>#<recipe id or position>`` (just ``<file>`` for single-recipe
+    files), which keeps re-ingestion idempotent.
+    """
+    prefix = source_prefix or path.as_posix()
+
+    def source_id(raw: Any, position: int) -> str:
+        key = raw.get("id") if isinstance(raw, dict) else None
+        return f"{prefix}#{key if key not in (None, '') else position}"
+
+    with open(path, encoding="utf-8") as fp:
+        if path.suffix.lower() == ".jsonl":
+            for position, line in enumerate(fp):
+                if line.strip():
+                    raw = json.loads(line)
+                    yield source_id(raw, position), raw
+            return
+
+        stream = _JsonStream(fp)
+        first = stream.peek()
+        if first == "[":
+            for position, raw in enumerate(stream.array()):
+                yield source_id(raw, position), raw
+        elif first == "{":
+            stream.pos += 1
+            rest, streamed = {}, False
+            while stream.peek() != "}":
+                key = stream.value()
+                stream.expect(":")
+                if isinstance(key, str) and _is_collection_key(key) and stream.peek() == "[":
+                    streamed = True
+                    for position, raw in enumerate(stream.array()):
+                        yield source_id(raw, position), raw
+                else:
+                    rest[key] = stream.value()
+                if stream.peek() == ",":
+                    stream.pos += 1
+            if not streamed:
+                yield prefix, rest
+        else:
+            raise ValueError("not a JSON array or object")
+
+
+# ---------------------------------------------------------------------------
+# Normalization to templates/recipe_template.json
+# ---------------------------------------------------------------------------
+
+def _lookup(scopes: Sequence[Dict[str, Any]], *keys: str) -> Any:
+    """First non-empty value for any of ``keys`` in the first scope that has one"""
+    for scope in scopes:
+        for key in keys:
+            value = scope.get(key)
+            if value is not None and value != "" and value != [] and value != {}:
+                return value
+    return None
+
+
+def _text(value: Any, max_length: int) -> Optional[str]:
+    if isinstance(value, str):
+        cleaned = " ".join(value.split())
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        cleaned = str(value)
+    else:
+        return None
+    return cleaned[:max_length] or None
+
+
+def _minutes(value: Any) -> Optional[int]:
+    """Accept 25, "25", "20 minutes" or "1 hour 30 mins"; None if out of range"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        minutes = float(value)
+    elif isinstance(value, str):
+        parts = _DURATION_RE.findall(value)
+        if not parts:
+            return None
+        minutes = sum(
+            float(number) * (60 if unit.lower().startswith("h") else 1)
+            for number, unit in parts
+        )
+    else:
+        return None
+    return int(round(minutes)) if 0 <= minutes <= MAX_MINUTES else None
+
+
+def _servings(value: Any) -> Optional[int]:
+    if isinstance(value, str):
+        match = _NUMBER_RE.search(value)
+        value = int(match.group()) if match else None
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    low, high = SERVINGS_RANGE
+    return int(value) if low <= value <= high else None
+
+
+def _ingredient(name: str, amount: Optional[str] = None, notes: str = "") -> Dict[str, Any]:
+    """Template ingredient dict plus the parsed quantity, unit and canonical name"""
+    parsed = parse_ingredient(name, amount)
+    return {
+        # A bare line such as "2 cups all-purpose flour" is split into item/amount/notes
+        "item": name if amount else (parsed.name or name),
+        "amount": amount or parsed.amount,
+        "notes": notes or parsed.notes,
+        "quantity": parsed.quantity,
+        "unit": parsed.unit,
+        "ingredient": parsed.canonical_name,
+    }
+
+
+def _ingredients(value: Any) -> List[Dict[str, Any]]:
+    if not isinstance(value, list):
+        return []
+    items = []
+    for entry in value:
+        if isinstance(entry, str):
+            item = _text(entry, 200)
+            if item:
+                items.append(_ingredient(item))
+        elif isinstance(entry, dict) and isinstance(entry.get("items"), list):
+            # Sectioned lists, e.g. {"section": "For Rice", "items": [...]}
+            section = _text(entry.get("section"), 200) or ""
+            for sub in _ingredients(entry["items"]):
+                sub["notes"] = sub["notes"] or section
+                items.append(sub)
+        elif isinstance(entry, dict):
+            item = _text(_lookup((entry,), "item", "name", "ingredient"), 200)
+            if item:
+                items.append(_ingredient(
+                    item,
+                    _text(_lookup((entry,), "amount", "quantity"), 100) or "",
+                    _text(entry.get("notes"), 200) or "",
+                ))
+    return items
+
+
+def _instructions(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = value.splitlines()
+    if not isinstance(value, list):
+        return []
+    return [step for step in (_text(entry, 2000) for entry in value) if step]
+
+
+def _tags(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    cleaned = [tag.strip().lower() for tag in value if isinstance(tag, str) and tag.strip()]
+    return [tag for tag in dict.fromkeys(cleaned) if len(tag) <= TAG_MAX_LENGTH][:MAX_TAGS]
+
+
+def normalize_recipe(raw: Any, source_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one raw recipe, whatever its shape, onto the recipe template.
+
+    Values outside the template's validation rules are dropped rather than
+    rejected; a recipe without a usable title is skipped (returns None).
+    """
+    if not isinstance(raw, dict):
+        return None
+    # Some shapes nest fields one level down, e.g. {"object": {"prepTimeMinutes": 25}}
+    scopes = [raw] + [value for value in raw.values() if isinstance(value, dict)]
+    title = _text(_lookup(scopes, "title", "name", "recipe_name", "recipeName"), TITLE_MAX_LENGTH)
+    if not title or len(title) < 3:
+        return None
+
+    difficulty = _text(_lookup(scopes, "difficulty"), 20)
+    image_url = _text(_lookup(scopes, "image_url", "imageUrl", "image"), 500)
+    nutrition = _lookup(scopes, "nutrition")
+    return {
+        "id": raw.get("id"),
+        "title": title,
+        "description": _text(_lookup(scopes, "description", "summary", "string"), DESCRIPTION_MAX_LENGTH),
+        "cuisine": _text(_lookup(scopes, "cuisine", "category"), 50),
+        "difficulty": difficulty.title() if difficulty and difficulty.title() in DIFFICULTIES else None,
+        "prep_time": _minutes(_lookup(scopes, "prep_time", "prepTime", "prepTimeMinutes")),
+        "cook_time": _minutes(_lookup(scopes, "cook_time", "cookTime", "cookTimeMinutes")),
+        "servings": _servings(_lookup(scopes, "servings", "serves", "yield")),
+        "ingredients": _ingredients(_lookup(scopes, "ingredients", "Ingredients")),
+        "instructions": _instructions(_lookup(scopes, "instructions", "steps", "directions")),
+        "tags": _tags(_lookup(scopes, "tags")),
+        "nutrition": nutrition if isinstance(nutrition, dict) else {},
+        "image_url": image_url if image_url and image_url.startswith(("http://", "https://")) else None,
+        "notes": _text(raw.get("notes"), 2000) or "",
+        "source": source_id,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Per-file parsing (runs in worker processes) and the checkpoint manifest
+# ---------------------------------------------------------------------------
+
+@dataclass
+class FileResult:
+    """
+    Normalized records from one file, or one chunk of it. Only the final
+    chunk has ``done`` set; it carries the file's hash and totals.
+    """
+    path: str
+    source_prefix: str
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    done: bool = False
+    mtime: float = 0.0
+    size: int = 0
+    sha256: Optional[str] = None
+    skipped: int = 0
+    error: Optional[str] = None
+    unchanged: bool = False
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_file(
+    path: Path,
+    source_prefix: str,
+    known_hash: Optional[str] = None,
+    chunk_size: Optional[int] = None
+) -> Iterator[FileResult]:
+    """
+    Hash, stream and normalize one file, yielding its records in chunks of
+    ``chunk_size`` (all at once if None). A file whose content hash equals
+    ``known_hash`` is not parsed at all and comes back ``unchanged``.
+    """
+    stat = path.stat()
+    final = FileResult(
+        path=str(path), source_prefix=source_prefix, done=True,
+        mtime=stat.st_mtime, size=stat.st_size, sha256=file_hash(path)
+    )
+    if final.sha256 == known_hash:
+        final.unchanged = True
+        yield final
+        return
+
+    records: List[Dict[str, Any]] = []
+    try:
+        for source_id, raw in iter_raw_recipes(path, source_prefix):
+            record = normalize_recipe(raw, source_id)
+            if record is None:
+                final.skipped += 1
+                continue
+            records.append(record)
+            if chunk_size and len(records) >= chunk_size:
+                yield FileResult(path=str(path), source_prefix=source_prefix, records=records)
+                records = []
+    except (ValueError, UnicodeDecodeError) as e:
+        final.error = str(e)
+    final.records = records
+    yield final
+
+
+def parse_files(files: Sequence[Tuple[str, str, Optional[str]]]) -> List[FileResult]:
+    """Worker-process entry point: each (path, source prefix, known hash) as a single FileResult"""
+    return [next(read_file(Path(path), prefix, known_hash)) for path, prefix, known_hash in files]
+
+
+class IngestManifest:
+    """
+    Checkpoint of fully ingested files, keyed by source prefix, with the
+    mtime, size and sha256 they had when their last recipe was committed.
+    Files whose mtime and size are unchanged are skipped without reading
+    them; touched files are re-hashed and skipped if the content is the same.
+    """
+
+    # Bumped whenever normalization changes, so files are re-parsed (2: parsed ingredients)
+    VERSION = 2
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == self.VERSION:
+                self.files = data.get("files", {})
+
+    def is_current(self, key: str, path: Path) -> bool:
+        entry = self.files.get(key)
+        if not entry:
+            return False
+        stat = path.stat()
+        return entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size
+
+    def known_hash(self, key: str) -> Optional[str]:
+        entry = self.files.get(key)
+        return entry["sha256"] if entry else None
+
+    def record(self, result: FileResult, recipes: int) -> None:
+        previous = self.files.get(result.source_prefix, {})
+        self.files[result.source_prefix] = {
+            "mtime": result.mtime,
+            "size": result.size,
+            "sha256": result.sha256,
+            "recipes": previous.get("recipes", 0) if result.unchanged else recipes,
+        }
+
+    def save(self) -> None:
+        """Write atomically, so a crash never leaves a truncated manifest"""
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": self.VERSION, "files": self.files}), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ---------------------------------------------------------------------------
+# Batched writer
+# ---------------------------------------------------------------------------
+
+class RecipeIngestor:
+    """
+    Bulk recipe loader: each batch is one transaction made of a multi-row
+    upsert keyed on ``recipes.source_id`` plus executemany inserts for
+    ingredients and tags, followed by a search index refresh.
+
+    With ``workers > 1`` files are parsed and normalized in a process pool
+    while this (single) writer keeps inserting; with one worker files are
+    streamed in-process, which also suits very large single files.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        progress: Optional[Callable[[IngestStats], None]] = None,
+        workers: int = 1,
+        manifest: Optional[IngestManifest] = None
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.progress = progress
+        self.workers = workers
+        self.manifest = manifest
+        self.stats = IngestStats()
+        dialect = db.get_bind().dialect
+        if dialect.name not in UPSERT_INSERTS:
+            raise ValueError(f"Bulk ingestion does not support the {dialect.name} dialect")
+        self._insert = UPSERT_INSERTS[dialect.name]
+        self._insert_ingredients = driver_insert(
+            dialect, "recipe_ingredients",
+            ("recipe_id", "position", "name", "amount", "notes", "ingredient_id", "quantity", "unit")
+        )
+        self.ingredients = IngredientService(db)
+        self._insert_tags = driver_insert(dialect, "recipe_tags", ("recipe_id", "tag", "rating_score"))
+
+    async def _file_results(self, todo: List[Tuple[str, str, Optional[str]]]) -> AsyncIterator[FileResult]:
+        """FileResults in submission order, from the process pool or in-process"""
+        if self.workers <= 1:
+            for path, prefix, known_hash in todo:
+                for result in read_file(Path(path), prefix, known_hash, self.batch_size):
+                    yield result
+            return
+
+        loop = asyncio.get_running_loop()
+        tasks = (todo[start:start + FILES_PER_TASK] for start in range(0, len(todo), FILES_PER_TASK))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # A bounded window keeps workers busy without parsing far ahead of the writer
+            window = deque(
+                loop.run_in_executor(pool, parse_files, task)
+                for task in islice(tasks, self.workers * 2)
+            )
+            while window:
+                results = await window.popleft()
+                task = next(tasks, None)
+                if task is not None:
+                    window.append(loop.run_in_executor(pool, parse_files, task))
+                for result in results:
+                    yield result
+
+    async def ingest(self, paths: Sequence[Path], root: Optional[Path] = None) -> IngestStats:
+        """Load every recipe under ``paths`` not already recorded in the manifest"""
+        todo = []
+        for path in discover_files(paths):
+            prefix = path.relative_to(root).as_posix() if root and path.is_relative_to(root) else path.as_posix()
+            if self.manifest and self.manifest.is_current(prefix, path):
+                self.stats.unchanged += 1
+                continue
+            todo.append((str(path), prefix, self.manifest.known_hash(prefix) if self.manifest else None))
+
+        batch: List[Dict[str, Any]] = []
+        queued = 0
+        # (records queued when the file finished, result): a file is checkpointed
+        # once every record up to that point has been committed
+        finished: Deque[Tuple[int, FileResult]] = deque()
+        file_recipes: Dict[str, int] = {}
+
+        async def flush(records: List[Dict[str, Any]], committed: int) -> None:
+            if records:
+                await self.write_batch(records)
+            if self.manifest:
+                while finished and finished[0][0] <= committed:
+                    _, done = finished.popleft()
+                    self.manifest.record(done, file_recipes.pop(done.path, 0))
+                self.manifest.save()
+
+        async for result in self._file_results(todo):
+            batch.extend(result.records)
+            queued += len(result.records)
+            file_recipes[result.path] = file_recipes.get(result.path, 0) + len(result.records)
+            if result.done:
+                self.stats.skipped += result.skipped
+                if result.error:
+                    logger.warning(f"Skipping {result.path}: {result.error}")
+                    self.stats.failed_files.append(result.path)
+                    file_recipes.pop(result.path, None)
+                elif result.unchanged:
+                    self.stats.unchanged += 1
+                    finished.append((queued, result))
+                else:
+                    self.stats.files += 1
+                    finished.append((queued, result))
+            while len(batch) >= self.batch_size:
+                chunk, batch = batch[:self.batch_size], batch[self.batch_size:]
+                await flush(chunk, queued - len(batch))
+        await flush(batch, queued)
+        return self.stats
+
+    async def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """Upsert one batch of normalized records in a single transaction"""
+        # Within a batch the last occurrence of a source id wins
+        records = list({record["source"]: record for record in records}.values())
+        now = datetime.utcnow()
+        try:
+            stmt = self._insert(Recipe.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Recipe.__table__.c.source_id],
+                set_={name: stmt.excluded[name] for name in UPSERT_COLUMNS}
+            ).returning(Recipe.__table__.c.id, Recipe.__table__.c.source_id, Recipe.__table__.c.rating_score)
+            result = await self.db.execute(stmt, [
+                {
+                    "source_id": record["source"],
+                    "name": record["title"],
+                    "description": record["description"],
+                    "cuisine": record["cuisine"],
+                    "difficulty": record["difficulty"],
+                    "prep_time": record["prep_time"],
+                    "cook_time": record["cook_time"],
+                    "servings": record["servings"],
+                    "image_url": record["image_url"],
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for record in records
+            ])
+            rows = result.all()
+            ids = {source_id: recipe_id for recipe_id, source_id, _ in rows}
+            # Re-ingested recipes keep their ratings; their tags carry the score along
+            scores = {source_id: score for _, source_id, score in rows}
+            recipe_ids = list(ids.values())
+
+            # Re-ingested recipes get their ingredients and tags replaced
+            for start in range(0, len(recipe_ids), INDEX_BATCH_SIZE):
+                chunk = recipe_ids[start:start + INDEX_BATCH_SIZE]
+                await self.db.execute(delete(RecipeIngredient).where(RecipeIngredient.recipe_id.in_(chunk)))
+                await self.db.execute(delete(RecipeTag).where(RecipeTag.recipe_id.in_(chunk)))
+
+            ingredient_ids = await self.ingredients.resolve_ids(
+                ingredient["ingredient"] for record in records for ingredient in record["ingredients"]
+            )
+            # Child rows go straight to the driver's executemany as tuples;
+            # per-row parameter processing would otherwise dominate the batch.
+            ingredients = [
+                (ids[record["source"]], position, ingredient["item"],
+                 ingredient["amount"] or None, ingredient["notes"] or None,
+                 ingredient_ids.get(ingredient["ingredient"]), ingredient["quantity"], ingredient["unit"])
+                for record in records
+                for position, ingredient in enumerate(record["ingredients"])
+            ]
+            tags = [
+                (ids[record["source"]], tag, scores[record["source"]])
+                for record in records
+                for tag in record["tags"]
+            ]
+            connection = await self.db.connection()
+            if ingredients:
+                await connection.exec_driver_sql(self._insert_ingredients, ingredients)
+            if tags:
+                await connection.exec_driver_sql(self._insert_tags, tags)
+
+            await RecipeSearchIndex(self.db).index_recipes(recipe_ids)
+            # Totals come from the parsed records already in memory, not a re-read
+            nutrition = NutritionService(self.db)
+            await nutrition.store(nutrition.vectors_from_lines(recipe_ids, [
+                (ids[record["source"]], ingredient["ingredient"], ingredient["quantity"], ingredient["unit"])
+                for record in records
+                for ingredient in record["ingredients"]
+            ]))
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            self.ingredients.forget()
+            raise
+
+        self.stats.recipes += len(records)
+        if self.progress:
+            self.progress(self.stats)
@@ -0,0 +1,231 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Canonical unit -> spellings found in recipe text (matched case-insensitively,
+# except the single-letter "T"/"t" tablespoon/teaspoon shorthands)
+UNIT_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "g": ("g", "gr", "grs", "grm", "grms", "gm", "gms", "gram", "grams", "gramme", "grammes"),
+    "kg": ("kg", "kgs", "kilo", "kilos", "kilogram", "kilograms", "kilogramme", "kilogrammes"),
+    "mg": ("mg", "mgs", "milligram", "milligrams"),
+    "ml": ("ml", "mls", "milliliter", "milliliters", "millilitre", "millilitres"),
+    "l": ("l", "ltr", "ltrs", "lt", "liter", "liters", "litre", "litres"),
+    "tsp": ("tsp", "tsps", "tspn", "teaspoon", "teaspoons", "teaspoonful", "teaspoonfuls"),
+    "tbsp": ("tbsp", "tbsps", "tbs", "tbl", "tblsp", "tablespoon", "tablespoons", "tablespoonful", "tablespoonfuls"),
+    "cup": ("cup", "cups"),
+    "oz": ("oz", "ozs", "ounce", "ounces"),
+    "lb": ("lb", "lbs", "pound", "pounds"),
+    "pinch": ("pinch", "pinches"),
+    "dash": ("dash", "dashes"),
+    "clove": ("clove", "cloves"),
+    "slice": ("slice", "slices"),
+    "can": ("can", "cans", "tin", "tins"),
+    "package": ("package", "packages", "pack", "packs", "packet", "packets"),
+    "scoop": ("scoop", "scoops"),
+    "bunch": ("bunch", "bunches"),
+    "stick": ("stick", "sticks"),
+    "sprig": ("sprig", "sprigs"),
+    "piece": ("piece", "pieces", "pc", "pcs"),
+    "handful": ("handful", "handfuls"),
+}
+_UNITS = {alias: unit for unit, aliases in UNIT_ALIASES.items() for alias in aliases}
+
+# Canonical unit -> (base unit, factor). Mass sums in grams, volume in
+# millilitres; counted units (cans, cloves, ...) only add up with themselves
+# and a missing unit counts whole items.
+COUNT_UNIT = "count"
+BASE_UNITS: Dict[str, Tuple[str, float]] = {
+    "g": ("g", 1.0),
+    "kg": ("g", 1000.0),
+    "mg": ("g", 0.001),
+    "oz": ("g", 28.3495),
+    "lb": ("g", 453.592),
+    "ml": ("ml", 1.0),
+    "l": ("ml", 1000.0),
+    "tsp": ("ml", 4.92892),
+    "tbsp": ("ml", 14.7868),
+    "cup": ("ml", 236.588),
+    "pinch": ("ml", 0.31),
+    "dash": ("ml", 0.62),
+}
+
+_FRACTIONS = {"½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75, "⅛": 0.125, "⅜": 0.375, "⅝": 0.625, "⅞": 0.875}
+
+# Words that describe the state or size of an ingredient rather than what it
+# is; dropped from the canonical name so "2 large eggs" and "Eggs" share an id
+DESCRIPTORS = frozenset({
+    "large", "medium", "small", "big", "extra-large", "fresh", "freshly", "ripe", "chopped",
+    "diced", "minced", "sliced", "grated", "shredded", "melted", "softened", "cold", "warm",
+    "hot", "chilled", "cooked", "finely", "thinly", "roughly", "coarsely", "peeled", "crushed",
+    "room-temperature", "frozen", "optional",
+})
+# Words after a separately given quantity that still mean whole items
+# ("2 medium", "3 nos"); any other lone word there is kept as an unparsed unit
+_COUNT_WORDS = DESCRIPTORS | {"whole", "each", "no", "nos", "number", "numbers"}
+# Words ending in "s" that are not plurals
+_NOT_PLURAL = frozenset({
+    "asparagus", "couscous", "hummus", "molasses", "swiss", "brussels", "citrus", "series",
+    "watercress", "grass", "glass", "bass", "cress", "lemongrass", "schnapps",
+})
+
+# Longest forms first: "1½", "1 and 1/2", "1/2", "1.5", "½"
+_NUMBER = r"(?:\d+\s*[½⅓⅔¼¾⅛⅜⅝⅞]|\d+\s+(?:and\s+)?\d+/\d+|\d+/\d+|\d+(?:\.\d+)?|[½⅓⅔¼¾⅛⅜⅝⅞])"
+_QUANTITY_RE = re.compile(rf"^\s*(?P<q1>{_NUMBER})(?:\s*(?:-|–|to)\s*(?P<q2>{_NUMBER}))?", re.IGNORECASE)
+_ARTICLE_RE = re.compile(r"^\s*(?:a|an|one)\s+(?=\w)", re.IGNORECASE)
+_UNIT_RE = re.compile(r"^\s*(?P<unit>[a-zA-Z]+\.?)(?=[\s,(]|$)")
+_BARE_WORD_RE = re.compile(r"^\s*(?P<word>[a-zA-Z]+)\.?\s*$")
+_OF_RE = re.compile(r"^\s*of\s+", re.IGNORECASE)
+_PART_OF_RE = re.compile(r"^\s*(?P<part>juice|zest)\s+of\s+(?P<rest>.+)$", re.IGNORECASE)
+_PARENS_RE = re.compile(r"\(([^)]*)\)")
+_TRAILING_NOTE_RE = re.compile(r"\s+(?P<note>(?:to taste|for (?:garnish|serving|toasting|frying|coating|filling)\b.*))$", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_MIXED_SPLIT_RE = re.compile(r"\s+(?:and\s+)?")
+_ALTERNATIVE_RE = re.compile(r"\s+or\s+")
+
+
+@dataclass(frozen=True)
+class ParsedIngredient:
+    """One ingredient line split into structured parts"""
+    quantity: Optional[float]  # numeric amount, ranges averaged; None if unquantified
+    unit: Optional[str]        # canonical unit from UNIT_ALIASES, else the unit as written; None for counted items
+    name: str                  # display name, e.g. "all-purpose flour"
+    canonical_name: str        # lookup key shared by spellings, e.g. "all-purpose flour"
+    amount: str                # quantity and unit as written, e.g. "2 cups"
+    notes: str                 # preparation notes, e.g. "finely chopped"
+
+
+def _number(text: str) -> float:
+    text = text.strip()
+    for glyph, value in _FRACTIONS.items():
+        if glyph in text:
+            whole = text.replace(glyph, "").strip()
+            return (float(whole) if whole else 0.0) + value
+    total = 0.0
+    for part in _MIXED_SPLIT_RE.split(text):
+        if "/" in part:
+            numerator, denominator = part.split("/")
+            total += float(numerator) / float(denominator) if float(denominator) else 0.0
+        elif part:
+            total += float(part)
+    return total
+
+
+def _unit(word: str) -> Optional[str]:
+    word = word.rstrip(".")
+    if word in ("T", "Tbsp"):
+        return "tbsp"
+    if word == "t":
+        return "tsp"
+    return _UNITS.get(word.lower())
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3 or word in _NOT_PLURAL or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("oes") or word.endswith(("ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("ves") and word not in ("olives", "chives", "cloves"):
+        return word[:-3] + "f"
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def canonical_name(name: str) -> str:
+    """Lowercased, descriptor-free, singular form of an ingredient name"""
+    name = _PARENS_RE.sub(" ", name.lower()).split(",")[0]
+    # "honey or agave syrup" -> "honey"
+    name = _ALTERNATIVE_RE.split(name, maxsplit=1)[0]
+    words = [word for word in _WORD_RE.findall(name) if word not in DESCRIPTORS]
+    if not words:
+        return ""
+    words[-1] = _singular(words[-1])
+    return " ".join(words)[:200]
+
+
+def _split_quantity(text: str, bare_unit_is_name: bool = False) -> Tuple[Optional[float], Optional[str], str, str]:
+    """Peel a leading quantity and unit off ``text``: (quantity, unit, amount text, rest)"""
+    quantity, unit = None, None
+    rest = text
+    match = _QUANTITY_RE.match(rest)
+    if match:
+        low = _number(match.group("q1"))
+        high = _number(match.group("q2")) if match.group("q2") else low
+        quantity = (low + high) / 2
+        rest = rest[match.end():]
+    else:
+        article = _ARTICLE_RE.match(rest)
+        if article and _UNIT_RE.match(rest[article.end():]) and _unit(_UNIT_RE.match(rest[article.end():]).group("unit")):
+            # "a pinch of salt"
+            quantity = 1.0
+            rest = rest[article.end():]
+
+    unit_match = _UNIT_RE.match(rest)
+    if unit_match and _unit(unit_match.group("unit")):
+        remainder = rest[unit_match.end():]
+        # In a full line "4 cloves" names the spice, not a unit of something else
+        if not bare_unit_is_name or remainder.strip(" ,") or quantity is None:
+            unit = _unit(unit_match.group("unit"))
+            rest = remainder
+    amount = text[:len(text) - len(rest)].strip()
+    rest = _OF_RE.sub("", rest, count=1)
+    return quantity, unit, amount, rest
+
+
+# Recipe corpora repeat the same lines ("1 tsp salt") constantly
+@lru_cache(maxsize=1 << 16)
+def parse_ingredient(text: str, amount: Optional[str] = None) -> ParsedIngredient:
+    """
+    Parse an ingredient line such as "2 1/2 cups all-purpose flour, sifted".
+
+    When the quantity arrives separately (``{"item": "Spaghetti", "amount":
+    "400g"}``) pass it as ``amount``; ``text`` is then treated as the name.
+    """
+    text = " ".join((text or "").split())
+    notes = []
+
+    if amount and amount.strip():
+        quantity, unit, _, rest = _split_quantity(amount.strip())
+        if quantity is None and unit is None and rest:
+            notes.append(rest.strip())  # "To taste"
+        elif quantity is not None and unit is None:
+            # "200 gms" with an unknown unit must not become 200 items; it is
+            # kept as written and only adds up with the same spelling
+            bare = _BARE_WORD_RE.match(rest)
+            if bare and bare.group("word").lower() not in _COUNT_WORDS:
+                unit = _singular(bare.group("word").lower())[:20]
+        amount_text = amount.strip()
+        name = text
+    else:
+        part_of = _PART_OF_RE.match(text)
+        if part_of:
+            # "Juice of 1 lemon" -> 1 lemon juice
+            quantity, unit, _, rest = _split_quantity(part_of.group("rest"))
+            name = f"{canonical_name(rest)} {part_of.group('part').lower()}"
+            amount_text = part_of.group("rest")[:len(part_of.group("rest")) - len(rest)].strip()
+        else:
+            quantity, unit, amount_text, name = _split_quantity(text, bare_unit_is_name=True)
+
+    notes.extend(note.strip() for note in _PARENS_RE.findall(name) if note.strip())
+    name = _PARENS_RE.sub(" ", name)
+    if "," in name:
+        name, _, note = name.partition(",")
+        if note.strip():
+            notes.append(note.strip())
+    trailing = _TRAILING_NOTE_RE.search(name)
+    if trailing:
+        notes.append(trailing.group("note"))
+        name = name[:trailing.start()]
+    name = " ".join(name.split()).strip(" ,.-")
+
+    return ParsedIngredient(
+        quantity=round(quantity, 4) if quantity is not None else None,
+        unit=unit,
+        name=name[:200],
+        canonical_name=canonical_name(name),
+        amount=amount_text[:100],
+        notes="; ".join(notes)[:200],
+    )
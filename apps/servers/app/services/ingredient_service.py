@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import UPSERT_INSERTS
+from app.models.recipe import Ingredient
+from app.services.search_service import INDEX_BATCH_SIZE
+
+
+class IngredientService:
+    """
+    Maps canonical ingredient names to ``ingredients`` ids. Resolved ids are
+    cached on the instance, so a long-lived service (one per ingestion run)
+    only queries for names it has not seen yet.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._ids: Dict[str, int] = {}
+
+    async def _select_ids(self, names: List[str]) -> None:
+        for start in range(0, len(names), INDEX_BATCH_SIZE):
+            result = await self.db.execute(
+                select(Ingredient.name, Ingredient.id).where(Ingredient.name.in_(names[start:start + INDEX_BATCH_SIZE]))
+            )
+            self._ids.update(result.tuples().all())
+
+    async def lookup_ids(self, names: Iterable[str]) -> Dict[str, int]:
+        """Ids of the ingredients among ``names`` that exist; unknown names are left out"""
+        wanted = {name for name in names if name}
+        missing = sorted(wanted - self._ids.keys())
+        if missing:
+            await self._select_ids(missing)
+        return {name: self._ids[name] for name in wanted if name in self._ids}
+
+    async def resolve_ids(self, names: Iterable[str]) -> Dict[str, int]:
+        """Ids for every name in ``names``, inserting ingredients that do not exist yet"""
+        wanted = {name for name in names if name}
+        ids = await self.lookup_ids(wanted)
+        new = sorted(wanted - ids.keys())
+        if new:
+            insert = UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+            if insert is not None:
+                # A concurrent writer may have added the same name in the meantime
+                stmt = insert(Ingredient.__table__).on_conflict_do_nothing(index_elements=["name"])
+            else:
+                stmt = Ingredient.__table__.insert()
+            await self.db.execute(stmt, [{"name": name} for name in new])
+            await self._select_ids(new)
+            ids.update((name, self._ids[name]) for name in new)
+        return ids
+
+    def forget(self) -> None:
+        """Drop cached ids, e.g. after a rollback discarded newly inserted ingredients"""
+        self._ids.clear()
@@ -1,223 +1,693 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta
+import json
+import math
+import os
+from functools import lru_cache
+from sqlalchemy import (
+    DateTime, Float, Integer, String, and_, bindparam, case, cast, func, insert, literal, select, delete,
+    type_coerce, union_all, update
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import date, datetime, time, timedelta
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.database import UPSERT_INSERTS
 from app.models.meal_plan import MealPlan, PlannedMeal, ShoppingList, ShoppingListItem
+from app.models.recipe import Ingredient, Recipe, RecipeIngredient
+from app.services.ingredient_parser import BASE_UNITS, COUNT_UNIT
+from app.services.nutrition_service import NutritionService
 from app.schemas.meal_plan import (
-    MealPlanCreate, MealPlanUpdate, PlannedMealCreate, PlannedMealUpdate,
-    ShoppingListCreate, ShoppingListItemCreate, NutritionSummary
+    CalendarDay, CalendarMeal, MealPlanCreate, MealPlanFromTemplate, MealPlanTemplate, MealPlanUpdate, MealType,
+    PlannedMealCreate, PlannedMealUpdate, ShoppingListCreate, ShoppingListItemCreate, NutritionSummary, WeekCopy
 )
 
+# Larger base units used when displaying shopping list quantities
+DISPLAY_UNITS = {"g": ("kg", 1000.0), "ml": ("l", 1000.0)}
+# Planned meal fields that change what goes on the shopping list
+SHOPPING_FIELDS = {"recipe_id", "servings"}
+# Residue left by adding and subtracting float totals
+QUANTITY_EPSILON = 1e-6
+# Longest range one calendar request may cover, in days
+MAX_CALENDAR_DAYS = 366
+# Rows fetched per round trip while streaming the calendar
+CALENDAR_BATCH_SIZE = 500
+MEAL_TYPE_ORDER = {meal_type.value: position for position, meal_type in enumerate(MealType)}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+# Planned meal columns written by INSERT ... SELECT
+PLANNED_MEAL_COLUMNS = ["meal_plan_id", "recipe_id", "meal_date", "meal_type", "servings", "notes"]
+# (weekday, meal type, recipe key, recipe title) of one meal in a template
+TemplateSlot = Tuple[int, str, Optional[str], str]
+
+
+def _ingredient_totals(*criteria):
+    """
+    One grouped query over planned meals x recipe ingredients: the amount of
+    every ingredient needed, per base unit, with each recipe scaled from its
+    own servings to the planned servings. ``criteria`` select the planned meals.
+    """
+    unit = RecipeIngredient.unit
+    factor = case({name: factor for name, (_, factor) in BASE_UNITS.items()}, value=unit, else_=1.0)
+    base_unit = case(
+        {name: base for name, (base, _) in BASE_UNITS.items()},
+        value=unit, else_=func.coalesce(unit, COUNT_UNIT)
+    )
+    planned_servings = func.coalesce(PlannedMeal.servings, 1)
+    # A recipe without servings is taken to be sized for the planned servings
+    scale = cast(planned_servings, Float) / func.coalesce(Recipe.servings, planned_servings)
+    return (
+        select(
+            RecipeIngredient.ingredient_id,
+            Ingredient.name,
+            base_unit.label("unit"),
+            func.sum(RecipeIngredient.quantity * factor * scale).label("total"),
+            func.count().label("uses"),
+        )
+        .select_from(PlannedMeal)
+        .join(Recipe, Recipe.id == PlannedMeal.recipe_id)
+        .join(RecipeIngredient, RecipeIngredient.recipe_id == PlannedMeal.recipe_id)
+        .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+        .where(*criteria)
+        .group_by(RecipeIngredient.ingredient_id, Ingredient.name, base_unit)
+    )
+
+
+def _format_quantity(total: Optional[float], unit: str) -> Optional[str]:
+    """Human-readable quantity, e.g. 1250 g -> "1.25 kg"; counted items round up"""
+    if total is None:
+        return None
+    counted = unit not in DISPLAY_UNITS
+    if counted:
+        total = math.ceil(total - 1e-9)
+    elif total >= DISPLAY_UNITS[unit][1]:
+        unit, divisor = DISPLAY_UNITS[unit]
+        total /= divisor
+    number = f"{total:.2f}".rstrip("0").rstrip(".")
+    if unit == COUNT_UNIT:
+        return number
+    if counted and total > 1:
+        unit += "es" if unit.endswith(("ch", "sh")) else "s"
+    return f"{number} {unit}"
+
+
+def _shopping_items(rows, sign: int = 1) -> List[Dict[str, Any]]:
+    """Shopping list item values from ``_ingredient_totals`` rows, negated for ``sign=-1``"""
+    return [
+        {
+            "ingredient_id": row.ingredient_id,
+            "ingredient_name": row.name,
+            "base_quantity": sign * row.total if row.total is not None else None,
+            "quantity": _format_quantity(row.total, row.unit),
+            "unit": row.unit,
+            "uses": sign * row.uses,
+        }
+        for row in rows
+    ]
+
+
+@lru_cache(maxsize=1)
+def get_meal_plan_templates() -> Dict[str, Dict[str, Any]]:
+    """Meal plan templates by id, loaded from ``MEAL_PLAN_TEMPLATES_PATH`` on first use"""
+    if not os.path.exists(settings.MEAL_PLAN_TEMPLATES_PATH):
+        return {}
+    with open(settings.MEAL_PLAN_TEMPLATES_PATH, encoding="utf-8") as fp:
+        data = json.load(fp)
+    return {
+        str(template["id"]): template
+        for template in data.get("weekly_meal_plans", [])
+        if isinstance(template, dict) and template.get("id")
+    }
+
+
+def _template_slots(template: Dict[str, Any]) -> List[TemplateSlot]:
+    """Every meal of a template's ``meal_plan`` that names a recipe title"""
+    days = template.get("meal_plan")
+    slots: List[TemplateSlot] = []
+    for day_name, meals in (days.items() if isinstance(days, dict) else ()):
+        if day_name.lower() not in WEEKDAYS or not isinstance(meals, dict):
+            continue
+        for meal_type, meal in meals.items():
+            if meal_type in MEAL_TYPE_ORDER and isinstance(meal, dict) and meal.get("title"):
+                key = meal.get("recipe_id")
+                slots.append((WEEKDAYS.index(day_name.lower()), meal_type, str(key) if key else None, meal["title"]))
+    return slots
+
+
+def _calendar_day(day: date, meals: List[CalendarMeal]) -> CalendarDay:
+    """Meals of one day, breakfast to snack"""
+    meals.sort(key=lambda meal: (MEAL_TYPE_ORDER.get(meal.meal_type, len(MEAL_TYPE_ORDER)), meal.meal_date, meal.id))
+    return CalendarDay(day=day, meals=meals)
+
+
 class MealPlanService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_meal_plan(self, meal_plan_data: MealPlanCreate, user_id: int) -> MealPlan:
+    async def create_meal_plan(self, meal_plan_data: MealPlanCreate, user_id: int) -> MealPlan:
         """Create a new meal plan for a user"""
         meal_plan = MealPlan(
             **meal_plan_data.dict(),
-            user_id=user_id
+            user_id=user_id,
+            planned_meals=[]
         )
         self.db.add(meal_plan)
-        self.db.commit()
-        self.db.refresh(meal_plan)
+        await self.db.commit()
         return meal_plan
 
-    def get_meal_plans(self, user_id: int, skip: int = 0, limit: int = 100) -> List[MealPlan]:
-        """Get all meal plans for a user"""
-        return self.db.query(MealPlan).filter(
-            MealPlan.user_id == user_id
-        ).offset(skip).limit(limit).all()
+    async def get_meal_plans(
+        self, user_id: int, skip: int = 0, limit: int = 100, include_recipes: bool = False
+    ) -> List[MealPlan]:
+        """
+        Get a page of meal plans for a user. Planned meals (and their recipes)
+        come from one IN query per relationship, whatever the page size.
+        """
+        meals = selectinload(MealPlan.planned_meals)
+        if include_recipes:
+            meals = meals.selectinload(PlannedMeal.recipe)
+        result = await self.db.execute(
+            select(MealPlan)
+            .options(meals)
+            .where(MealPlan.user_id == user_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
 
-    def get_meal_plan(self, meal_plan_id: int, user_id: int) -> Optional[MealPlan]:
-        """Get a specific meal plan by ID"""
-        return self.db.query(MealPlan).filter(
-            MealPlan.id == meal_plan_id,
-            MealPlan.user_id == user_id
-        ).first()
+    async def get_meal_plan(self, meal_plan_id: int, user_id: int, include_recipes: bool = False) -> Optional[MealPlan]:
+        """Get a specific meal plan by ID, joined to its planned meals (and their recipes) in one query"""
+        meals = joinedload(MealPlan.planned_meals)
+        if include_recipes:
+            meals = meals.joinedload(PlannedMeal.recipe)
+        result = await self.db.execute(
+            select(MealPlan)
+            .options(meals)
+            .where(
+                MealPlan.id == meal_plan_id,
+                MealPlan.user_id == user_id
+            )
+        )
+        return result.unique().scalars().first()
+
+    def calendar(self, user_id: int, start: date, end: date) -> AsyncIterator[CalendarDay]:
+        """
+        The user's planned meals from ``start`` to ``end`` (inclusive) across
+        all of their plans, one day at a time. The range is checked here,
+        before anything is streamed.
+        """
+        if end < start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'to' must not be before 'from'"
+            )
+        if (end - start).days >= MAX_CALENDAR_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Calendar range is limited to {MAX_CALENDAR_DAYS} days"
+            )
+        return self._calendar_days(user_id, start, end)
+
+    async def _calendar_days(self, user_id: int, start: date, end: date) -> AsyncIterator[CalendarDay]:
+        # The user's plans come from ix_meal_plans_user_dates and each plan's
+        # meals from a range scan on ix_planned_meals_plan_date_type. Plans are
+        # not filtered by their own dates: meal dates are not constrained to them.
+        query = (
+            select(
+                PlannedMeal.id, PlannedMeal.meal_plan_id, MealPlan.name.label("meal_plan_name"),
+                PlannedMeal.recipe_id, Recipe.name.label("recipe_name"), Recipe.image_url.label("recipe_image_url"),
+                PlannedMeal.meal_date, PlannedMeal.meal_type, PlannedMeal.servings, PlannedMeal.notes
+            )
+            .select_from(MealPlan)
+            .join(PlannedMeal, PlannedMeal.meal_plan_id == MealPlan.id)
+            .join(Recipe, Recipe.id == PlannedMeal.recipe_id)
+            .where(
+                MealPlan.user_id == user_id,
+                PlannedMeal.meal_date >= datetime.combine(start, time.min),
+                PlannedMeal.meal_date < datetime.combine(end + timedelta(days=1), time.min)
+            )
+            .order_by(PlannedMeal.meal_date, PlannedMeal.id)
+            .execution_options(yield_per=CALENDAR_BATCH_SIZE)
+        )
+        result = await self.db.stream(query)
+        day, meals = None, []
+        async for row in result.mappings():
+            meal_day = row["meal_date"].date()
+            if meal_day != day and meals:
+                yield _calendar_day(day, meals)
+                meals = []
+            day = meal_day
+            meals.append(CalendarMeal(**row))
+        if meals:
+            yield _calendar_day(day, meals)
 
-    def update_meal_plan(self, meal_plan_id: int, user_id: int, update_data: MealPlanUpdate) -> Optional[MealPlan]:
+    async def update_meal_plan(self, meal_plan_id: int, user_id: int, update_data: MealPlanUpdate) -> Optional[MealPlan]:
         """Update an existing meal plan"""
-        meal_plan = self.get_meal_plan(meal_plan_id, user_id)
+        meal_plan = await self.get_meal_plan(meal_plan_id, user_id)
         if not meal_plan:
             return None
-        
+
         update_dict = update_data.dict(exclude_unset=True)
         for field, value in update_dict.items():
             setattr(meal_plan, field, value)
-        
+
         meal_plan.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(meal_plan)
+        await self.db.commit()
         return meal_plan
 
-    def delete_meal_plan(self, meal_plan_id: int, user_id: int) -> bool:
+    async def delete_meal_plan(self, meal_plan_id: int, user_id: int) -> bool:
         """Delete a meal plan"""
-        meal_plan = self.get_meal_plan(meal_plan_id, user_id)
+        meal_plan = await self.get_meal_plan(meal_plan_id, user_id)
         if not meal_plan:
             return False
-        
-        self.db.delete(meal_plan)
-        self.db.commit()
+
+        await self.db.delete(meal_plan)
+        await self.db.commit()
         return True
 
-    def add_planned_meal(self, meal_plan_id: int, user_id: int, planned_meal_data: PlannedMealCreate) -> Optional[PlannedMeal]:
-        """Add a meal to a meal plan"""
-        meal_plan = self.get_meal_plan(meal_plan_id, user_id)
-        if not meal_plan:
+    async def add_planned_meal(self, meal_plan_id: int, user_id: int, planned_meal_data: PlannedMealCreate) -> Optional[PlannedMeal]:
+        """Add a meal to a meal plan and its ingredients to the plan's shopping list"""
+        if not await self._owns(meal_plan_id, user_id):
             return None
-        
+        await self._check_recipes([planned_meal_data.recipe_id])
+
         planned_meal = PlannedMeal(
             **planned_meal_data.dict(),
             meal_plan_id=meal_plan_id
         )
         self.db.add(planned_meal)
-        self.db.commit()
-        self.db.refresh(planned_meal)
+        await self.db.flush()
+        await self._apply_shopping_delta(planned_meal.meal_plan_id, [planned_meal.id], 1)
+        await self.db.commit()
+        await self.db.refresh(planned_meal)
         return planned_meal
 
-    def get_planned_meals(self, meal_plan_id: int, user_id: int) -> List[PlannedMeal]:
+    async def get_planned_meals(self, meal_plan_id: int, user_id: int, include_recipes: bool = False) -> List[PlannedMeal]:
         """Get all planned meals for a meal plan"""
-        meal_plan = self.get_meal_plan(meal_plan_id, user_id)
-        if not meal_plan:
-            return []
-        
-        return self.db.query(PlannedMeal).filter(
-            PlannedMeal.meal_plan_id == meal_plan_id
-        ).all()
-
-    def update_planned_meal(self, planned_meal_id: int, user_id: int, update_data: PlannedMealUpdate) -> Optional[PlannedMeal]:
-        """Update a planned meal"""
-        planned_meal = self.db.query(PlannedMeal).join(MealPlan).filter(
-            PlannedMeal.id == planned_meal_id,
+        query = select(PlannedMeal).join(MealPlan).where(
+            PlannedMeal.meal_plan_id == meal_plan_id,
             MealPlan.user_id == user_id
-        ).first()
-        
+        )
+        if include_recipes:
+            query = query.options(selectinload(PlannedMeal.recipe))
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def add_planned_meals(
+        self, meal_plan_id: int, user_id: int, meals: List[PlannedMealCreate]
+    ) -> Optional[List[PlannedMeal]]:
+        """Add many meals to a meal plan with one multi-row INSERT, in one transaction"""
+        if not await self._owns(meal_plan_id, user_id):
+            return None
+        await self._check_recipes(meal.recipe_id for meal in meals)
+
+        result = await self.db.execute(
+            insert(PlannedMeal).returning(PlannedMeal),
+            [{**meal.dict(), "meal_plan_id": meal_plan_id} for meal in meals]
+        )
+        planned_meals = list(result.scalars().all())
+        await self._apply_shopping_delta(meal_plan_id, [meal.id for meal in planned_meals], 1)
+        await self.db.commit()
+        return planned_meals
+
+    async def copy_week(self, meal_plan_id: int, user_id: int, copy: WeekCopy) -> Optional[List[PlannedMeal]]:
+        """
+        Copy the meals of one week of a plan into another week with a single
+        INSERT ... SELECT; the plan is extended to cover the target week.
+        """
+        result = await self.db.execute(
+            select(MealPlan).where(MealPlan.id == meal_plan_id, MealPlan.user_id == user_id)
+        )
+        meal_plan = result.scalars().first()
+        if not meal_plan:
+            return None
+
+        to_week = copy.to_week or copy.from_week + 1
+        if to_week == copy.from_week:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Source and target week must differ"
+            )
+        first_day = datetime.combine(meal_plan.start_date.date(), time.min)
+        source = first_day + timedelta(weeks=copy.from_week - 1)
+        target = first_day + timedelta(weeks=to_week - 1)
+
+        def in_week(start: datetime):
+            return and_(
+                PlannedMeal.meal_plan_id == meal_plan_id,
+                PlannedMeal.meal_date >= start,
+                PlannedMeal.meal_date < start + timedelta(weeks=1)
+            )
+
+        if copy.replace:
+            result = await self.db.execute(select(PlannedMeal.id).where(in_week(target)))
+            replaced = list(result.scalars().all())
+            await self._apply_shopping_delta(meal_plan_id, replaced, -1)
+            await self.db.execute(delete(PlannedMeal).where(PlannedMeal.id.in_(replaced)))
+
+        rows = select(
+            PlannedMeal.meal_plan_id, PlannedMeal.recipe_id, self._shift_days(PlannedMeal.meal_date, (target - source).days),
+            PlannedMeal.meal_type, PlannedMeal.servings, PlannedMeal.notes
+        ).where(in_week(source))
+        result = await self.db.execute(
+            insert(PlannedMeal).from_select(PLANNED_MEAL_COLUMNS, rows).returning(PlannedMeal)
+        )
+        planned_meals = list(result.scalars().all())
+        await self._apply_shopping_delta(meal_plan_id, [meal.id for meal in planned_meals], 1)
+
+        last_day = target + timedelta(days=6)
+        if meal_plan.end_date < last_day:
+            meal_plan.end_date = last_day
+            meal_plan.updated_at = datetime.utcnow()
+        await self.db.commit()
+        return planned_meals
+
+    def _shift_days(self, column, days: int):
+        """``column`` moved by whole days, in SQL"""
+        if self.db.get_bind().dialect.name == "sqlite":
+            # SQLite keeps DateTime as "YYYY-MM-DD HH:MM:SS.ffffff" text: shift the
+            # date and time, then put the fraction back so the stored format holds
+            shifted = func.strftime("%Y-%m-%d %H:%M:%S", column, f"{days:+d} days").concat(func.substr(column, 20))
+            return type_coerce(shifted, DateTime)
+        return column + timedelta(days=days)
+
+    def get_templates(self) -> List[MealPlanTemplate]:
+        """The meal plan templates that can be instantiated"""
+        templates = []
+        for template_id, template in get_meal_plan_templates().items():
+            slots = _template_slots(template)
+            templates.append(MealPlanTemplate(
+                id=template_id,
+                title=template.get("title") or template_id,
+                description=template.get("description"),
+                duration=template.get("duration"),
+                days=len({slot[0] for slot in slots}),
+                meals=len(slots)
+            ))
+        return templates
+
+    async def create_from_template(self, data: MealPlanFromTemplate, user_id: int) -> MealPlan:
+        """
+        Create a meal plan from a template with one INSERT ... SELECT over the
+        template's meals. Each template day lands on the first date from
+        ``start_date`` with that weekday; each meal's recipe is found by title,
+        preferring the catalog entry whose source id ends in the template's
+        recipe id. Meals whose recipe is not in the catalog are left out.
+        """
+        template = get_meal_plan_templates().get(data.template_id)
+        if template is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Meal plan template not found"
+            )
+        slots = _template_slots(template)
+        if not slots:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Meal plan template has no meals"
+            )
+
+        start = datetime.combine(data.start_date, time.min)
+        offsets = {weekday: (weekday - start.weekday()) % 7 for weekday, _, _, _ in slots}
+        meal_plan = MealPlan(
+            name=data.name or template.get("title") or data.template_id,
+            description=template.get("description"),
+            user_id=user_id,
+            start_date=start,
+            end_date=start + timedelta(days=max(offsets.values())),
+            is_public=data.is_public
+        )
+        self.db.add(meal_plan)
+        await self.db.flush()
+
+        slot_rows = union_all(*[
+            select(
+                literal(start + timedelta(days=offsets[weekday]), DateTime).label("meal_date"),
+                literal(meal_type, String).label("meal_type"),
+                literal(key, String).label("recipe_key"),
+                literal(title, String).label("title")
+            )
+            for weekday, meal_type, key, title in slots
+        ]).cte("slots")
+        by_title = select(func.min(Recipe.id)).where(Recipe.name == slot_rows.c.title)
+        recipe_id = func.coalesce(
+            by_title.where(Recipe.source_id.like(literal("%#").concat(slot_rows.c.recipe_key))).scalar_subquery(),
+            by_title.scalar_subquery()
+        )
+        resolved = select(slot_rows.c.meal_date, slot_rows.c.meal_type, recipe_id.label("recipe_id")).subquery()
+        rows = select(
+            literal(meal_plan.id, Integer), resolved.c.recipe_id, resolved.c.meal_date, resolved.c.meal_type,
+            literal(data.servings, Integer), literal(None, String)
+        ).where(resolved.c.recipe_id.is_not(None))
+        await self.db.execute(insert(PlannedMeal).from_select(PLANNED_MEAL_COLUMNS, rows))
+        await self.db.commit()
+        return await self.get_meal_plan(meal_plan.id, user_id)
+
+    async def _owns(self, meal_plan_id: int, user_id: int) -> bool:
+        """Whether the meal plan exists and belongs to the user"""
+        result = await self.db.execute(
+            select(MealPlan.id).where(MealPlan.id == meal_plan_id, MealPlan.user_id == user_id)
+        )
+        return result.scalar() is not None
+
+    async def _check_recipes(self, recipe_ids: Iterable[int]) -> None:
+        """Refuse planned meals of recipes that do not exist, checking every id in one query"""
+        wanted = set(recipe_ids)
+        result = await self.db.execute(select(Recipe.id).where(Recipe.id.in_(wanted)))
+        missing = sorted(wanted - set(result.scalars().all()))
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Recipe not found: {', '.join(map(str, missing))}"
+            )
+
+    async def _get_owned_planned_meal(self, planned_meal_id: int, user_id: int) -> Optional[PlannedMeal]:
+        """Get a planned meal only if its meal plan belongs to the user"""
+        result = await self.db.execute(
+            select(PlannedMeal).join(MealPlan).where(
+                PlannedMeal.id == planned_meal_id,
+                MealPlan.user_id == user_id
+            )
+        )
+        return result.scalars().first()
+
+    async def update_planned_meal(self, planned_meal_id: int, user_id: int, update_data: PlannedMealUpdate) -> Optional[PlannedMeal]:
+        """Update a planned meal, moving its shopping list contribution if the recipe or servings change"""
+        planned_meal = await self._get_owned_planned_meal(planned_meal_id, user_id)
+
         if not planned_meal:
             return None
-        
+
         update_dict = update_data.dict(exclude_unset=True)
+        if update_dict.get("recipe_id") is not None:
+            await self._check_recipes([update_dict["recipe_id"]])
+        changes_list = any(
+            getattr(planned_meal, field) != value
+            for field, value in update_dict.items() if field in SHOPPING_FIELDS
+        )
+        if changes_list:
+            await self._apply_shopping_delta(planned_meal.meal_plan_id, [planned_meal.id], -1)
         for field, value in update_dict.items():
             setattr(planned_meal, field, value)
-        
-        self.db.commit()
-        self.db.refresh(planned_meal)
+        if changes_list:
+            await self.db.flush()
+            await self._apply_shopping_delta(planned_meal.meal_plan_id, [planned_meal.id], 1)
+
+        await self.db.commit()
+        await self.db.refresh(planned_meal)
         return planned_meal
 
-    def delete_planned_meal(self, planned_meal_id: int, user_id: int) -> bool:
-        """Delete a planned meal"""
-        planned_meal = self.db.query(PlannedMeal).join(MealPlan).filter(
-            PlannedMeal.id == planned_meal_id,
-            MealPlan.user_id == user_id
-        ).first()
-        
+    async def delete_planned_meal(self, planned_meal_id: int, user_id: int) -> bool:
+        """Delete a planned meal and take its ingredients off the shopping list"""
+        planned_meal = await self._get_owned_planned_meal(planned_meal_id, user_id)
+
         if not planned_meal:
             return False
-        
-        self.db.delete(planned_meal)
-        self.db.commit()
+
+        await self._apply_shopping_delta(planned_meal.meal_plan_id, [planned_meal.id], -1)
+        await self.db.delete(planned_meal)
+        await self.db.commit()
         return True
 
-    def generate_shopping_list(self, meal_plan_id: int, user_id: int) -> Optional[ShoppingList]:
-        """Generate a shopping list from a meal plan"""
-        meal_plan = self.get_meal_plan(meal_plan_id, user_id)
+    async def forget_recipes(self, recipe_ids: Sequence[int]) -> None:
+        """
+        Remove the planned meals of recipes about to be deleted, from every
+        plan, taking them off the shopping lists; in the caller's transaction
+        """
+        if not recipe_ids:
+            return
+        result = await self.db.execute(
+            select(PlannedMeal.meal_plan_id, PlannedMeal.id).where(PlannedMeal.recipe_id.in_(recipe_ids))
+        )
+        by_plan: Dict[int, List[int]] = {}
+        for meal_plan_id, planned_meal_id in result:
+            by_plan.setdefault(meal_plan_id, []).append(planned_meal_id)
+        for meal_plan_id, planned_meal_ids in by_plan.items():
+            await self._apply_shopping_delta(meal_plan_id, planned_meal_ids, -1)
+        if by_plan:
+            await self.db.execute(delete(PlannedMeal).where(PlannedMeal.recipe_id.in_(recipe_ids)))
+
+    async def _apply_shopping_delta(self, meal_plan_id: int, planned_meal_ids: Sequence[int], sign: int) -> None:
+        """
+        Add (``sign=1``) or subtract (``sign=-1``) the ingredients of some of a
+        plan's meals on its existing shopping list, in the caller's transaction.
+        Purchase flags are untouched; items no meal needs any more are removed.
+        """
+        if not planned_meal_ids:
+            return
+        result = await self.db.execute(
+            update(ShoppingList)
+            .where(ShoppingList.meal_plan_id == meal_plan_id)
+            .values(updated_at=datetime.utcnow())
+            .returning(ShoppingList.id)
+        )
+        shopping_list_id = result.scalar()
+        if shopping_list_id is None:
+            return
+
+        rows = (await self.db.execute(_ingredient_totals(PlannedMeal.id.in_(planned_meal_ids)))).all()
+        if not rows:
+            return
+        insert = UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if insert is None:
+            # No ON CONFLICT support: fall back to rebuilding the whole list
+            await self._rebuild_items(shopping_list_id, meal_plan_id)
+            return
+
+        table = ShoppingListItem.__table__
+        stmt = insert(table)
+        current, delta = table.c.base_quantity, stmt.excluded.base_quantity
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.shopping_list_id, table.c.ingredient_id, table.c.unit],
+            set_={
+                "base_quantity": case(
+                    (and_(current.is_(None), delta.is_(None)), None),
+                    else_=func.coalesce(current, 0.0) + func.coalesce(delta, 0.0)
+                ),
+                "uses": table.c.uses + stmt.excluded.uses,
+            }
+        ).returning(table.c.id, table.c.base_quantity, table.c.unit, table.c.uses)
+        result = await self.db.execute(stmt, [
+            {**item, "shopping_list_id": shopping_list_id, "is_purchased": False}
+            for item in _shopping_items(rows, sign)
+        ])
+
+        # Refresh the display quantity of the touched items and drop the ones
+        # no planned meal uses any more
+        emptied, quantities = [], []
+        for item_id, total, unit, uses in result.all():
+            if uses <= 0:
+                emptied.append(item_id)
+            else:
+                if total is not None and abs(total) < QUANTITY_EPSILON:
+                    # Only unmeasured uses ("to taste") are left
+                    total = None
+                quantities.append({"item_id": item_id, "total": total, "display": _format_quantity(total, unit)})
+        if emptied:
+            await self.db.execute(delete(ShoppingListItem).where(ShoppingListItem.id.in_(emptied)))
+        if quantities:
+            await self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam("item_id"))
+                .values(base_quantity=bindparam("total"), quantity=bindparam("display")),
+                quantities
+            )
+
+    async def _load_shopping_list(self, meal_plan_id: int) -> Optional[ShoppingList]:
+        """Load the shopping list of a meal plan together with its items"""
+        result = await self.db.execute(
+            select(ShoppingList)
+            .options(selectinload(ShoppingList.items))
+            .where(ShoppingList.meal_plan_id == meal_plan_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def _rebuild_items(self, shopping_list_id: int, meal_plan_id: int) -> None:
+        """Replace a shopping list's items with freshly aggregated ones, keeping purchase flags"""
+        result = await self.db.execute(
+            select(ShoppingListItem.ingredient_id, ShoppingListItem.unit).where(
+                ShoppingListItem.shopping_list_id == shopping_list_id,
+                ShoppingListItem.is_purchased == True
+            )
+        )
+        purchased = set(result.tuples().all())
+        await self.db.execute(
+            delete(ShoppingListItem).where(ShoppingListItem.shopping_list_id == shopping_list_id)
+        )
+
+        rows = (await self.db.execute(_ingredient_totals(PlannedMeal.meal_plan_id == meal_plan_id))).all()
+        items = _shopping_items(rows)
+        if items:
+            await self.db.execute(ShoppingListItem.__table__.insert(), [
+                {
+                    **item,
+                    "shopping_list_id": shopping_list_id,
+                    "is_purchased": (item["ingredient_id"], item["unit"]) in purchased,
+                }
+                for item in items
+            ])
+
+    async def generate_shopping_list(self, meal_plan_id: int, user_id: int) -> Optional[ShoppingList]:
+        """
+        (Re)build the shopping list of a meal plan: ingredient totals come from
+        a single grouped query and the items are bulk-inserted in one transaction.
+        Planned meal changes keep an existing list current on their own.
+        """
+        result = await self.db.execute(
+            select(MealPlan).where(MealPlan.id == meal_plan_id, MealPlan.user_id == user_id)
+        )
+        meal_plan = result.scalars().first()
         if not meal_plan:
             return None
-        
-        # Check if shopping list already exists
-        existing_list = self.db.query(ShoppingList).filter(
-            ShoppingList.meal_plan_id == meal_plan_id
-        ).first()
-        
-        if existing_list:
-            # Delete existing items to regenerate
-            self.db.query(ShoppingListItem).filter(
-                ShoppingListItem.shopping_list_id == existing_list.id
-            ).delete()
-            shopping_list = existing_list
+
+        result = await self.db.execute(
+            select(ShoppingList).where(ShoppingList.meal_plan_id == meal_plan_id)
+        )
+        shopping_list = result.scalars().first()
+
+        if shopping_list:
+            shopping_list.updated_at = datetime.utcnow()
         else:
-            # Create new shopping list
             shopping_list = ShoppingList(
                 meal_plan_id=meal_plan_id,
                 name=f"Shopping List for {meal_plan.name}"
             )
             self.db.add(shopping_list)
-            self.db.commit()
-            self.db.refresh(shopping_list)
-        
-        # Group ingredients by name and sum quantities
-        ingredient_groups = {}
-        
-        for planned_meal in meal_plan.planned_meals:
-            # This would need to be implemented based on your Recipe model
-            # For now, we'll create sample ingredients
-            sample_ingredients = [
-                {"name": f"Ingredient for {planned_meal.recipe_id}", "quantity": f"{planned_meal.servings}", "unit": "servings", "category": "General"}
-            ]
-            
-            for ingredient in sample_ingredients:
-                name = ingredient["name"]
-                if name in ingredient_groups:
-                    # Simple quantity addition (in real implementation, this would be more sophisticated)
-                    current_qty = int(ingredient_groups[name]["quantity"])
-                    new_qty = int(ingredient["quantity"])
-                    ingredient_groups[name]["quantity"] = str(current_qty + new_qty)
-                else:
-                    ingredient_groups[name] = ingredient
-        
-        # Create shopping list items
-        for ingredient_name, ingredient_data in ingredient_groups.items():
-            item = ShoppingListItem(
-                shopping_list_id=shopping_list.id,
-                ingredient_name=ingredient_name,
-                quantity=ingredient_data["quantity"],
-                unit=ingredient_data["unit"],
-                category=ingredient_data["category"]
-            )
-            self.db.add(item)
-        
-        self.db.commit()
-        self.db.refresh(shopping_list)
-        return shopping_list
-
-    def get_shopping_list(self, meal_plan_id: int, user_id: int) -> Optional[ShoppingList]:
+        await self.db.flush()
+
+        await self._rebuild_items(shopping_list.id, meal_plan_id)
+        await self.db.commit()
+        return await self._load_shopping_list(meal_plan_id)
+
+    async def get_shopping_list(self, meal_plan_id: int, user_id: int) -> Optional[ShoppingList]:
         """Get shopping list for a meal plan"""
-        meal_plan = self.get_meal_plan(meal_plan_id, user_id)
+        meal_plan = await self.get_meal_plan(meal_plan_id, user_id)
         if not meal_plan:
             return None
-        
-        return self.db.query(ShoppingList).filter(
-            ShoppingList.meal_plan_id == meal_plan_id
-        ).first()
 
-    def update_shopping_item(self, item_id: int, user_id: int, is_purchased: bool) -> Optional[ShoppingListItem]:
+        return await self._load_shopping_list(meal_plan_id)
+
+    async def update_shopping_item(self, item_id: int, user_id: int, is_purchased: bool) -> Optional[ShoppingListItem]:
         """Mark a shopping list item as purchased/unpurchased"""
-        item = self.db.query(ShoppingListItem).join(ShoppingList).join(MealPlan).filter(
-            ShoppingListItem.id == item_id,
-            MealPlan.user_id == user_id
-        ).first()
-        
+        result = await self.db.execute(
+            select(ShoppingListItem).join(ShoppingList).join(MealPlan).where(
+                ShoppingListItem.id == item_id,
+                MealPlan.user_id == user_id
+            )
+        )
+        item = result.scalars().first()
+
         if not item:
             return None
-        
+
         item.is_purchased = is_purchased
-        self.db.commit()
-        self.db.refresh(item)
+        await self.db.commit()
+        await self.db.refresh(item)
         return item
 
-    def get_nutrition_summary(self, meal_plan_id: int, user_id: int) -> Optional[NutritionSummary]:
-        """Get nutrition summary for a meal plan"""
-        meal_plan = self.get_meal_plan(meal_plan_id, user_id)
-        if not meal_plan:
+    async def get_nutrition_summary(self, meal_plan_id: int, user_id: int) -> Optional[NutritionSummary]:
+        """Get nutrition totals for a meal plan, with per-day and per-meal-type breakdowns"""
+        if not await self._owns(meal_plan_id, user_id):
             return None
-        
-        # This would calculate actual nutrition based on recipes
-        # For now, returning mock data
-        total_meals = len(meal_plan.planned_meals)
-        
-        return NutritionSummary(
-            total_calories=total_meals * 350,  # Mock calculation
-            total_protein=total_meals * 25,
-            total_carbs=total_meals * 45,
-            total_fat=total_meals * 15,
-            meals_count=total_meals
-        )
\ No newline at end of file
+
+        summaries = await NutritionService(self.db).meal_plan_summaries([meal_plan_id])
+        return summaries[meal_plan_id]
@@ -0,0 +1,512 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Select, delete, func, null, or_, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import UPSERT_INSERTS, driver_insert
+from app.models.meal_plan import MealPlan, PlannedMeal
+from app.models.recipe import Ingredient, Recipe, RecipeIngredient, RecipeNutrition
+from app.schemas.meal_plan import DailyNutrition, NutritionSummary
+from app.schemas.nutrition import RecipeNutritionSummary
+from app.services.ingredient_parser import BASE_UNITS, COUNT_UNIT, canonical_name
+from app.services.search_service import INDEX_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Columns every summary reports, in this order, ahead of any other nutrient
+CORE_NUTRIENTS = ("calories", "protein", "carbs", "fat")
+NUTRIENT_MASS_UNITS = {"g": 1.0, "mg": 1e-3, "mcg": 1e-6, "ug": 1e-6, "µg": 1e-6}
+# Volumes are weighed as water (1 ml = 1 g). Foods listed per tbsp or cup use
+# the same assumption for their basis, so for them it cancels out exactly.
+GRAMS_PER_ML = 1.0
+# Typical weight of one whole item, for ingredients counted rather than weighed
+PIECE_GRAMS = {
+    "avocado": 150.0,
+    "sweet potato": 130.0,
+    "chicken breast": 175.0,
+    "salmon": 150.0,
+    "broccoli": 300.0,
+}
+
+_VALUE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-zA-Zµ]*)\s*$")
+_BASIS_RE = re.compile(r"^(\d+(?:\.\d+)?)?\s*([a-z]+)$")
+
+
+def _amount(value: Any) -> Optional[Tuple[float, str]]:
+    """31 -> (31.0, ""), "74mg" -> (74.0, "mg"); None if unreadable"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value), ""
+    if isinstance(value, str):
+        match = _VALUE_RE.match(value)
+        if match:
+            return float(match.group(1)), match.group(2)
+    return None
+
+
+def _basis_grams(basis: str) -> Optional[float]:
+    """Grams a "calories_per_<basis>" row refers to: "100g" -> 100, "tbsp" -> 14.79"""
+    match = _BASIS_RE.match(basis.lower())
+    if not match:
+        return None
+    count, unit = float(match.group(1) or 1), match.group(2)
+    if unit in NUTRIENT_MASS_UNITS:
+        return count * NUTRIENT_MASS_UNITS[unit]
+    if unit in BASE_UNITS:
+        base, factor = BASE_UNITS[unit]
+        return count * factor * (GRAMS_PER_ML if base == "ml" else 1.0)
+    return None
+
+
+class NutritionEngine:
+    """
+    The nutrient table as a dense matrix with one row per ingredient and one
+    column per nutrient, in each column's unit per gram of ingredient. The
+    last row is all zeros and stands in for ingredients without data, so
+    lookups never need masking. ``version`` identifies the dataset; cached
+    recipe totals computed under another version are recomputed.
+    """
+
+    def __init__(self, foods: Dict[str, Dict[str, Any]], version: str = "none"):
+        self.version = version
+        rows: List[Tuple[str, Dict[str, float]]] = []
+        units: Dict[str, str] = {"calories": "kcal"}
+        for key, facts in foods.items():
+            if not isinstance(facts, dict):
+                continue
+            calories = next(((k, v) for k, v in facts.items() if k.startswith("calories_per_")), None)
+            basis = _basis_grams(calories[0][len("calories_per_"):]) if calories else None
+            if not basis:
+                logger.warning(f"Skipping nutrition entry {key!r}: no calories_per_<amount> basis")
+                continue
+
+            values = {"calories": float(calories[1]) / basis}
+            for nutrient, raw in facts.items():
+                parsed = _amount(raw)
+                if nutrient.startswith("calories_per_") or parsed is None:
+                    continue
+                amount, unit = parsed
+                column_unit = units.setdefault(nutrient, unit)
+                if unit != column_unit:
+                    if unit in NUTRIENT_MASS_UNITS and column_unit in NUTRIENT_MASS_UNITS:
+                        amount *= NUTRIENT_MASS_UNITS[unit] / NUTRIENT_MASS_UNITS[column_unit]
+                    else:
+                        logger.warning(f"Skipping {key}.{nutrient}: {unit!r} is not convertible to {column_unit!r}")
+                        continue
+                values[nutrient] = amount / basis
+            rows.append((canonical_name(key.replace("_", " ")), values))
+
+        for nutrient in CORE_NUTRIENTS:
+            units.setdefault(nutrient, "g")
+        self.nutrients: Tuple[str, ...] = CORE_NUTRIENTS + tuple(sorted(set(units) - set(CORE_NUTRIENTS)))
+        self.units: Dict[str, str] = {nutrient: units[nutrient] for nutrient in self.nutrients}
+        self.names: Tuple[str, ...] = tuple(name for name, _ in rows)
+        columns = {nutrient: n for n, nutrient in enumerate(self.nutrients)}
+
+        self.matrix = np.zeros((len(rows) + 1, len(self.nutrients)))
+        self.piece_grams = np.zeros(len(rows) + 1)
+        for n, (name, values) in enumerate(rows):
+            for nutrient, value in values.items():
+                self.matrix[n, columns[nutrient]] = value
+            self.piece_grams[n] = PIECE_GRAMS.get(name, 0.0)
+        self.unknown = len(rows)
+        self._rows: Dict[str, int] = {name: n for n, name in enumerate(self.names)}
+        # Longest names first, so "olive oil" wins over "oil" as a suffix match
+        self._suffixes = sorted(self.names, key=len, reverse=True)
+
+    @classmethod
+    def from_file(cls, path: str) -> "NutritionEngine":
+        if not os.path.exists(path):
+            logger.warning(f"Nutrition data not found at {path}; nutrient totals will be zero")
+            return cls({})
+        with open(path, "rb") as fp:
+            content = fp.read()
+        data = json.loads(content)
+        return cls(
+            data.get("nutrition_database", {}).get("common_ingredients", {}),
+            version=hashlib.sha256(content).hexdigest()[:16]
+        )
+
+    def row(self, name: Optional[str]) -> int:
+        """Matrix row for a canonical ingredient name; exact match, else the longest
+        known name it ends with ("extra virgin olive oil" -> "olive oil")"""
+        if not name:
+            return self.unknown
+        row = self._rows.get(name)
+        if row is None:
+            row = next(
+                (self._rows[known] for known in self._suffixes if name.endswith(" " + known)),
+                self.unknown
+            )
+            self._rows[name] = row
+        return row
+
+    def grams(self, rows: np.ndarray, quantities: np.ndarray, units: Sequence[Optional[str]]) -> np.ndarray:
+        """Weight in grams of each (row, quantity, unit); 0 where it cannot be known"""
+        factors = np.zeros(len(rows))
+        units = np.array([unit or COUNT_UNIT for unit in units], dtype=object)
+        for unit in set(units):
+            mask = units == unit
+            if unit in BASE_UNITS:
+                base, factor = BASE_UNITS[unit]
+                factors[mask] = factor * (GRAMS_PER_ML if base == "ml" else 1.0)
+            elif unit == COUNT_UNIT:
+                factors[mask] = self.piece_grams[rows[mask]]
+        return np.nan_to_num(quantities) * factors
+
+    def totals(self, groups: np.ndarray, rows: np.ndarray, grams: np.ndarray, size: int) -> np.ndarray:
+        """
+        Nutrients per group: the sparse (groups x ingredients) quantity matrix,
+        given as coordinates (groups[i], rows[i]) -> grams[i], times the
+        nutrient matrix. Only the non-zero entries are ever materialized.
+        """
+        totals = np.zeros((size, self.matrix.shape[1]))
+        np.add.at(totals, groups, grams[:, None] * self.matrix[rows])
+        return totals
+
+
+@lru_cache(maxsize=1)
+def get_nutrition_engine() -> NutritionEngine:
+    """The process-wide engine, loaded from ``NUTRITION_DATA_PATH`` on first use"""
+    return NutritionEngine.from_file(settings.NUTRITION_DATA_PATH)
+
+
+# (recipe id, canonical ingredient name, quantity, canonical unit) of one ingredient line
+IngredientLine = Tuple[int, Optional[str], Optional[float], Optional[str]]
+# (recipe id, version, lines, matched, totals) as stored in recipe_nutrition
+CACHE_COLUMNS = ("recipe_id", "version", "lines", "matched", "totals")
+CachedRow = Tuple[int, Optional[str], Optional[int], Optional[int], Optional[bytes]]
+
+
+@dataclass
+class RecipeVectors:
+    """Whole-recipe nutrient totals for a set of recipes, sorted by recipe id"""
+    ids: np.ndarray
+    totals: np.ndarray   # recipes x nutrients
+    matched: np.ndarray  # quantified ingredient lines with nutrition data
+    lines: np.ndarray    # quantified ingredient lines
+
+    def index(self, recipe_ids: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.ids, recipe_ids)
+
+    @classmethod
+    def merge(cls, parts: Sequence["RecipeVectors"]) -> "RecipeVectors":
+        ids = np.concatenate([part.ids for part in parts])
+        order = np.argsort(ids, kind="stable")
+        return cls(
+            ids=ids[order],
+            totals=np.concatenate([part.totals for part in parts])[order],
+            matched=np.concatenate([part.matched for part in parts])[order],
+            lines=np.concatenate([part.lines for part in parts])[order],
+        )
+
+
+class NutritionService:
+    def __init__(self, db: AsyncSession, engine: Optional[NutritionEngine] = None):
+        self.db = db
+        self.engine = engine or get_nutrition_engine()
+
+    def _nutrients(self, totals: np.ndarray) -> List[Dict[str, float]]:
+        """One {nutrient: amount} dict per row, rounded in one pass"""
+        return [dict(zip(self.engine.nutrients, row)) for row in np.round(totals, 2).tolist()]
+
+    def vectors_from_lines(self, recipe_ids: Iterable[int], lines: Sequence[IngredientLine]) -> RecipeVectors:
+        """
+        Totals for ``recipe_ids`` from their ingredient lines, which must all
+        belong to those recipes. Lines without a quantity are skipped and
+        recipes without any lines get zeros.
+        """
+        ids = np.unique(np.fromiter(recipe_ids, dtype=np.int64))
+        lines = [line for line in lines if line[2] is not None]
+        count = len(lines)
+        recipe_index = np.searchsorted(ids, np.fromiter((line[0] for line in lines), dtype=np.int64, count=count))
+        matrix_rows = np.fromiter((self.engine.row(line[1]) for line in lines), dtype=np.intp, count=count)
+        grams = self.engine.grams(
+            matrix_rows, np.fromiter((line[2] for line in lines), dtype=float, count=count), [line[3] for line in lines]
+        )
+        matched = (matrix_rows != self.engine.unknown) & (grams > 0)
+        return RecipeVectors(
+            ids=ids,
+            totals=self.engine.totals(recipe_index, matrix_rows, grams, len(ids)),
+            matched=np.bincount(recipe_index, weights=matched, minlength=len(ids)),
+            lines=np.bincount(recipe_index, minlength=len(ids)).astype(float),
+        )
+
+    async def recipe_vectors(self, recipe_ids: Iterable[int]) -> RecipeVectors:
+        """Compute nutrient totals of whole recipes in one batch from their parsed ingredients"""
+        ids = sorted(set(recipe_ids))
+        lines: List[IngredientLine] = []
+        for start in range(0, len(ids), INDEX_BATCH_SIZE):
+            result = await self.db.execute(
+                select(RecipeIngredient.recipe_id, Ingredient.name, RecipeIngredient.quantity, RecipeIngredient.unit)
+                .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id, isouter=True)
+                .where(
+                    RecipeIngredient.recipe_id.in_(ids[start:start + INDEX_BATCH_SIZE]),
+                    RecipeIngredient.quantity.isnot(None)
+                )
+            )
+            lines.extend(result.all())
+        return self.vectors_from_lines(ids, lines)
+
+    async def store(self, vectors: RecipeVectors) -> None:
+        """Replace the cached recipe_nutrition rows of these recipes; the caller commits"""
+        ids = vectors.ids.tolist()
+        for start in range(0, len(ids), INDEX_BATCH_SIZE):
+            chunk = ids[start:start + INDEX_BATCH_SIZE]
+            await self.db.execute(delete(RecipeNutrition).where(RecipeNutrition.recipe_id.in_(chunk)))
+        if ids:
+            # Straight to the driver's executemany; this runs for every ingestion batch
+            connection = await self.db.connection()
+            totals = vectors.totals.astype("<f8")
+            await connection.exec_driver_sql(
+                driver_insert(connection.dialect, RecipeNutrition.__tablename__, CACHE_COLUMNS),
+                [
+                    (recipe_id, self.engine.version, int(vectors.lines[n]), int(vectors.matched[n]), totals[n].tobytes())
+                    for n, recipe_id in enumerate(ids)
+                ]
+            )
+
+    async def refresh_recipes(self, recipe_ids: Iterable[int]) -> RecipeVectors:
+        """Recompute and store the cached totals of these recipes; the caller commits"""
+        vectors = await self.recipe_vectors(recipe_ids)
+        await self.store(vectors)
+        return vectors
+
+    async def _cache(self, vectors: RecipeVectors) -> None:
+        """
+        Upsert the cached rows of recomputed recipes in a short transaction of
+        their own, leaving the reader's session read-only. Best effort: the
+        next read recomputes whatever did not get stored.
+        """
+        insert = UPSERT_INSERTS.get(self.db.bind.dialect.name)
+        if insert is None or not len(vectors.ids):
+            return
+        table = RecipeNutrition.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.recipe_id],
+            set_={column: stmt.excluded[column] for column in CACHE_COLUMNS[1:]},
+            # A row of the current version was written by a recipe update or a
+            # concurrent read since ours began, and is at least as recent
+            where=table.c.version != stmt.excluded.version,
+        )
+        totals = vectors.totals.astype("<f8")
+        rows = [
+            {"recipe_id": recipe_id, "version": self.engine.version, "lines": int(vectors.lines[n]),
+             "matched": int(vectors.matched[n]), "totals": totals[n].tobytes()}
+            for n, recipe_id in enumerate(vectors.ids.tolist())
+        ]
+        try:
+            async with AsyncSession(self.db.bind) as db:
+                await db.execute(stmt, rows)
+                await db.commit()
+        except SQLAlchemyError as exc:
+            # Busy or read-only database, or a recipe deleted meanwhile
+            logger.warning(f"Could not cache nutrition for {len(rows)} recipe(s): {exc}")
+
+    async def _fresh_vectors(self, recipe_ids: Sequence[int], cached: Dict[int, CachedRow]) -> RecipeVectors:
+        """Vectors from cached rows of the current version; anything else is recomputed and cached"""
+        fresh = [cached[recipe_id] for recipe_id in recipe_ids
+                 if recipe_id in cached and cached[recipe_id][1] == self.engine.version]
+        parts = [RecipeVectors(
+            ids=np.array([row[0] for row in fresh], dtype=np.int64),
+            totals=np.frombuffer(b"".join(row[4] for row in fresh), dtype="<f8").reshape(
+                len(fresh), len(self.engine.nutrients)
+            ),
+            matched=np.array([row[3] for row in fresh], dtype=float),
+            lines=np.array([row[2] for row in fresh], dtype=float),
+        )]
+        stale = set(recipe_ids) - {row[0] for row in fresh}
+        if stale:
+            logger.info(f"Computing nutrition for {len(stale)} uncached recipe(s)")
+            vectors = await self.recipe_vectors(stale)
+            await self._cache(vectors)
+            parts.append(vectors)
+        return RecipeVectors.merge(parts)
+
+    def _plan_meals(self, plan_ids: Sequence[int], user_id: Optional[int] = None) -> Select:
+        """
+        Planned meals of these plans with their recipe's cached totals, in
+        MEAL_COLUMNS order. A plan without meals still yields one row, with
+        NULL meal columns. With ``user_id``, only that user's plans and public
+        plans are returned.
+        """
+        planned_servings = func.coalesce(PlannedMeal.servings, 1)
+        query = (
+            select(
+                MealPlan.id, PlannedMeal.meal_date, PlannedMeal.meal_type, PlannedMeal.recipe_id,
+                planned_servings, func.coalesce(Recipe.servings, planned_servings),
+                RecipeNutrition.version, RecipeNutrition.lines, RecipeNutrition.matched, RecipeNutrition.totals
+            )
+            .select_from(MealPlan)
+            .join(PlannedMeal, PlannedMeal.meal_plan_id == MealPlan.id, isouter=True)
+            .join(Recipe, Recipe.id == PlannedMeal.recipe_id, isouter=True)
+            .join(RecipeNutrition, RecipeNutrition.recipe_id == PlannedMeal.recipe_id, isouter=True)
+            .where(MealPlan.id.in_(plan_ids))
+        )
+        if user_id is not None:
+            query = query.where(or_(MealPlan.user_id == user_id, MealPlan.is_public.is_(True)))
+        return query
+
+    @staticmethod
+    def _recipes(recipe_ids: Sequence[int]) -> Select:
+        """Recipes with their cached totals, shaped like _plan_meals rows with NULL plan columns"""
+        return (
+            select(
+                null(), null(), null(), Recipe.id, null(), func.coalesce(Recipe.servings, 1),
+                RecipeNutrition.version, RecipeNutrition.lines, RecipeNutrition.matched, RecipeNutrition.totals
+            )
+            .join(RecipeNutrition, RecipeNutrition.recipe_id == Recipe.id, isouter=True)
+            .where(Recipe.id.in_(recipe_ids))
+        )
+
+    async def meal_plan_summaries(self, meal_plan_ids: Sequence[int]) -> Dict[int, NutritionSummary]:
+        """
+        Nutrition summaries for many meal plans in one batch: every planned
+        meal contributes its recipe's cached totals scaled to the planned
+        servings, summed per plan, per day and per meal type. Planned meals
+        and cached totals come back in one query; recipes whose cache row is
+        missing or stale are recomputed once and stored.
+        """
+        plan_ids = sorted(set(meal_plan_ids))
+        rows = []
+        for start in range(0, len(plan_ids), INDEX_BATCH_SIZE):
+            result = await self.db.execute(self._plan_meals(plan_ids[start:start + INDEX_BATCH_SIZE]))
+            rows.extend(result.all())
+        _, summaries = await self._summarize(rows)
+        return summaries
+
+    async def batch(
+        self, recipe_ids: Sequence[int], meal_plan_ids: Sequence[int], user_id: int
+    ) -> Tuple[Dict[int, RecipeNutritionSummary], Dict[int, NutritionSummary]]:
+        """
+        Summaries for up to INDEX_BATCH_SIZE recipes and meal plans (the
+        user's own or public ones) from a single query. Unknown or
+        inaccessible ids are left out of the result.
+        """
+        parts = []
+        if meal_plan_ids:
+            parts.append(self._plan_meals(sorted(set(meal_plan_ids)), user_id))
+        if recipe_ids:
+            parts.append(self._recipes(sorted(set(recipe_ids))))
+        if not parts:
+            return {}, {}
+        result = await self.db.execute(parts[0] if len(parts) == 1 else union_all(*parts))
+        return await self._summarize(result.all())
+
+    async def _summarize(
+        self, rows: Sequence[Any]
+    ) -> Tuple[Dict[int, RecipeNutritionSummary], Dict[int, NutritionSummary]]:
+        """Recipe and meal plan summaries from _plan_meals/_recipes rows, in one vectorized pass"""
+        cached: Dict[int, CachedRow] = {}
+        plan_ids, recipe_rows, meals = set(), [], []
+        for row in rows:
+            if row[3] is not None:
+                cached[row[3]] = (row[3],) + tuple(row[6:])
+            if row[0] is None:
+                recipe_rows.append(row)
+            else:
+                plan_ids.add(row[0])
+                if row[3] is not None:
+                    meals.append(row)
+        vectors = await self._fresh_vectors(sorted(cached), cached)
+        return self._recipe_summaries(vectors, recipe_rows), self._plan_summaries(vectors, sorted(plan_ids), meals)
+
+    def _recipe_summaries(self, vectors: RecipeVectors, rows: Sequence[Any]) -> Dict[int, RecipeNutritionSummary]:
+        """Whole-recipe and per-serving totals"""
+        count = len(rows)
+        recipes = np.fromiter((row[3] for row in rows), dtype=np.int64, count=count)
+        servings = np.fromiter((row[5] for row in rows), dtype=float, count=count)
+        recipe_index = vectors.index(recipes)
+        totals = self._nutrients(vectors.totals[recipe_index])
+        per_serving = self._nutrients(vectors.totals[recipe_index] / servings[:, None])
+        matched, lines = vectors.matched[recipe_index].tolist(), vectors.lines[recipe_index].tolist()
+
+        result: Dict[int, RecipeNutritionSummary] = {}
+        for n, recipe_id in enumerate(recipes.tolist()):
+            result[recipe_id] = RecipeNutritionSummary(
+                recipe_id=recipe_id,
+                servings=int(servings[n]),
+                total_calories=totals[n]["calories"],
+                total_protein=totals[n]["protein"],
+                total_carbs=totals[n]["carbs"],
+                total_fat=totals[n]["fat"],
+                meals_count=0,
+                nutrients=totals[n],
+                per_serving=per_serving[n],
+                units=self.engine.units,
+                coverage=round(matched[n] / lines[n], 4) if lines[n] else 0.0,
+            )
+        return result
+
+    def _plan_summaries(
+        self, vectors: RecipeVectors, plan_ids: List[int], meals: Sequence[Any]
+    ) -> Dict[int, NutritionSummary]:
+        """Scaled recipe totals of the planned meals, summed per plan, per day and per meal type"""
+        count = len(meals)
+        plans = np.fromiter((meal[0] for meal in meals), dtype=np.int64, count=count)
+        days = np.fromiter((meal[1].toordinal() for meal in meals), dtype=np.int64, count=count)
+        recipes = np.fromiter((meal[3] for meal in meals), dtype=np.int64, count=count)
+        scale = np.fromiter((meal[4] / meal[5] for meal in meals), dtype=float, count=count)
+        meal_types = [meal[2] for meal in meals]
+
+        recipe_index = vectors.index(recipes)
+        meal_totals = vectors.totals[recipe_index] * scale[:, None]
+
+        def grouped(*keys: np.ndarray) -> Tuple[List[List[int]], List[Dict[str, float]], List[int]]:
+            """(unique keys, summed nutrients, meals per key)"""
+            unique, inverse = np.unique(np.stack(keys, axis=1), axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            sums = np.zeros((len(unique), meal_totals.shape[1]))
+            np.add.at(sums, inverse, meal_totals)
+            return unique.tolist(), self._nutrients(sums), np.bincount(inverse, minlength=len(unique)).tolist()
+
+        type_names = sorted(set(meal_types))
+        codes = {name: code for code, name in enumerate(type_names)}
+        type_codes = np.fromiter((codes[t] for t in meal_types), dtype=np.int64, count=count)
+
+        summaries = {plan_id: {"by_day": [], "by_meal_type": {}} for plan_id in plan_ids}
+        if count:
+            for (plan_id,), nutrients, n in zip(*grouped(plans)):
+                summaries[plan_id].update(nutrients=nutrients, meals_count=n)
+            for (plan_id, day), nutrients, n in zip(*grouped(plans, days)):
+                summaries[plan_id]["by_day"].append(DailyNutrition(
+                    day=date.fromordinal(day), meals_count=n, nutrients=nutrients
+                ))
+            for (plan_id, code), nutrients, _ in zip(*grouped(plans, type_codes)):
+                summaries[plan_id]["by_meal_type"][type_names[code]] = nutrients
+
+            plan_index = np.searchsorted(plan_ids, plans)
+            matched = np.bincount(plan_index, weights=vectors.matched[recipe_index], minlength=len(plan_ids))
+            lines = np.bincount(plan_index, weights=vectors.lines[recipe_index], minlength=len(plan_ids))
+        else:
+            matched = lines = np.zeros(len(plan_ids))
+
+        empty = dict.fromkeys(self.engine.nutrients, 0.0)
+        result: Dict[int, NutritionSummary] = {}
+        for n, plan_id in enumerate(plan_ids):
+            summary = summaries[plan_id]
+            nutrients = summary.get("nutrients", empty)
+            result[plan_id] = NutritionSummary(
+                total_calories=nutrients["calories"],
+                total_protein=nutrients["protein"],
+                total_carbs=nutrients["carbs"],
+                total_fat=nutrients["fat"],
+                meals_count=summary.get("meals_count", 0),
+                nutrients=nutrients,
+                units=self.engine.units,
+                by_day=summary["by_day"],
+                by_meal_type=summary["by_meal_type"],
+                coverage=round(float(matched[n] / lines[n]), 4) if lines[n] else 0.0,
+            )
+        return result
@@ -1 +1,182 @@
-print('rating_service.py')
\ No newline at end of file
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.rating import Rating
+from app.models.recipe import Recipe, RecipeTag
+from app.models.user import User
+from app.schemas.rating import RatingSummary
+
+
+def rating_score(count, total):
+    """
+    SQL for the damped (Bayesian) mean of ``count`` ratings summing to
+    ``total``; 0 for an unrated recipe so it sorts after every rated one.
+    """
+    weight = settings.RATING_PRIOR_WEIGHT
+    return case(
+        (count > 0, (weight * settings.RATING_PRIOR_MEAN + total) / (count + weight)),
+        else_=0.0
+    )
+
+
+class RatingService:
+    """
+    Ratings plus the running ``rating_count``/``rating_sum`` totals on the
+    rated recipe and on its author. Every rating write moves both totals by
+    its difference in the same transaction, so averages are read off one row,
+    and updates the recipe's ``rating_score`` along with its copies on recipe_tags.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_rating(self, recipe_id: int, user_id: int) -> Optional[Rating]:
+        """The user's rating of a recipe"""
+        result = await self.db.execute(
+            select(Rating).where(Rating.recipe_id == recipe_id, Rating.user_id == user_id)
+        )
+        return result.scalars().first()
+
+    async def get_ratings(self, recipe_id: int, skip: int = 0, limit: int = 100) -> List[Rating]:
+        """A page of a recipe's ratings, newest first"""
+        result = await self.db.execute(
+            select(Rating)
+            .where(Rating.recipe_id == recipe_id)
+            .order_by(Rating.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_summary(self, recipe_id: int) -> Optional[RatingSummary]:
+        """Rating count and average of a recipe, from its running totals"""
+        result = await self.db.execute(
+            select(Recipe.rating_count, Recipe.rating_sum).where(Recipe.id == recipe_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return RatingSummary(
+            recipe_id=recipe_id,
+            rating_count=row.rating_count,
+            average_rating=row.rating_sum / row.rating_count if row.rating_count else None
+        )
+
+    async def rate_recipe(self, recipe_id: int, user_id: int, value: float) -> Optional[Rating]:
+        """Create or replace the user's rating of a recipe"""
+        result = await self.db.execute(select(Recipe.id).where(Recipe.id == recipe_id))
+        if result.scalar() is None:
+            return None
+
+        rating = await self.get_rating(recipe_id, user_id)
+        if rating:
+            count, total = 0, value - rating.rating
+            rating.rating = value
+        else:
+            count, total = 1, value
+            rating = Rating(user_id=user_id, recipe_id=recipe_id, rating=value)
+            self.db.add(rating)
+
+        try:
+            await self.db.flush()
+        except IntegrityError:
+            # Another request by the same user created the rating first
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Rating was changed concurrently, please retry"
+            )
+        await self._move_totals(recipe_id, count, total)
+        await self.db.commit()
+        await self.db.refresh(rating)
+        return rating
+
+    async def delete_rating(self, recipe_id: int, user_id: int) -> bool:
+        """Remove the user's rating of a recipe"""
+        rating = await self.get_rating(recipe_id, user_id)
+        if not rating:
+            return False
+
+        await self._move_totals(recipe_id, -1, -rating.rating)
+        await self.db.delete(rating)
+        await self.db.commit()
+        return True
+
+    async def _move_totals(self, recipe_id: int, count: int, total: float) -> None:
+        """Add to the totals of a recipe and of its author"""
+        new_count, new_sum = Recipe.rating_count + count, Recipe.rating_sum + total
+        result = await self.db.execute(
+            update(Recipe)
+            .where(Recipe.id == recipe_id)
+            .values(rating_count=new_count, rating_sum=new_sum, rating_score=rating_score(new_count, new_sum))
+            .returning(Recipe.user_id, Recipe.rating_score)
+        )
+        author_id, score = result.one()
+        await self.db.execute(
+            update(RecipeTag).where(RecipeTag.recipe_id == recipe_id).values(rating_score=score)
+        )
+        if author_id is not None:
+            await self.db.execute(
+                update(User)
+                .where(User.id == author_id)
+                .values(rating_count=User.rating_count + count, rating_sum=User.rating_sum + total)
+            )
+
+    async def forget_recipe(self, recipe: Recipe) -> None:
+        """Take a recipe's totals off its author before the recipe (and its ratings) is deleted"""
+        if recipe.user_id is None or not recipe.rating_count:
+            return
+        await self.db.execute(
+            update(User)
+            .where(User.id == recipe.user_id)
+            .values(
+                rating_count=User.rating_count - recipe.rating_count,
+                rating_sum=User.rating_sum - recipe.rating_sum
+            )
+        )
+
+    async def forget_user(self, user_id: int) -> None:
+        """Take a user's ratings off the rated recipes and their authors before the user is deleted"""
+        result = await self.db.execute(
+            select(Recipe.user_id, func.count().label("count"), func.sum(Rating.rating).label("total"))
+            .join(Rating, Rating.recipe_id == Recipe.id)
+            .where(Rating.user_id == user_id, Recipe.user_id.is_not(None))
+            .group_by(Recipe.user_id)
+        )
+        authors = [{"author_id": row.user_id, "count": row.count, "total": row.total} for row in result.all()]
+        result = await self.db.execute(
+            select(Rating.recipe_id, Rating.rating).where(Rating.user_id == user_id)
+        )
+        recipes = [{"rated_id": row.recipe_id, "total": row.rating} for row in result.all()]
+
+        if recipes:
+            table = Recipe.__table__
+            new_count, new_sum = table.c.rating_count - 1, table.c.rating_sum - bindparam("total")
+            await self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam("rated_id"))
+                .values(rating_count=new_count, rating_sum=new_sum, rating_score=rating_score(new_count, new_sum)),
+                recipes
+            )
+            tags = RecipeTag.__table__
+            await self.db.execute(
+                update(tags)
+                .where(tags.c.recipe_id == bindparam("rated_id"))
+                .values(rating_score=select(table.c.rating_score).where(table.c.id == bindparam("rated_id")).scalar_subquery()),
+                [{"rated_id": recipe["rated_id"]} for recipe in recipes]
+            )
+        if authors:
+            table = User.__table__
+            await self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam("author_id"))
+                .values(
+                    rating_count=table.c.rating_count - bindparam("count"),
+                    rating_sum=table.c.rating_sum - bindparam("total")
+                ),
+                authors
+            )
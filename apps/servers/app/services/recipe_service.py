@@ -1 +1,233 @@
-print('recipe_service.py')
\ No newline at end of file
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import distinct, func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.deps.pagination import CursorParams, encode_cursor
+from app.models.recipe import Recipe, RecipeIngredient, RecipeTag
+from app.models.user import User
+from app.schemas.recipe import RecipeCreate, RecipeUpdate, TopRecipe
+from app.services.ingredient_parser import canonical_name, parse_ingredient
+from app.services.ingredient_service import IngredientService
+from app.services.meal_plan_service import MealPlanService
+from app.services.nutrition_service import NutritionService
+from app.services.rating_service import RatingService
+from app.services.search_service import RecipeSearchIndex
+
+# Columns a client may request through ``fields=``
+RECIPE_LIST_FIELDS = (
+    "id", "name", "description", "cuisine", "difficulty", "prep_time",
+    "cook_time", "servings", "image_url", "user_id", "created_at", "updated_at",
+)
+
+
+class RecipeService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def resolve_fields(fields: Optional[str]) -> List[str]:
+        """Parse a comma-separated ``fields`` parameter into known column names"""
+        if not fields:
+            return list(RECIPE_LIST_FIELDS)
+
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(requested) - set(RECIPE_LIST_FIELDS))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown recipe fields: {', '.join(unknown)}"
+            )
+        # Preserve request order, drop duplicates
+        return list(dict.fromkeys(requested))
+
+    async def list_recipes(self, page: CursorParams, fields: List[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Return one page of recipes, newest first, plus the cursor for the next page.
+        Only the requested columns (and the sort key) are loaded.
+        """
+        # The sort key is always selected so the next cursor can be built
+        columns = list(dict.fromkeys(fields + ["created_at", "id"]))
+        query = (
+            select(*[getattr(Recipe, name) for name in columns])
+            .order_by(Recipe.created_at.desc(), Recipe.id.desc())
+            .limit(page.limit + 1)
+        )
+        if page.cursor:
+            if len(page.cursor) != 2:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid pagination cursor"
+                )
+            query = query.where(tuple_(Recipe.created_at, Recipe.id) < tuple_(*page.cursor))
+
+        result = await self.db.execute(query)
+        rows = result.mappings().all()
+
+        next_cursor = None
+        if len(rows) > page.limit:
+            rows = rows[:page.limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+
+        items = [{name: row[name] for name in fields} for row in rows]
+        return items, next_cursor
+
+    async def top_recipes(
+        self, page: CursorParams, cuisine: Optional[str] = None, tag: Optional[str] = None
+    ) -> Tuple[List[TopRecipe], Optional[str]]:
+        """
+        Rated recipes best first by their stored damped score, plus the cursor
+        for the next page. Each page is a range scan over ix_recipes_score_id,
+        ix_recipes_cuisine_score_id or, for a tag, ix_recipe_tags_tag_score.
+        """
+        score, key = Recipe.rating_score, Recipe.id
+        query = select(
+            Recipe.id, Recipe.name, Recipe.cuisine, Recipe.difficulty, Recipe.prep_time, Recipe.cook_time,
+            Recipe.servings, Recipe.image_url, Recipe.rating_count, Recipe.rating_sum, Recipe.rating_score
+        )
+        if tag:
+            query = query.join(RecipeTag, RecipeTag.recipe_id == Recipe.id).where(RecipeTag.tag == tag.strip().lower())
+            score, key = RecipeTag.rating_score, RecipeTag.recipe_id
+        if cuisine:
+            query = query.where(Recipe.cuisine == cuisine)
+        query = query.where(score > 0).order_by(score.desc(), key.desc()).limit(page.limit + 1)
+        if page.cursor:
+            if len(page.cursor) != 2:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid pagination cursor"
+                )
+            query = query.where(tuple_(score, key) < tuple_(*page.cursor))
+
+        rows = (await self.db.execute(query)).mappings().all()
+        next_cursor = None
+        if len(rows) > page.limit:
+            rows = rows[:page.limit]
+            next_cursor = encode_cursor(rows[-1]["rating_score"], rows[-1]["id"])
+
+        items = [
+            TopRecipe(
+                **{name: row[name] for name in TopRecipe.model_fields if name in row},
+                average_rating=row["rating_sum"] / row["rating_count"] if row["rating_count"] else None,
+                score=row["rating_score"]
+            )
+            for row in rows
+        ]
+        return items, next_cursor
+
+    async def get_recipe(self, recipe_id: int) -> Optional[Recipe]:
+        """Get a recipe by ID with its ingredients and tags"""
+        result = await self.db.execute(
+            select(Recipe)
+            .options(selectinload(Recipe.ingredients), selectinload(Recipe.tags))
+            .where(Recipe.id == recipe_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def _count_recipes(self, user_id: int, delta: int) -> None:
+        """Move the author's recipe counter"""
+        await self.db.execute(
+            update(User).where(User.id == user_id).values(recipe_count=User.recipe_count + delta)
+        )
+
+    async def _get_owned_recipe(self, recipe_id: int, user_id: int) -> Optional[Recipe]:
+        recipe = await self.get_recipe(recipe_id)
+        if recipe is None or recipe.user_id != user_id:
+            return None
+        return recipe
+
+    async def _build_ingredients(self, ingredients) -> List[RecipeIngredient]:
+        """Ingredient rows as submitted, plus parsed quantity, unit and canonical ingredient"""
+        parsed = [parse_ingredient(ingredient.name, ingredient.amount) for ingredient in ingredients]
+        ids = await IngredientService(self.db).resolve_ids(p.canonical_name for p in parsed)
+        return [
+            RecipeIngredient(
+                position=position, **ingredient.dict(),
+                ingredient_id=ids.get(p.canonical_name), quantity=p.quantity, unit=p.unit
+            )
+            for position, (ingredient, p) in enumerate(zip(ingredients, parsed))
+        ]
+
+    async def find_by_ingredients(self, have: List[str], limit: int) -> List[Dict[str, Any]]:
+        """
+        Recipes using the most of the given ingredients, fewest missing first.
+        Names are canonicalized the same way as recipe ingredients are.
+        """
+        ids = await IngredientService(self.db).lookup_ids(canonical_name(name) for name in have)
+        if not ids:
+            return []
+
+        matched = func.count(distinct(RecipeIngredient.ingredient_id))
+        hits = (
+            select(RecipeIngredient.recipe_id, matched.label("matched"))
+            .where(RecipeIngredient.ingredient_id.in_(list(ids.values())))
+            .group_by(RecipeIngredient.recipe_id)
+            .subquery()
+        )
+        needed = (
+            select(func.count(distinct(RecipeIngredient.ingredient_id)))
+            .where(RecipeIngredient.recipe_id == hits.c.recipe_id)
+            .scalar_subquery()
+        )
+        missing = (needed - hits.c.matched).label("missing")
+        result = await self.db.execute(
+            select(Recipe.id, Recipe.name, Recipe.cuisine, Recipe.image_url, hits.c.matched, missing)
+            .join(hits, hits.c.recipe_id == Recipe.id)
+            .order_by(missing, hits.c.matched.desc(), Recipe.id)
+            .limit(limit)
+        )
+        return [dict(row) for row in result.mappings().all()]
+
+    async def create_recipe(self, recipe_data: RecipeCreate, user_id: int) -> Recipe:
+        """Create a recipe, add it to the search index and cache its nutrition"""
+        recipe = Recipe(
+            **recipe_data.dict(exclude={"ingredients", "tags"}),
+            user_id=user_id,
+            ingredients=await self._build_ingredients(recipe_data.ingredients),
+            tags=[RecipeTag(tag=tag) for tag in recipe_data.tags]
+        )
+        self.db.add(recipe)
+        await self.db.flush()
+        await self._count_recipes(user_id, 1)
+        await RecipeSearchIndex(self.db).index_recipe(recipe.id)
+        await NutritionService(self.db).refresh_recipes([recipe.id])
+        await self.db.commit()
+        return await self.get_recipe(recipe.id)
+
+    async def update_recipe(self, recipe_id: int, user_id: int, update_data: RecipeUpdate) -> Optional[Recipe]:
+        """Update a recipe owned by the user and refresh its index row (and nutrition, if ingredients changed)"""
+        recipe = await self._get_owned_recipe(recipe_id, user_id)
+        if not recipe:
+            return None
+
+        update_dict = update_data.dict(exclude_unset=True, exclude={"ingredients", "tags"})
+        for field, value in update_dict.items():
+            setattr(recipe, field, value)
+        if update_data.ingredients is not None:
+            recipe.ingredients = await self._build_ingredients(update_data.ingredients)
+        if update_data.tags is not None:
+            recipe.tags = [RecipeTag(tag=tag, rating_score=recipe.rating_score) for tag in update_data.tags]
+
+        await self.db.flush()
+        await RecipeSearchIndex(self.db).index_recipe(recipe.id)
+        if update_data.ingredients is not None:
+            await NutritionService(self.db).refresh_recipes([recipe.id])
+        await self.db.commit()
+        return await self.get_recipe(recipe.id)
+
+    async def delete_recipe(self, recipe_id: int, user_id: int) -> bool:
+        """Delete a recipe owned by the user, drop it from the index and take its ratings off the author"""
+        recipe = await self._get_owned_recipe(recipe_id, user_id)
+        if not recipe:
+            return False
+
+        await RatingService(self.db).forget_recipe(recipe)
+        await MealPlanService(self.db).forget_recipes([recipe.id])
+        await self._count_recipes(user_id, -1)
+        await RecipeSearchIndex(self.db).remove_recipe(recipe.id)
+        await self.db.delete(recipe)
+        await self.db.commit()
+        return True
@@ -0,0 +1,351 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Integer, and_, case, func, or_, select, text, true, tuple_, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.schemas.recipe import FacetCount, RecipeSearchHit, RecipeSearchResults
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Per-column bm25 weights, in recipes_fts column order:
+# name, description, ingredients, tags, cuisine
+BM25_WEIGHTS = (10.0, 2.0, 4.0, 5.0, 3.0)
+MAX_QUERY_TERMS = 10
+FACET_LIMIT = 20
+FACET_SAMPLE_SIZE = 5000
+INDEX_BATCH_SIZE = 500  # ids per statement, well under SQLite's variable limit
+
+TRIGRAM_MIN_LENGTH = 3
+
+# Rebuilds the index row of one or more recipes from the source tables
+_INDEX_SELECT = """
+    SELECT r.id, r.name, coalesce(r.description, ''),
+           coalesce((SELECT group_concat(i.name, ' ') FROM recipe_ingredients i WHERE i.recipe_id = r.id), ''),
+           coalesce((SELECT group_concat(t.tag, ' ') FROM recipe_tags t WHERE t.recipe_id = r.id), ''),
+           coalesce(r.cuisine, '')
+    FROM recipes r
+"""
+
+
+def _batches(ids: List[int]):
+    """Yield (params, placeholders) for ids in chunks of INDEX_BATCH_SIZE"""
+    for start in range(0, len(ids), INDEX_BATCH_SIZE):
+        batch = ids[start:start + INDEX_BATCH_SIZE]
+        params = {f"id{n}": value for n, value in enumerate(batch)}
+        yield params, ", ".join(f":{name}" for name in params)
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every term is quoted (so user input cannot inject FTS operators) and made
+    a prefix query, so "carbon spag" matches "Carbonara Spaghetti".
+    """
+    terms = _TERM_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class RecipeSearchIndex:
+    """
+    Full-text recipe search backed by the ``recipes_fts`` FTS5 table.
+
+    Index rows are written in the caller's transaction, so they commit or roll
+    back together with the recipe write that triggered them. On databases
+    other than SQLite the index methods are no-ops and search falls back to a
+    LIKE scan.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.enabled = db.get_bind().dialect.name == "sqlite"
+
+    async def index_recipe(self, recipe_id: int) -> None:
+        """(Re)index a single recipe"""
+        await self.index_recipes([recipe_id])
+
+    async def index_recipes(self, recipe_ids: Iterable[int]) -> None:
+        """(Re)index recipes, two set-based statements per batch of ids"""
+        if not self.enabled:
+            return
+        for params, placeholders in _batches(list(recipe_ids)):
+            await self.db.execute(
+                text(f"DELETE FROM recipes_fts WHERE rowid IN ({placeholders})"), params
+            )
+            await self.db.execute(
+                text(
+                    "INSERT INTO recipes_fts (rowid, name, description, ingredients, tags, cuisine) "
+                    f"{_INDEX_SELECT} WHERE r.id IN ({placeholders})"
+                ),
+                params
+            )
+
+    async def remove_recipe(self, recipe_id: int) -> None:
+        """Drop a recipe from the index"""
+        await self.remove_recipes([recipe_id])
+
+    async def remove_recipes(self, recipe_ids: Iterable[int]) -> None:
+        """Drop recipes from the index, one statement per batch of ids"""
+        if not self.enabled:
+            return
+        for params, placeholders in _batches(list(recipe_ids)):
+            await self.db.execute(text(f"DELETE FROM recipes_fts WHERE rowid IN ({placeholders})"), params)
+
+    async def rebuild(self) -> None:
+        """Rebuild the whole index from the recipe tables"""
+        if not self.enabled:
+            return
+        await self.db.execute(text("DELETE FROM recipes_fts"))
+        await self.db.execute(
+            text(
+                "INSERT INTO recipes_fts (rowid, name, description, ingredients, tags, cuisine) "
+                f"{_INDEX_SELECT}"
+            )
+        )
+        await self.db.execute(text("INSERT INTO recipes_fts (recipes_fts) VALUES ('optimize')"))
+
+    def _filters(self, cuisine: Optional[str], difficulty: Optional[str], tag: Optional[str]) -> Tuple[str, Dict]:
+        clauses, params = [], {}
+        if cuisine:
+            clauses.append("r.cuisine = :cuisine")
+            params["cuisine"] = cuisine
+        if difficulty:
+            clauses.append("r.difficulty = :difficulty")
+            params["difficulty"] = difficulty
+        if tag:
+            clauses.append("EXISTS (SELECT 1 FROM recipe_tags ft WHERE ft.recipe_id = r.id AND ft.tag = :tag)")
+            params["tag"] = tag.lower()
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        cuisine: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> RecipeSearchResults:
+        """Ranked search with facet counts by cuisine, difficulty and tag"""
+        match = build_match_query(query)
+        if match is None:
+            return RecipeSearchResults(query=query, total=0, items=[], facets={}, facets_exact=True)
+
+        filters, params = self._filters(cuisine, difficulty, tag)
+        if self.enabled:
+            source = "recipes_fts JOIN recipes r ON r.id = recipes_fts.rowid"
+            where = f"recipes_fts MATCH :match{filters}"
+            # bm25() is lower-is-better; negate so higher scores rank first
+            score = f"-bm25(recipes_fts, {', '.join(str(w) for w in BM25_WEIGHTS)})"
+            params["match"] = match
+        else:
+            terms = _TERM_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+            source = "recipes r"
+            where = " AND ".join(
+                f"(lower(r.name) LIKE :t{n} OR lower(coalesce(r.description, '')) LIKE :t{n})"
+                for n in range(len(terms))
+            ) + filters
+            score = "0.0"
+            params.update({f"t{n}": f"%{term}%" for n, term in enumerate(terms)})
+
+        columns = "r.id, r.name, r.description, r.cuisine, r.difficulty, r.image_url"
+        if self.enabled and not filters:
+            # Rank inside the FTS table first so only the top rows are joined
+            hits_sql = (
+                f"SELECT {columns}, s.score FROM (SELECT rowid AS id, {score} AS score FROM recipes_fts "
+                "WHERE recipes_fts MATCH :match ORDER BY score DESC, rowid LIMIT :limit) s "
+                "JOIN recipes r ON r.id = s.id ORDER BY s.score DESC, r.id"
+            )
+        else:
+            hits_sql = f"SELECT {columns}, {score} AS score FROM {source} WHERE {where} ORDER BY score DESC, r.id LIMIT :limit"
+        hits = await self.db.execute(text(hits_sql), {**params, "limit": limit})
+        items = [RecipeSearchHit(**row) for row in hits.mappings()]
+
+        # Facets (and small totals) come from one statement over at most
+        # FACET_SAMPLE_SIZE matches, so their cost stays flat for very broad
+        # queries; below that size they are exact. CROSS JOIN keeps SQLite
+        # driving the tag lookup from the matches rather than from recipe_tags.
+        facet_rows = await self.db.execute(
+            text(
+                f"WITH m AS (SELECT r.id, r.cuisine, r.difficulty FROM {source} WHERE {where} LIMIT :sample) "
+                "SELECT 'n', NULL, NULL, count(*) FROM m "
+                "UNION ALL SELECT 'c', cuisine, difficulty, count(*) FROM m GROUP BY cuisine, difficulty "
+                "UNION ALL SELECT 't', t.tag, NULL, count(*) FROM m CROSS JOIN recipe_tags t ON t.recipe_id = m.id GROUP BY t.tag"
+            ),
+            {**params, "sample": FACET_SAMPLE_SIZE}
+        )
+        sampled = 0
+        cuisines: Dict[Optional[str], int] = {}
+        difficulties: Dict[Optional[str], int] = {}
+        tags: Dict[Optional[str], int] = {}
+        for kind, value, row_difficulty, n in facet_rows:
+            if kind == "n":
+                sampled = n
+            elif kind == "c":
+                cuisines[value] = cuisines.get(value, 0) + n
+                difficulties[row_difficulty] = difficulties.get(row_difficulty, 0) + n
+            else:
+                tags[value] = n
+
+        total = sampled
+        if sampled >= FACET_SAMPLE_SIZE:
+            if self.enabled and not filters:
+                # Unfiltered totals can be answered from the FTS doclists alone
+                count_sql = "SELECT count(*) FROM recipes_fts WHERE recipes_fts MATCH :match"
+            else:
+                count_sql = f"SELECT count(*) FROM {source} WHERE {where}"
+            total = (await self.db.execute(text(count_sql), params)).scalar_one()
+
+        return RecipeSearchResults(
+            query=query,
+            total=total,
+            items=items,
+            facets={
+                "cuisine": _top_facets(cuisines),
+                "difficulty": _top_facets(difficulties),
+                "tag": _top_facets(tags),
+            },
+            facets_exact=total < FACET_SAMPLE_SIZE
+        )
+
+
+def _top_facets(counts: Dict[Optional[str], int]) -> List[FacetCount]:
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0] or ""))
+    return [FacetCount(value=value, count=n) for value, n in ordered[:FACET_LIMIT]]
+
+
+class UserSearchIndex:
+    """
+    Substring user search backed by the ``users_fts`` FTS5 trigram table.
+
+    Queries of three or more characters are answered from the trigram index
+    instead of a leading-wildcard scan; shorter ones only match username
+    prefixes. As with recipes, index rows are written in the caller's
+    transaction, and other databases fall back to ILIKE.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.enabled = db.get_bind().dialect.name == "sqlite"
+
+    async def index_user(self, user_id: int) -> None:
+        """(Re)index a single user"""
+        await self.index_users([user_id])
+
+    async def index_users(self, user_ids: Iterable[int]) -> None:
+        """(Re)index users, two set-based statements per batch of ids"""
+        if not self.enabled:
+            return
+        for params, placeholders in _batches(list(user_ids)):
+            await self.db.execute(
+                text(f"DELETE FROM users_fts WHERE rowid IN ({placeholders})"), params
+            )
+            await self.db.execute(
+                text(
+                    "INSERT INTO users_fts (rowid, username, email, first_name, last_name) "
+                    "SELECT id, username, email, coalesce(first_name, ''), coalesce(last_name, '') "
+                    f"FROM users WHERE id IN ({placeholders})"
+                ),
+                params
+            )
+
+    async def remove_user(self, user_id: int) -> None:
+        """Drop a user from the index"""
+        if not self.enabled:
+            return
+        await self.db.execute(text("DELETE FROM users_fts WHERE rowid = :id"), {"id": user_id})
+
+    async def rebuild(self) -> None:
+        """Rebuild the whole index from the users table"""
+        if not self.enabled:
+            return
+        await self.db.execute(text("DELETE FROM users_fts"))
+        await self.db.execute(
+            text(
+                "INSERT INTO users_fts (rowid, username, email, first_name, last_name) "
+                "SELECT id, username, email, coalesce(first_name, ''), coalesce(last_name, '') FROM users"
+            )
+        )
+        await self.db.execute(text("INSERT INTO users_fts (users_fts) VALUES ('optimize')"))
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        cursor: Optional[Tuple] = None,
+        offset: int = 0
+    ) -> Tuple[List[Tuple[User, int]], Optional[Tuple[int, int]]]:
+        """
+        Active users matching ``query`` as (user, rank) pairs, best match
+        first, plus the (rank, id) keyset of the next page if there is one.
+
+        Ranks are match tiers: exact username, username prefix, exact first
+        or last name, then any other substring. On SQLite the matches come
+        from two indexed sources (username prefixes and trigram substrings),
+        each filtered to active users past the cursor and cut to the best
+        ``offset + limit + 1`` by (rank, id) before they are merged, so no
+        match that belongs on the page is dropped.
+        """
+        term = query.strip().lower()
+        if not term:
+            return [], None
+
+        upper = term + "\uffff"
+        rank = case(
+            (User.username == term, 0),
+            (and_(User.username >= term, User.username < upper), 1),
+            (or_(func.lower(User.first_name) == term, func.lower(User.last_name) == term), 2),
+            else_=3
+        )
+        after_cursor = tuple_(rank, User.id) > tuple_(*cursor) if cursor else true()
+        stmt = select(User, rank.label("rank"))
+
+        if self.enabled:
+            # Username prefixes come from the unique username index; substrings
+            # of three or more characters from the trigram index, where a
+            # quoted phrase is a substring match and doubled quotes keep user
+            # input from injecting FTS syntax.
+            window = offset + limit + 1
+
+            def best(*criteria):
+                ranked = (
+                    select(User.id)
+                    .where(User.is_active == True, after_cursor, *criteria)
+                    .order_by(rank, User.id)
+                    .limit(window)
+                    .subquery()
+                )
+                return select(ranked.c.id)
+
+            sources = [best(User.username >= term, User.username < upper)]
+            if len(term) >= TRIGRAM_MIN_LENGTH:
+                trigram = text("SELECT rowid FROM users_fts WHERE users_fts MATCH :match").bindparams(
+                    match='"' + term.replace('"', '""') + '"'
+                )
+                sources.append(best(User.id.in_(trigram.columns(rowid=Integer))))
+            candidates = union(*sources).subquery("candidates")
+            stmt = stmt.join(candidates, candidates.c.id == User.id)
+        else:
+            stmt = stmt.where(
+                or_(
+                    User.username.ilike(f"%{term}%"),
+                    User.email.ilike(f"%{term}%"),
+                    User.first_name.ilike(f"%{term}%"),
+                    User.last_name.ilike(f"%{term}%")
+                )
+            )
+
+        stmt = stmt.where(User.is_active == True, after_cursor).order_by(rank, User.id).limit(limit + 1)
+        if offset:
+            stmt = stmt.offset(offset)
+
+        rows = [(user, user_rank) for user, user_rank in (await self.db.execute(stmt)).all()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_user, last_rank = rows[-1]
+            next_cursor = (last_rank, last_user.id)
+        return rows, next_cursor
@@ -1,39 +1,72 @@
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from dataclasses import dataclass, replace
+from typing import Optional, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.revocation import deny_list
+from app.core.write_behind import touch_buffer
+from app.deps.pagination import encode_cursor
+from app.models.recipe import Recipe
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, UserPasswordUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserPasswordUpdate, UserProfile
 from app.services.auth_service import AuthService
+from app.services.meal_plan_service import MealPlanService
+from app.services.rating_service import RatingService
+from app.services.search_service import RecipeSearchIndex, UserSearchIndex
 
 logger = logging.getLogger(__name__)
 
+# User columns mirrored into the users_fts search index
+SEARCHABLE_FIELDS = {"username", "email", "first_name", "last_name"}
+
+# Public profiles of active users by ("id", id) and ("username", username)
+PROFILE_CACHE: TTLCache = TTLCache(settings.PROFILE_CACHE_SIZE, settings.PROFILE_CACHE_TTL)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as access checks see it: identity and account flags"""
+    id: int
+    username: str
+    is_active: bool
+    is_verified: bool
+    is_superuser: bool
+    # Unix time, to the microsecond, before which this user's tokens are refused
+    tokens_revoked_at: Optional[float] = None
+
+
+# Principals by user id, for the authentication dependencies
+PRINCIPAL_CACHE: TTLCache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL)
+
 
 class UserService:
     """Service class for user-related operations"""
 
     @staticmethod
-    def create_user(db: Session, user_create: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
         """Create a new user"""
         # Check if username already exists
-        if UserService.get_user_by_username(db, user_create.username):
+        if await UserService.get_user_by_username(db, user_create.username):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already registered"
             )
         
         # Check if email already exists
-        if UserService.get_user_by_email(db, user_create.email):
+        if await UserService.get_user_by_email(db, user_create.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
         # Hash password
-        hashed_password = AuthService.get_password_hash(user_create.password)
+        hashed_password = await AuthService.get_password_hash_async(user_create.password)
         
         # Create user object
         user_data = user_create.dict(exclude={"password", "password_confirm"})
@@ -41,12 +74,14 @@ class UserService:
         
         try:
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.flush()
+            await UserSearchIndex(db).index_user(user.id)
+            await db.commit()
+            await db.refresh(user)
             logger.info(f"User created successfully: {user.username}")
             return user
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error creating user: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -54,37 +89,117 @@ class UserService:
             )
 
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return db.query(User).filter(User.id == user_id).first()
+        result = await db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
 
     @staticmethod
-    def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
         """Get user by username"""
-        return db.query(User).filter(User.username == username.lower()).first()
+        result = await db.execute(select(User).where(User.username == username.lower()))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """A user's principal from PRINCIPAL_CACHE, or from one narrow select on a miss"""
+        principal = PRINCIPAL_CACHE.get(user_id)
+        if principal is not None:
+            return principal
+
+        result = await db.execute(
+            select(
+                User.id, User.username, User.is_active, User.is_verified, User.is_superuser,
+                User.tokens_revoked_at
+            )
+            .where(User.id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        principal = Principal(**row._mapping)
+        if row.tokens_revoked_at is not None:
+            revoked_at = row.tokens_revoked_at
+            if revoked_at.tzinfo is None:
+                revoked_at = revoked_at.replace(tzinfo=timezone.utc)
+            principal = replace(principal, tokens_revoked_at=revoked_at.timestamp())
+        PRINCIPAL_CACHE.set(user_id, principal)
+        return principal
+
+    @staticmethod
+    def build_profile(user: User) -> UserProfile:
+        """A user's profile, with statistics read off the user's counter columns"""
+        profile = UserProfile.from_orm(user)
+        profile.recipe_count = user.recipe_count
+        profile.total_ratings = user.rating_count
+        profile.average_rating = user.average_rating or 0.0
+        return profile
+
+    @staticmethod
+    async def get_public_profile(
+        db: AsyncSession, user_id: Optional[int] = None, username: Optional[str] = None
+    ) -> Optional[UserProfile]:
+        """
+        Profile of an active user by ID or username, served from PROFILE_CACHE
+        for up to PROFILE_CACHE_TTL seconds; None for unknown or inactive users.
+        """
+        key = ("id", user_id) if user_id is not None else ("username", username.lower())
+        profile = PROFILE_CACHE.get(key)
+        if profile is not None:
+            return profile
+
+        if user_id is not None:
+            user = await UserService.get_user_by_id(db, user_id)
+        else:
+            user = await UserService.get_user_by_username(db, username)
+        if not user or not user.is_active:
+            return None
+
+        profile = UserService.build_profile(user)
+        PROFILE_CACHE.set(("id", user.id), profile)
+        PROFILE_CACHE.set(("username", user.username), profile)
+        return profile
+
+    @staticmethod
+    def forget_cached(user: User) -> None:
+        """Drop a user's cached principal and public profile after a change to the account"""
+        PRINCIPAL_CACHE.pop(user.id)
+        PROFILE_CACHE.pop(("id", user.id))
+        PROFILE_CACHE.pop(("username", user.username))
+
+    @staticmethod
+    def forget_principal(user_id: int) -> None:
+        """Drop what is cached under a user's id, when only the id is known"""
+        PRINCIPAL_CACHE.pop(user_id)
+        PROFILE_CACHE.pop(("id", user_id))
 
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email"""
-        return db.query(User).filter(User.email == email.lower()).first()
+        result = await db.execute(select(User).where(User.email_lower == email.lower()))
+        return result.scalars().first()
 
     @staticmethod
-    def get_user_by_username_or_email(db: Session, username_or_email: str) -> Optional[User]:
-        """Get user by username or email"""
-        return db.query(User).filter(
-            or_(
-                User.username == username_or_email.lower(),
-                User.email == username_or_email.lower()
-            )
-        ).first()
+    async def get_user_by_username_or_email(db: AsyncSession, username_or_email: str) -> Optional[User]:
+        """
+        Get user by username or email. Usernames cannot contain "@", so this
+        is a single seek on the username or the case-folded email index.
+        """
+        login = username_or_email.strip().lower()
+        column = User.email_lower if "@" in login else User.username
+        result = await db.execute(select(User).where(column == login))
+        return result.scalars().first()
 
     @staticmethod
-    def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
+    async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
         """Get list of users with pagination"""
-        return db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
+        result = await db.execute(
+            select(User).where(User.is_active == True).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
 
     @staticmethod
-    def update_user(db: Session, user: User, user_update: UserUpdate) -> User:
+    async def update_user(db: AsyncSession, user: User, user_update: UserUpdate) -> User:
         """Update user information"""
         update_data = user_update.dict(exclude_unset=True)
         
@@ -92,12 +207,16 @@ class UserService:
             setattr(user, field, value)
         
         try:
-            db.commit()
-            db.refresh(user)
+            await db.flush()
+            if SEARCHABLE_FIELDS.intersection(update_data):
+                await UserSearchIndex(db).index_user(user.id)
+            await db.commit()
+            await db.refresh(user)
+            UserService.forget_cached(user)
             logger.info(f"User updated successfully: {user.username}")
             return user
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating user: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -105,26 +224,26 @@ class UserService:
             )
 
     @staticmethod
-    def update_password(db: Session, user: User, password_update: UserPasswordUpdate) -> User:
+    async def update_password(db: AsyncSession, user: User, password_update: UserPasswordUpdate) -> User:
         """Update user password"""
         # Verify current password
-        if not AuthService.verify_password(password_update.current_password, user.password_hash):
+        if not await AuthService.verify_password_async(password_update.current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect current password"
             )
         
         # Hash new password
-        new_password_hash = AuthService.get_password_hash(password_update.new_password)
+        new_password_hash = await AuthService.get_password_hash_async(password_update.new_password)
         user.password_hash = new_password_hash
         
         try:
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             logger.info(f"Password updated successfully for user: {user.username}")
             return user
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating password: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -132,17 +251,21 @@ class UserService:
             )
 
     @staticmethod
-    def deactivate_user(db: Session, user: User) -> User:
-        """Deactivate user account"""
+    async def deactivate_user(db: AsyncSession, user: User) -> User:
+        """Deactivate user account and revoke every token issued so far"""
         user.is_active = False
+        user.tokens_revoked_at = datetime.utcnow()
+        # Other workers evict their cached principal at their next sync
+        deny_list.revoke_user(db, user.id)
         
         try:
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
+            UserService.forget_cached(user)
             logger.info(f"User deactivated: {user.username}")
             return user
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deactivating user: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -150,17 +273,18 @@ class UserService:
             )
 
     @staticmethod
-    def activate_user(db: Session, user: User) -> User:
+    async def activate_user(db: AsyncSession, user: User) -> User:
         """Activate user account"""
         user.is_active = True
         
         try:
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
+            UserService.forget_cached(user)
             logger.info(f"User activated: {user.username}")
             return user
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error activating user: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -168,17 +292,18 @@ class UserService:
             )
 
     @staticmethod
-    def verify_user(db: Session, user: User) -> User:
+    async def verify_user(db: AsyncSession, user: User) -> User:
         """Verify user account"""
         user.is_verified = True
         
         try:
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
+            UserService.forget_cached(user)
             logger.info(f"User verified: {user.username}")
             return user
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error verifying user: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -186,29 +311,34 @@ class UserService:
             )
 
     @staticmethod
-    def update_last_login(db: Session, user: User) -> User:
-        """Update user's last login timestamp"""
-        user.last_login = datetime.utcnow()
-        
-        try:
-            db.commit()
-            db.refresh(user)
-            return user
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error updating last login: {str(e)}")
-            return user  # Non-critical error, return user without update
+    async def update_last_login(db: AsyncSession, user: User) -> User:
+        """
+        Update user's last login timestamp. The write goes through touch_buffer
+        and reaches the database within TOUCH_FLUSH_INTERVAL seconds.
+        """
+        last_login = datetime.utcnow()
+        touch_buffer.set(User.last_login, user.id, last_login)
+        # Show it on the loaded user without marking the row dirty
+        set_committed_value(user, "last_login", last_login)
+        return user
 
     @staticmethod
-    def delete_user(db: Session, user: User) -> bool:
+    async def delete_user(db: AsyncSession, user: User) -> bool:
         """Permanently delete user account"""
         try:
-            db.delete(user)
-            db.commit()
+            await UserSearchIndex(db).remove_user(user.id)
+            await RatingService(db).forget_user(user.id)
+            # The user's recipes go too, so do their places in everyone's meal plans
+            recipe_ids = (await db.execute(select(Recipe.id).where(Recipe.user_id == user.id))).scalars().all()
+            await MealPlanService(db).forget_recipes(recipe_ids)
+            await RecipeSearchIndex(db).remove_recipes(recipe_ids)
+            await db.delete(user)
+            await db.commit()
+            UserService.forget_cached(user)
             logger.info(f"User deleted: {user.username}")
             return True
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting user: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -216,16 +346,25 @@ class UserService:
             )
 
     @staticmethod
-    def search_users(db: Session, query: str, skip: int = 0, limit: int = 50) -> List[User]:
-        """Search users by username, email, or name"""
-        search_filter = or_(
-            User.username.ilike(f"%{query}%"),
-            User.email.ilike(f"%{query}%"),
-            User.first_name.ilike(f"%{query}%"),
-            User.last_name.ilike(f"%{query}%")
-        )
-        
-        return db.query(User).filter(
-            User.is_active == True,
-            search_filter
-        ).offset(skip).limit(limit).all()
+    async def search_users(db: AsyncSession, query: str, skip: int = 0, limit: int = 50) -> List[User]:
+        """Search users by username, email, or name, best match first"""
+        rows, _ = await UserSearchIndex(db).search(query, limit, offset=skip)
+        return [user for user, _rank in rows]
+
+    @staticmethod
+    async def search_users_page(
+        db: AsyncSession, query: str, limit: int, cursor: Optional[tuple] = None
+    ) -> Tuple[List[User], Optional[str]]:
+        """Keyset-paginated user search; returns the users and the next cursor"""
+        if cursor is not None and len(cursor) != 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        rows, next_key = await UserSearchIndex(db).search(query, limit, cursor=cursor)
+        next_cursor = encode_cursor(*next_key) if next_key else None
+        return [user for user, _rank in rows], next_cursor
+
+
+# Deactivations on any worker evict the user's cached principal here
+deny_list.user_listeners.append(UserService.forget_principal)
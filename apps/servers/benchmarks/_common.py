@@ -0,0 +1,69 @@
+"""
+Shared helpers for the Recipe Hub benchmark scripts.
+
+Run benchmarks from apps/servers, e.g. ``python -m benchmarks.bench_async_load``.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) of samples using nearest-rank"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(label: str, latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Build a latency/throughput summary (latencies in seconds)"""
+    return {
+        "label": label,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def print_table(rows: List[Dict[str, float]]) -> None:
+    """Print benchmark summaries as an aligned table"""
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    widths = {h: max(len(h), *(len(_fmt(r[h])) for r in rows)) for h in headers}
+    print("  ".join(h.ljust(widths[h]) for h in headers))
+    for row in rows:
+        print("  ".join(_fmt(row[h]).ljust(widths[h]) for h in headers))
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+@contextmanager
+def temp_sqlite_path(name: str = "bench.db"):
+    """Yield a path to a throwaway SQLite database file"""
+    with tempfile.TemporaryDirectory(prefix="recipehub-bench-") as tmp:
+        yield os.path.join(tmp, name)
+
+
+class Timer:
+    """Context manager measuring wall-clock time in seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
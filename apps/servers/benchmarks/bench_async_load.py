@@ -0,0 +1,157 @@
+"""
+Load benchmark: blocking sync-Session handlers vs. the async data-access layer.
+
+The "before" app reproduces the previous request path: ``async def`` routes
+calling synchronous ``Session.query(...)`` code, which blocks the event loop
+for the duration of every SQLite call. The "after" app is the real Recipe Hub
+application wired to an async session on the same database file.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_async_load --users 50 --plans 20 --requests 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI, Header, HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import get_db
+from app.main import app as async_app
+from app.models.base import Base
+from app.models.meal_plan import MealPlan, PlannedMeal
+from app.models.user import User
+from app.schemas.meal_plan import MealPlan as MealPlanSchema
+from app.services.auth_service import AuthService
+from benchmarks._common import print_table, summarize, temp_sqlite_path
+
+
+def seed(db_path: str, users: int, plans: int, meals: int) -> None:
+    """Populate a fresh database with users, meal plans and planned meals"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    start = datetime(2025, 1, 6)
+    with Session(engine) as db:
+        for u in range(users):
+            user = User(username=f"user{u}", email=f"user{u}@example.com", password_hash="x")
+            db.add(user)
+            db.flush()
+            for p in range(plans):
+                plan = MealPlan(
+                    name=f"Plan {p}", user_id=user.id,
+                    start_date=start, end_date=start + timedelta(days=6)
+                )
+                plan.planned_meals = [
+                    PlannedMeal(recipe_id=1, meal_date=start + timedelta(days=m % 7),
+                                meal_type="dinner", servings=2)
+                    for m in range(meals)
+                ]
+                db.add(plan)
+        db.commit()
+    engine.dispose()
+
+
+def build_blocking_app(db_path: str) -> FastAPI:
+    """Replica of the previous handlers: sync ORM calls inside ``async def`` routes"""
+    # NullPool: with a bounded QueuePool the blocking checkout on the event loop
+    # deadlocks once concurrency exceeds the pool, so "before" would never finish.
+    engine = create_engine(
+        f"sqlite:///{db_path}", connect_args={"check_same_thread": False}, poolclass=NullPool
+    )
+    SyncSession = sessionmaker(bind=engine)
+    app = FastAPI()
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/api/v1/meal-plans")
+    async def get_meal_plans(authorization: str = Header(...), db: Session = Depends(get_sync_db)):
+        payload = AuthService.decode_token(authorization.split()[1])
+        user = db.query(User).filter(User.id == int(payload["sub"])).first()
+        if user is None:
+            raise HTTPException(status_code=401)
+        plans = db.query(MealPlan).filter(MealPlan.user_id == user.id).offset(0).limit(100).all()
+        return [MealPlanSchema.from_orm(plan) for plan in plans]
+
+    return app
+
+
+def build_async_app(db_path: str) -> FastAPI:
+    """The real application with ``get_db`` pointed at the benchmark database"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_bench_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    async_app.dependency_overrides[get_db] = get_bench_db
+    return async_app
+
+
+async def drive(app: FastAPI, label: str, users: int, total: int, concurrency: int) -> dict:
+    """Fire ``total`` GET /meal-plans requests with ``concurrency`` in-flight at once"""
+    tokens = [AuthService.create_access_token({"sub": str(i + 1)}) for i in range(users)]
+    latencies: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(random.choice(tokens))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while True:
+                try:
+                    token = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                response = await client.get(
+                    "/api/v1/meal-plans", headers={"Authorization": f"Bearer {token}"}
+                )
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(label, latencies, elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--plans", type=int, default=20)
+    parser.add_argument("--meals", type=int, default=7)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with temp_sqlite_path() as db_path:
+        seed(db_path, args.users, args.plans, args.meals)
+        rows = [
+            asyncio.run(drive(build_blocking_app(db_path), "before (sync Session)",
+                              args.users, args.requests, args.concurrency)),
+            asyncio.run(drive(build_async_app(db_path), "after (AsyncSession)",
+                              args.users, args.requests, args.concurrency)),
+        ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Concurrent read/write throughput of the SQLite engine profiles.
+
+"legacy" mirrors the previous hardcoded engine: SQL echo on (sent to
+/dev/null so only its cost is measured), default rollback journal and
+``synchronous=FULL``. "production" is ``create_engine_from_settings()`` with
+the configured pool and the WAL/synchronous/mmap/cache pragmas.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_engine_profiles --seconds 5 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import time
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+
+from app.core.database import create_engine_from_settings
+from benchmarks._common import print_table, temp_sqlite_path
+
+metadata = MetaData()
+items = Table(
+    "bench_items", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("payload", String(200)),
+)
+
+SEED_ROWS = 10_000
+
+
+def make_engine(profile: str, db_path: str):
+    url = f"sqlite:///{db_path}"
+    if profile == "legacy":
+        # No pragmas: SQLite defaults (rollback journal, synchronous=FULL)
+        return create_engine_from_settings(url, pragmas={}, echo=True)
+    return create_engine_from_settings(url)
+
+
+async def run_workload(engine, readers: int, writers: int, seconds: float) -> dict:
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            async with engine.connect() as conn:
+                await conn.execute(select(items).where(items.c.id == random.randint(1, SEED_ROWS)))
+            counts["reads"] += 1
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(insert(items).values(payload="x" * 100))
+                counts["writes"] += 1
+            except Exception:
+                counts["errors"] += 1
+
+    await asyncio.gather(*([reader() for _ in range(readers)] + [writer() for _ in range(writers)]))
+    return {k: v / seconds for k, v in counts.items()}
+
+
+async def bench_profile(profile: str, seconds: float, concurrency: int) -> list:
+    rows = []
+    with temp_sqlite_path() as db_path, open(os.devnull, "w") as devnull:
+        # echo's log handler binds to the stdout in effect when the engine is built
+        with contextlib.redirect_stdout(devnull):
+            engine = make_engine(profile, db_path)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(insert(items), [{"payload": "seed"}] * SEED_ROWS)
+
+        workloads = {
+            "read": (concurrency, 0),
+            "write": (0, concurrency),
+            "mixed": (concurrency - concurrency // 4, concurrency // 4),
+        }
+        for name, (readers, writers) in workloads.items():
+            result = await run_workload(engine, readers, writers, seconds)
+            rows.append({
+                "profile": profile,
+                "workload": name,
+                "reads_per_s": result["reads"],
+                "writes_per_s": result["writes"],
+                "errors_per_s": result["errors"],
+            })
+        await engine.dispose()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    rows = []
+    for profile in ("legacy", "production"):
+        rows.extend(asyncio.run(bench_profile(profile, args.seconds, args.concurrency)))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Bulk ingestion throughput for scripts/seed_db.py.
+
+Writes a synthetic dataset in the shape of data/samples/detailed_recipes.json
+(a ``recipes`` array of template-style objects), loads it into an empty
+database with RecipeIngestor, then loads it again to measure the idempotent
+upsert path.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_ingest --recipes 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.database import create_engine_from_settings
+from app.models.base import Base
+from app.models import meal_plan, rating, user  # noqa: F401
+from app.models.recipe import Recipe, RecipeIngredient
+from app.services.ingest_service import DEFAULT_BATCH_SIZE, RecipeIngestor
+from benchmarks._common import print_table, temp_sqlite_path
+from benchmarks.bench_recipe_search import ADJECTIVES, CUISINES, DIFFICULTIES, DISHES, INGREDIENTS, TAGS
+
+UNITS = ["g", "ml", "cups", "tbsp", "tsp", ""]
+
+
+def write_dataset(path: str, count: int) -> None:
+    rng = random.Random(11)
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write('{"recipes": [\n')
+        for n in range(count):
+            dish, adjective = rng.choice(DISHES), rng.choice(ADJECTIVES)
+            items = rng.sample(INGREDIENTS, 8)
+            recipe = {
+                "id": n,
+                "title": f"{adjective.title()} {items[0].title()} {dish.title()}",
+                "description": f"A {adjective} {dish} with {items[1]} and {items[2]}",
+                "cuisine": rng.choice(CUISINES),
+                "difficulty": rng.choice(DIFFICULTIES),
+                "prep_time": rng.randint(5, 60),
+                "cook_time": f"{rng.randint(5, 120)} minutes",
+                "servings": rng.randint(1, 8),
+                "ingredients": [
+                    {"item": item.title(), "amount": f"{rng.randint(1, 500)}{rng.choice(UNITS)}", "notes": ""}
+                    for item in items
+                ],
+                "instructions": [f"Step {step}" for step in range(1, 6)],
+                "tags": rng.sample(TAGS, 4),
+            }
+            fp.write(("," if n else "") + json.dumps(recipe) + "\n")
+        fp.write("]}\n")
+
+
+async def load(db_path: str, data_path: str, batch_size: int) -> dict:
+    engine = create_engine_from_settings(f"sqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as db:
+        stats = await RecipeIngestor(db, batch_size=batch_size).ingest([data_path])
+        recipes = (await db.execute(select(func.count()).select_from(Recipe))).scalar_one()
+        ingredients = (await db.execute(select(func.count()).select_from(RecipeIngredient))).scalar_one()
+    await engine.dispose()
+    return {
+        "recipes": recipes,
+        "ingredients": ingredients,
+        "seconds": stats.elapsed,
+        "recipes_per_s": stats.rate,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with temp_sqlite_path() as db_path:
+        data_path = os.path.join(os.path.dirname(db_path), "recipes.json")
+        started = time.perf_counter()
+        write_dataset(data_path, args.recipes)
+        size_mb = os.path.getsize(data_path) / 1e6
+        print(f"wrote {args.recipes} recipes ({size_mb:.0f} MB) in {time.perf_counter() - started:.1f}s")
+
+        rows = []
+        for label in ("initial load", "re-ingest (upsert)"):
+            rows.append({"run": label, **asyncio.run(load(db_path, data_path, args.batch_size))})
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
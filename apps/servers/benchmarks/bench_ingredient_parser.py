@@ -0,0 +1,130 @@
+"""
+Ingredient parser throughput and accuracy over the bundled recipe corpus.
+
+Collects every ingredient line under data/ (free-text lines such as "2 cups
+all-purpose flour" as well as {"item", "amount"} pairs), then adds synthetic
+lines built from known quantities, unit spellings, descriptors and notes so
+that the parsed quantity, unit and canonical name can be checked against the
+values they were generated from. Reports lines/s, how many lines yielded a
+quantity/unit/canonical name, and accuracy on the synthetic set.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_ingredient_parser --synthetic 200000
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.services.ingest_service import _lookup, discover_files, iter_raw_recipes
+from app.services.ingredient_parser import parse_ingredient
+from benchmarks._common import print_table
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+
+# (text as written, value)
+QUANTITIES = [("1", 1.0), ("2", 2.0), ("1/2", 0.5), ("3/4", 0.75), ("1 1/2", 1.5), ("2 and 1/4", 2.25),
+              ("1.5", 1.5), ("½", 0.5), ("1½", 1.5), ("2-3", 2.5), ("250", 250.0)]
+# (spelling, canonical unit, attach to number)
+UNITS = [("cups", "cup", False), ("cup", "cup", False), ("tbsp", "tbsp", False), ("tablespoons", "tbsp", False),
+         ("tsp", "tsp", False), ("teaspoon", "tsp", False), ("g", "g", True), ("grams", "g", False),
+         ("ml", "ml", True), ("kg", "kg", False), ("oz", "oz", False), ("pounds", "lb", False),
+         ("cloves", "clove", False), ("cans", "can", False), ("", None, False)]
+# (written, canonical)
+NAMES = [("all-purpose flour", "all-purpose flour"), ("eggs", "egg"), ("tomatoes", "tomato"),
+         ("onions", "onion"), ("fresh basil", "basil"), ("ripe mangoes", "mango"), ("berries", "berry"),
+         ("unsalted butter", "unsalted butter"), ("chickpeas", "chickpea"), ("garlic", "garlic"),
+         ("bay leaves", "bay leaf"), ("paneer", "paneer"), ("Greek yogurt", "greek yogurt"),
+         ("large potatoes", "potato"), ("chocolate chips", "chocolate chip")]
+NOTES = ["", ", finely chopped", " (optional)", ", softened", " (about 2 cups)", " for garnish"]
+
+Sample = Tuple[str, Optional[str], Optional[Tuple[Optional[float], Optional[str], str]]]
+
+
+def corpus_lines() -> List[Sample]:
+    """(text, amount, expected=None) for every ingredient entry under data/"""
+    lines: List[Sample] = []
+
+    def collect(entries) -> None:
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, str):
+                lines.append((entry, None, None))
+            elif isinstance(entry, dict) and isinstance(entry.get("items"), list):
+                collect(entry["items"])
+            elif isinstance(entry, dict):
+                item = _lookup((entry,), "item", "name", "ingredient")
+                if isinstance(item, str):
+                    amount = _lookup((entry,), "amount", "quantity")
+                    lines.append((item, str(amount) if amount is not None else None, None))
+
+    for path in discover_files([DATA_DIR]):
+        try:
+            for _, raw in iter_raw_recipes(path):
+                if isinstance(raw, dict):
+                    scopes = [raw] + [value for value in raw.values() if isinstance(value, dict)]
+                    collect(_lookup(scopes, "ingredients", "Ingredients"))
+        except (ValueError, UnicodeDecodeError):
+            continue
+    return lines
+
+
+def synthetic_lines(count: int) -> List[Sample]:
+    rng = random.Random(8)
+    lines: List[Sample] = []
+    for _ in range(count):
+        written_qty, qty = rng.choice(QUANTITIES)
+        spelling, unit, attached = rng.choice(UNITS)
+        written_name, canonical = rng.choice(NAMES)
+        amount = f"{written_qty}{spelling}" if attached and " " not in written_qty else f"{written_qty} {spelling}"
+        expected = (qty, unit, canonical)
+        if rng.random() < 0.3:
+            # {"item": ..., "amount": ...} shape
+            lines.append((written_name.capitalize(), amount.strip(), expected))
+        else:
+            lines.append((f"{amount.strip()} {written_name}{rng.choice(NOTES)}", None, expected))
+    return lines
+
+
+def measure(label: str, lines: List[Sample], rounds: int) -> dict:
+    # Time the parser itself, not its per-line memo
+    parse = parse_ingredient.__wrapped__
+    started = time.perf_counter()
+    for _ in range(rounds):
+        parsed = [parse(text, amount) for text, amount, _ in lines]
+    elapsed = time.perf_counter() - started
+
+    total = len(lines) or 1
+    checked = [(p, expected) for p, (_, _, expected) in zip(parsed, lines) if expected]
+    correct = sum(
+        1 for p, (qty, unit, canonical) in checked
+        if p.quantity == qty and p.unit == unit and p.canonical_name == canonical
+    )
+    return {
+        "corpus": label,
+        "lines": len(lines),
+        "lines_per_s": len(lines) * rounds / elapsed if elapsed else 0.0,
+        "quantity_pct": 100.0 * sum(p.quantity is not None for p in parsed) / total,
+        "unit_pct": 100.0 * sum(p.unit is not None for p in parsed) / total,
+        "canonical_pct": 100.0 * sum(bool(p.canonical_name) for p in parsed) / total,
+        "distinct_ingredients": len({p.canonical_name for p in parsed}),
+        "exact_pct": 100.0 * correct / len(checked) if checked else "",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--synthetic", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=50, help="passes over the (small) data/ corpus")
+    args = parser.parse_args()
+
+    rows = [
+        measure("data/", corpus_lines(), args.rounds),
+        measure("synthetic", synthetic_lines(args.synthetic), 1),
+    ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Login throughput: the streamlined login path vs. the one it replaced.
+
+The "before" route replays the previous POST /users/login: an OR lookup over
+username and email, an ORM last_login commit followed by a refresh select,
+and a token from ``jose.jwt.encode`` rebuilding its key on every call. It is mounted
+on the real application next to the real login route, the "after". Users are seeded with
+minimum-cost argon2 hashes so the numbers show the database and token
+work, which is what changed, rather than argon2 itself.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_login --users 1000 --logins 3000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from jose import jwt
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import create_engine_from_settings, get_db
+from app.main import app as real_app
+from app.models.base import Base
+from app.models.user import User
+from app.schemas.user import Token, UserLogin, UserResponse
+from app.services.auth_service import AuthService
+from benchmarks._common import print_table, summarize, temp_sqlite_path
+
+PASSWORD = "Passw0rdX"
+CHEAP_ARGON2 = CryptContext(
+    schemes=["argon2"], argon2__time_cost=1, argon2__memory_cost=8, argon2__parallelism=1
+)
+
+
+def seed(db_path: str, users: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    password_hash = CHEAP_ARGON2.hash(PASSWORD)
+    with Session(engine) as db:
+        db.add_all(
+            User(username=f"user{u}", email=f"user{u}@example.com", password_hash=password_hash)
+            for u in range(users)
+        )
+        db.commit()
+    engine.dispose()
+
+
+PREVIOUS_LOGIN = "/bench/previous-login"
+
+
+def add_previous_login(app: FastAPI) -> None:
+    """Replica of the previous login handler, mounted beside the real one so both share the middleware"""
+
+    @app.post(PREVIOUS_LOGIN, response_model=Token)
+    async def login_user(user_login: UserLogin, db: AsyncSession = Depends(get_db)):
+        login = user_login.username_or_email.lower()
+        user = (await db.execute(
+            select(User).where(or_(User.username == login, User.email == login))
+        )).scalars().first()
+        if not user or not await AuthService.verify_password_async(user_login.password, user.password_hash):
+            raise HTTPException(status_code=401)
+        user.last_login = datetime.utcnow()
+        try:
+            await db.commit()
+            await db.refresh(user)
+        except Exception:
+            # As before: a failed last_login write is swallowed
+            await db.rollback()
+            await db.refresh(user)
+        token = jwt.encode(
+            {"sub": str(user.id), "type": "access", "exp": datetime.utcnow() + timedelta(minutes=30)},
+            settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
+        return Token(access_token=token, expires_in=1800, user=UserResponse.from_orm(user))
+
+
+async def drive(url: str, label: str, engine, identifiers: List[str], concurrency: int) -> dict:
+    statements = []
+    listener = lambda *args: statements.append(1)  # noqa: E731
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    queue: asyncio.Queue = asyncio.Queue()
+    for identifier in identifiers:
+        queue.put_nowait(identifier)
+    latencies: List[float] = []
+    failures = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=real_app), base_url="http://bench") as client:
+        async def worker():
+            nonlocal failures
+            while True:
+                try:
+                    identifier = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                response = await client.post(
+                    url, json={"username_or_email": identifier, "password": PASSWORD}
+                )
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+    row = summarize(label, latencies, elapsed)
+    row["failed"] = failures
+    row["queries_per_login"] = len(statements) / len(identifiers)
+    return row
+
+
+async def run(db_path: str, users: int, logins: int, concurrency: int) -> list:
+    engine = create_engine_from_settings(f"sqlite:///{db_path}")
+
+    async def get_bench_db():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    real_app.dependency_overrides[get_db] = get_bench_db
+    add_previous_login(real_app)
+    rng = random.Random(22)
+    # Half the sign-ins by username, half by email as typed by the user
+    identifiers = [
+        f"user{u}" if n % 2 else f"User{u}@Example.com"
+        for n, u in enumerate(rng.randrange(users) for _ in range(logins))
+    ]
+    rows = [
+        await drive(PREVIOUS_LOGIN, "before (OR lookup, refresh, jose)", engine, identifiers, concurrency),
+        await drive("/api/v1/users/login", "after (one seek, buffered last_login, signer)", engine, identifiers, concurrency),
+    ]
+    real_app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--logins", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with temp_sqlite_path() as db_path:
+        seed(db_path, args.users)
+        print_table(asyncio.run(run(db_path, args.users, args.logins, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
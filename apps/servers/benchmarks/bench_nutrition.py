@@ -0,0 +1,147 @@
+"""
+Meal plan nutrition: one batched call for many plans vs a per-plan loop.
+
+Loads a synthetic recipe catalog through RecipeIngestor (which also fills the
+recipe_nutrition cache), creates many one-week plans (three meals a day), then
+times NutritionService.meal_plan_summaries for all plans at once against the
+per-ingredient Python loop it replaced, run plan by plan: look up each
+ingredient's nutrition facts and accumulate calories/protein/carbs/fat in
+dicts. Also times recomputing every planned recipe's totals from its
+ingredient rows, the work the cache saves on each read.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_nutrition --recipes 20000 --plans 2000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import create_engine_from_settings
+from app.models.base import Base
+from app.models import rating  # noqa: F401
+from app.models.meal_plan import MealPlan, PlannedMeal
+from app.models.recipe import Ingredient, Recipe, RecipeIngredient
+from app.models.user import User
+from app.services.ingest_service import RecipeIngestor, normalize_recipe
+from app.services.nutrition_service import NutritionService, get_nutrition_engine
+from benchmarks._common import print_table, temp_sqlite_path
+from benchmarks.bench_shopping_list import MEAL_TYPES
+
+QUANTITIES = ["200 g", "1 cup", "2 tbsp", "1", "1/2 lb", "100 ml"]
+FOODS = ["chicken breast", "salmon", "quinoa", "olive oil", "avocado", "broccoli",
+         "sweet potato", "greek yogurt", "spinach", "almonds", "paprika", "rice"]
+
+
+async def seed(db: AsyncSession, recipes: int, plans: int) -> list:
+    rng = random.Random(11)
+    ingestor = RecipeIngestor(db)
+    batch = []
+    for n in range(recipes):
+        raw = {
+            "title": f"Bowl {n}",
+            "servings": rng.randint(1, 6),
+            "ingredients": [f"{rng.choice(QUANTITIES)} {item}" for item in rng.sample(FOODS, 6)],
+        }
+        batch.append(normalize_recipe(raw, f"bench#{n}"))
+        if len(batch) == 2000:
+            await ingestor.write_batch(batch)
+            batch = []
+    if batch:
+        await ingestor.write_batch(batch)
+
+    user = User(username="planner", email="planner@example.org", password_hash="x")
+    db.add(user)
+    await db.flush()
+    start = datetime(2026, 1, 5)
+    meal_plans = [MealPlan(name=f"Week {n}", user_id=user.id, start_date=start, end_date=start + timedelta(days=6))
+                  for n in range(plans)]
+    db.add_all(meal_plans)
+    await db.flush()
+    db.add_all(
+        PlannedMeal(meal_plan_id=meal_plan.id, recipe_id=rng.randint(1, recipes),
+                    meal_date=start + timedelta(days=day), meal_type=meal_type, servings=rng.randint(1, 4))
+        for meal_plan in meal_plans for day in range(7) for meal_type in MEAL_TYPES
+    )
+    await db.commit()
+    return [meal_plan.id for meal_plan in meal_plans]
+
+
+async def per_plan_loop(db: AsyncSession, meal_plan_ids: list) -> float:
+    """The replaced approach: one plan at a time, one ingredient at a time"""
+    engine = get_nutrition_engine()
+    columns = [engine.nutrients.index(name) for name in ("calories", "protein", "carbs", "fat")]
+    calories = 0.0
+    for meal_plan_id in meal_plan_ids:
+        rows = (await db.execute(
+            select(PlannedMeal.servings, Recipe.servings, Ingredient.name, RecipeIngredient.quantity, RecipeIngredient.unit)
+            .join(Recipe, Recipe.id == PlannedMeal.recipe_id)
+            .join(RecipeIngredient, RecipeIngredient.recipe_id == Recipe.id)
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id, isouter=True)
+            .where(PlannedMeal.meal_plan_id == meal_plan_id, RecipeIngredient.quantity.isnot(None))
+        )).all()
+        totals = dict.fromkeys(("calories", "protein", "carbs", "fat"), 0.0)
+        for planned, servings, name, quantity, unit in rows:
+            row = engine.row(name)
+            grams = float(engine.grams(np.array([row]), np.array([quantity]), [unit])[0]) * (planned or 1) / (servings or planned or 1)
+            for key, column in zip(totals, columns):
+                totals[key] += grams * engine.matrix[row, column]
+        calories += totals["calories"]
+    return calories
+
+
+async def measure(db_path: str, recipes: int, plans: int, rounds: int) -> list:
+    engine = create_engine_from_settings(f"sqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        started = time.perf_counter()
+        meal_plan_ids = await seed(db, recipes, plans)
+        print(f"seeded {recipes} recipes and {plans} weekly plans in {time.perf_counter() - started:.1f}s")
+
+        service = NutritionService(db)
+        recipe_ids = (await db.execute(select(PlannedMeal.recipe_id).distinct())).scalars().all()
+        batched, recomputed, looped = [], [], []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            summaries = await service.meal_plan_summaries(meal_plan_ids)
+            batched.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await service.recipe_vectors(recipe_ids)
+            recomputed.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            calories = await per_plan_loop(db, meal_plan_ids)
+            looped.append(time.perf_counter() - started)
+    await engine.dispose()
+
+    batched_calories = sum(summary.total_calories for summary in summaries.values())
+    best_batched, best_looped = min(batched), min(looped)
+    return [
+        {"approach": "batched, cached recipe totals", "plans": plans, "total_s": best_batched,
+         "plans_per_s": plans / best_batched, "kcal": round(batched_calories)},
+        {"approach": "recompute recipe totals only", "plans": "", "total_s": min(recomputed),
+         "plans_per_s": "", "kcal": ""},
+        {"approach": "per plan, per ingredient", "plans": plans, "total_s": best_looped,
+         "plans_per_s": plans / best_looped, "kcal": round(calories)},
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--plans", type=int, default=2_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with temp_sqlite_path() as db_path:
+        print_table(asyncio.run(measure(db_path, args.recipes, args.plans, args.rounds)))
+
+
+if __name__ == "__main__":
+    main()
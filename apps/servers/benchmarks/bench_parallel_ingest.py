@@ -0,0 +1,102 @@
+"""
+Ingestion throughput against parser worker count.
+
+Writes a directory of single-recipe files shaped like data/samples (free-text
+ingredient lines, "20 minutes" style times, tags) and loads it into a fresh
+database once per worker count. A final run against an already-loaded
+database shows how quickly the checkpoint manifest skips unchanged files.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_parallel_ingest --files 100000 --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import create_engine_from_settings
+from app.models.base import Base
+from app.models import meal_plan, rating, recipe, user  # noqa: F401
+from app.services.ingest_service import DEFAULT_BATCH_SIZE, IngestManifest, RecipeIngestor
+from benchmarks._common import print_table, temp_sqlite_path
+from benchmarks.bench_recipe_search import ADJECTIVES, DIFFICULTIES, DISHES, INGREDIENTS, TAGS
+
+CATEGORIES = ["Vegan", "Desserts", "Beverage", "Snack", "Breakfast", "Dinner"]
+QUANTITIES = ["1 cup", "1/2 cup", "2 tablespoons", "1 teaspoon", "200g", "3", "1 and 1/2 cups"]
+
+
+def write_files(directory: str, count: int) -> None:
+    rng = random.Random(5)
+    for n in range(count):
+        dish, adjective = rng.choice(DISHES), rng.choice(ADJECTIVES)
+        items = rng.sample(INGREDIENTS, 8)
+        recipe = {
+            "recipe_name": f"{adjective.title()} {items[0].title()} {dish.title()} {n}",
+            "author": "bench",
+            "category": rng.choice(CATEGORIES),
+            "description": f"A {adjective} {dish} with {items[1]} and {items[2]}.",
+            "ingredients": [f"{rng.choice(QUANTITIES)} {item} (chopped)" for item in items],
+            "instructions": [f"Step {step}: prepare the {rng.choice(items)}." for step in range(1, 7)],
+            "prep_time": f"{rng.randint(5, 90)} minutes",
+            "servings": rng.randint(1, 8),
+            "difficulty": rng.choice(DIFFICULTIES),
+            "tags": rng.sample(TAGS, 4),
+        }
+        subdir = os.path.join(directory, f"{n // 1000:04d}")
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f"recipe_{n}.json"), "w", encoding="utf-8") as fp:
+            json.dump(recipe, fp, indent=2)
+
+
+async def load(db_path: str, data_dir: str, workers: int, batch_size: int, manifest: IngestManifest) -> dict:
+    engine = create_engine_from_settings(f"sqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as db:
+        ingestor = RecipeIngestor(db, batch_size=batch_size, workers=workers, manifest=manifest)
+        stats = await ingestor.ingest([data_dir])
+    await engine.dispose()
+    return {
+        "recipes": stats.recipes,
+        "unchanged_files": stats.unchanged,
+        "seconds": stats.elapsed,
+        "recipes_per_s": stats.rate,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with temp_sqlite_path() as db_path:
+        tmp = os.path.dirname(db_path)
+        data_dir = os.path.join(tmp, "recipes")
+        started = time.perf_counter()
+        write_files(data_dir, args.files)
+        print(f"wrote {args.files} files in {time.perf_counter() - started:.1f}s (cpu count: {os.cpu_count()})")
+
+        rows = []
+        for workers in args.workers:
+            run_db = os.path.join(tmp, f"workers_{workers}.db")
+            manifest = IngestManifest(os.path.join(tmp, f"workers_{workers}.manifest.json"))
+            rows.append({"run": f"{workers} workers", **asyncio.run(
+                load(run_db, data_dir, workers, args.batch_size, manifest)
+            )})
+
+        # Second pass over the last database: everything is in the manifest
+        rows.append({"run": "re-run (manifest)", **asyncio.run(
+            load(run_db, data_dir, args.workers[-1], args.batch_size, manifest)
+        )})
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
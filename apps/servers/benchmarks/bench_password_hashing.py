@@ -0,0 +1,167 @@
+"""
+Login bursts: argon2 inline on the event loop vs. the bounded hashing pool.
+
+Seeds users with real argon2 hashes, then fires a burst of concurrent
+POST /users/login while a prober times GET /health, an endpoint that does no
+hashing. The "inline" run hashes on the event loop, as login used to; the
+"pool" run uses AuthService's hashing pool, which keeps the loop free and
+turns logins beyond PASSWORD_HASH_MAX_PENDING away with 503. Shed clients
+retry after the Retry-After they were given; login latency includes that.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_password_hashing --users 20 --logins 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import create_engine_from_settings, get_db
+from app.core.security import HashingPool, pwd_context
+from app.main import app
+from app.models.base import Base
+from app.models.user import User
+from app.services import auth_service
+from app.services.auth_service import AuthService
+from benchmarks._common import percentile, print_table, temp_sqlite_path
+
+PASSWORD = "Passw0rdX"
+
+
+def seed(db_path: str, users: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    password_hash = AuthService.get_password_hash(PASSWORD)
+    with Session(engine) as db:
+        db.add_all(
+            User(username=f"user{u}", email=f"user{u}@example.com", password_hash=password_hash)
+            for u in range(users)
+        )
+        db.commit()
+    engine.dispose()
+
+
+async def inline_verify(plain_password: str, hashed_password: str) -> bool:
+    """The previous login path: argon2 straight on the event loop"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+async def drive(label: str, users: int, logins: int, concurrency: int) -> dict:
+    statuses: List[int] = []
+    login_latencies: List[float] = []
+    probe_latencies: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for n in range(logins):
+        queue.put_nowait(f"user{n % users}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def login_worker():
+            while True:
+                try:
+                    username = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                while True:
+                    try:
+                        response = await client.post(
+                            "/api/v1/users/login", json={"username_or_email": username, "password": PASSWORD}
+                        )
+                    except Exception:
+                        # The inline run can exhaust the connection pool
+                        statuses.append(500)
+                        break
+                    statuses.append(response.status_code)
+                    if response.status_code == 200:
+                        login_latencies.append(time.perf_counter() - started)
+                    if response.status_code != 503:
+                        break
+                    # Shed: come back when the server asks
+                    await asyncio.sleep(float(response.headers["Retry-After"]))
+
+        async def prober(done: asyncio.Event):
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/api/v1/health")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        done = asyncio.Event()
+        probe = asyncio.create_task(prober(done))
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+    return {
+        "label": label,
+        "logins_ok": statuses.count(200),
+        "shed_503": statuses.count(503),
+        "errors": len(statuses) - statuses.count(200) - statuses.count(503),
+        "logins_per_s": statuses.count(200) / elapsed,
+        "login_p99_ms": percentile(login_latencies, 99) * 1000,
+        "health_p50_ms": percentile(probe_latencies, 50) * 1000,
+        "health_p99_ms": percentile(probe_latencies, 99) * 1000,
+        "health_max_ms": max(probe_latencies, default=0.0) * 1000,
+    }
+
+
+async def run(db_path: str, users: int, logins: int, concurrency: int, workers: int, max_pending: int) -> list:
+    engine = create_engine_from_settings(f"sqlite:///{db_path}")
+
+    async def get_bench_db():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_bench_db
+    rows = []
+
+    pooled_verify = AuthService.verify_password_async
+    AuthService.verify_password_async = staticmethod(inline_verify)
+    try:
+        rows.append(await drive("inline (event loop)", users, logins, concurrency))
+    finally:
+        AuthService.verify_password_async = pooled_verify
+
+    pool = HashingPool(workers, max_pending, settings.PASSWORD_HASH_RETRY_AFTER)
+    default_pool, auth_service.hashing_pool = auth_service.hashing_pool, pool
+    try:
+        rows.append(await drive(f"pool ({workers} threads, {max_pending} pending)", users, logins, concurrency))
+    finally:
+        auth_service.hashing_pool = default_pool
+        pool.shutdown()
+
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=settings.PASSWORD_HASH_MAX_PENDING)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with temp_sqlite_path() as db_path:
+        seed(db_path, args.users)
+        print_table(asyncio.run(run(
+            db_path, args.users, args.logins, args.concurrency, args.workers, args.max_pending
+        )))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Recipe search latency: FTS5 index vs. a LIKE '%q%' scan.
+
+Generates a synthetic catalog (names, descriptions, ingredients, tags and
+cuisines drawn from realistic vocabularies), builds the ``recipes_fts`` index
+and measures RecipeSearchIndex.search (ranked hits plus all facets) for a
+mix of full-word, prefix and multi-term queries.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_recipe_search --recipes 500000
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.base import Base
+from app.models import meal_plan, rating, recipe, user  # noqa: F401
+from app.services.search_service import RecipeSearchIndex
+from benchmarks._common import percentile, print_table, temp_sqlite_path
+
+CUISINES = ["Italian", "Indian", "Mexican", "Chinese", "Thai", "French", "Greek", "American", "Japanese"]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+DISHES = ["pasta", "curry", "salad", "soup", "tacos", "risotto", "stew", "bowl", "pancakes",
+          "biryani", "brownies", "smoothie", "sandwich", "noodles", "pizza", "tart", "kebab"]
+ADJECTIVES = ["spicy", "creamy", "classic", "quick", "roasted", "grilled", "healthy", "smoky",
+              "lemony", "garlicky", "crispy", "hearty", "vegan", "rustic"]
+INGREDIENTS = ["chicken", "paneer", "spinach", "mushroom", "tomato", "garlic", "onion", "basil",
+               "rice", "quinoa", "chickpeas", "salmon", "avocado", "mango", "cocoa", "lentils",
+               "ginger", "coriander", "cumin", "butter", "yogurt", "lemon", "pepper", "flour"]
+TAGS = ["vegetarian", "vegan", "gluten-free", "quick", "dinner", "lunch", "breakfast", "spicy",
+        "comfort-food", "healthy", "kid-friendly", "meal-prep", "dessert", "budget"]
+
+QUERIES = ["chicken", "paneer tikka", "spic", "creamy mushroom risotto", "gar", "quinoa bowl",
+           "mango", "lentils curry", "crispy", "vegan tacos"]
+
+
+def generate(db_path: str, count: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(42)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = 10_000
+    for start in range(1, count + 1, batch):
+        recipes, ingredients, tags = [], [], []
+        for rid in range(start, min(start + batch, count + 1)):
+            dish, adjective = rng.choice(DISHES), rng.choice(ADJECTIVES)
+            items = rng.sample(INGREDIENTS, 6)
+            recipes.append((rid, f"{adjective.title()} {items[0].title()} {dish.title()}",
+                            f"A {adjective} {dish} with {items[1]} and {items[2]}",
+                            rng.choice(CUISINES), rng.choice(DIFFICULTIES), "2025-01-01 00:00:00.000000"))
+            ingredients.extend((rid, pos, name) for pos, name in enumerate(items))
+            tags.extend((rid, tag) for tag in rng.sample(TAGS, 3))
+        conn.executemany(
+            "INSERT INTO recipes (id, name, description, cuisine, difficulty, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            recipes
+        )
+        conn.executemany("INSERT INTO recipe_ingredients (recipe_id, position, name) VALUES (?, ?, ?)", ingredients)
+        conn.executemany("INSERT INTO recipe_tags (recipe_id, tag) VALUES (?, ?)", tags)
+        conn.commit()
+    conn.close()
+
+
+async def measure(db_path: str, rounds: int, like_rounds: int) -> list:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    rows = []
+    async with AsyncSession(engine) as db:
+        index = RecipeSearchIndex(db)
+        started = time.perf_counter()
+        await index.rebuild()
+        await db.commit()
+        print(f"index rebuild: {time.perf_counter() - started:.1f}s")
+
+        fts_all = []
+        for q in QUERIES:
+            fts, like = [], []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                result = await index.search(q, limit=20)
+                fts.append(time.perf_counter() - started)
+            for _ in range(like_rounds):
+                started = time.perf_counter()
+                await db.execute(
+                    text("SELECT id, name FROM recipes WHERE name LIKE :q OR description LIKE :q LIMIT 20"),
+                    {"q": f"%{q}%"}
+                )
+                await db.execute(
+                    text("SELECT count(*) FROM recipes WHERE name LIKE :q OR description LIKE :q"),
+                    {"q": f"%{q}%"}
+                )
+                like.append(time.perf_counter() - started)
+            fts_all.extend(fts)
+            rows.append({
+                "query": q,
+                "matches": result.total,
+                "fts_p50_ms": percentile(fts, 50) * 1000,
+                "fts_p99_ms": percentile(fts, 99) * 1000,
+                "like_p50_ms": percentile(like, 50) * 1000,
+            })
+
+    await engine.dispose()
+    rows.append({
+        "query": "(all)",
+        "matches": "",
+        "fts_p50_ms": percentile(fts_all, 50) * 1000,
+        "fts_p99_ms": percentile(fts_all, 99) * 1000,
+        "like_p50_ms": "",
+    })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--like-rounds", type=int, default=2)
+    args = parser.parse_args()
+
+    with temp_sqlite_path() as db_path:
+        started = time.perf_counter()
+        generate(db_path, args.recipes)
+        print(f"generated {args.recipes} recipes in {time.perf_counter() - started:.1f}s")
+        print_table(asyncio.run(measure(db_path, args.rounds, args.like_rounds)))
+
+
+if __name__ == "__main__":
+    main()
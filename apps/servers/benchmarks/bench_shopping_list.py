@@ -0,0 +1,156 @@
+"""
+Shopping list generation for a 4-week family meal plan.
+
+Loads a synthetic recipe catalog through RecipeIngestor (so ingredients carry
+parsed quantities, units and canonical ids), plans three meals a day for
+four weeks at family servings, then times MealPlanService.generate_shopping_list
+(one grouped query plus a bulk insert) against the per-meal approach it
+replaced: load each planned recipe and re-parse its ingredient strings.
+Then times adding and removing one planned meal on the plan, which applies a
+delta to the existing list instead of rebuilding it.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_shopping_list --recipes 50000 --weeks 4
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.database import create_engine_from_settings
+from app.models.base import Base
+from app.models import rating  # noqa: F401
+from app.models.meal_plan import MealPlan, PlannedMeal
+from app.models.recipe import Recipe
+from app.models.user import User
+from app.schemas.meal_plan import PlannedMealCreate
+from app.services.ingest_service import RecipeIngestor, normalize_recipe
+from app.services.ingredient_parser import BASE_UNITS, parse_ingredient
+from app.services.meal_plan_service import MealPlanService
+from benchmarks._common import percentile, print_table, temp_sqlite_path
+from benchmarks.bench_parallel_ingest import QUANTITIES
+from benchmarks.bench_recipe_search import DISHES, INGREDIENTS
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner"]
+
+
+async def seed(db: AsyncSession, recipes: int) -> None:
+    rng = random.Random(9)
+    ingestor = RecipeIngestor(db)
+    batch = []
+    for n in range(recipes):
+        raw = {
+            "title": f"{rng.choice(DISHES).title()} {n}",
+            "servings": rng.randint(1, 8),
+            "ingredients": [f"{rng.choice(QUANTITIES)} {item}" for item in rng.sample(INGREDIENTS, 10)],
+        }
+        batch.append(normalize_recipe(raw, f"bench#{n}"))
+        if len(batch) == 2000:
+            await ingestor.write_batch(batch)
+            batch = []
+    if batch:
+        await ingestor.write_batch(batch)
+
+
+async def plan(db: AsyncSession, recipes: int, weeks: int) -> int:
+    rng = random.Random(10)
+    user = User(username="family", email="family@example.org", password_hash="x")
+    db.add(user)
+    await db.flush()
+    start = datetime(2026, 1, 5)
+    meal_plan = MealPlan(name="Family month", user_id=user.id, start_date=start, end_date=start + timedelta(weeks=weeks))
+    db.add(meal_plan)
+    await db.flush()
+    db.add_all(
+        PlannedMeal(
+            meal_plan_id=meal_plan.id, recipe_id=rng.randint(1, recipes),
+            meal_date=start + timedelta(days=day), meal_type=meal_type, servings=4
+        )
+        for day in range(weeks * 7) for meal_type in MEAL_TYPES
+    )
+    await db.commit()
+    return meal_plan.id
+
+
+async def per_meal_list(db: AsyncSession, meal_plan_id: int) -> int:
+    """The replaced approach: walk planned meals, load each recipe and parse its strings"""
+    meals = (await db.execute(select(PlannedMeal).where(PlannedMeal.meal_plan_id == meal_plan_id))).scalars().all()
+    totals = defaultdict(float)
+    for meal in meals:
+        recipe = (await db.execute(
+            select(Recipe).options(selectinload(Recipe.ingredients)).where(Recipe.id == meal.recipe_id)
+        )).scalars().first()
+        scale = meal.servings / (recipe.servings or meal.servings)
+        for ingredient in recipe.ingredients:
+            parsed = parse_ingredient.__wrapped__(ingredient.name, ingredient.amount)
+            base, factor = BASE_UNITS.get(parsed.unit, (parsed.unit or "count", 1.0))
+            totals[(parsed.canonical_name, base)] += (parsed.quantity or 0.0) * factor * scale
+    return len(totals)
+
+
+async def measure(db_path: str, recipes: int, weeks: int, rounds: int) -> list:
+    engine = create_engine_from_settings(f"sqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        started = time.perf_counter()
+        await seed(db, recipes)
+        meal_plan_id = await plan(db, recipes, weeks)
+        print(f"seeded {recipes} recipes and {weeks * 7 * len(MEAL_TYPES)} planned meals "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        service = MealPlanService(db)
+        grouped, per_meal = [], []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            shopping_list = await service.generate_shopping_list(meal_plan_id, 1)
+            grouped.append(time.perf_counter() - started)
+            db.expunge_all()
+            started = time.perf_counter()
+            lines = await per_meal_list(db, meal_plan_id)
+            per_meal.append(time.perf_counter() - started)
+            db.expunge_all()
+
+        added, removed = [], []
+        meal = PlannedMealCreate(recipe_id=1, meal_date=datetime(2026, 1, 5), meal_type="snack", servings=4)
+        for _ in range(rounds):
+            started = time.perf_counter()
+            planned_meal = await service.add_planned_meal(meal_plan_id, 1, meal)
+            added.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await service.delete_planned_meal(planned_meal.id, 1)
+            removed.append(time.perf_counter() - started)
+            db.expunge_all()
+    await engine.dispose()
+    return [
+        {"approach": "grouped query + bulk insert", "items": len(shopping_list.items),
+         "p50_ms": percentile(grouped, 50) * 1000, "p99_ms": percentile(grouped, 99) * 1000},
+        {"approach": "per meal, re-parse (no write)", "items": lines,
+         "p50_ms": percentile(per_meal, 50) * 1000, "p99_ms": percentile(per_meal, 99) * 1000},
+        {"approach": "add one planned meal (delta)", "items": "",
+         "p50_ms": percentile(added, 50) * 1000, "p99_ms": percentile(added, 99) * 1000},
+        {"approach": "delete one planned meal (delta)", "items": "",
+         "p50_ms": percentile(removed, 50) * 1000, "p99_ms": percentile(removed, 99) * 1000},
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    with temp_sqlite_path() as db_path:
+        print_table(asyncio.run(measure(db_path, args.recipes, args.weeks, args.rounds)))
+
+
+if __name__ == "__main__":
+    main()
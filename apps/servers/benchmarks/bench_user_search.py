@@ -0,0 +1,143 @@
+"""
+User search latency: FTS5 trigram index vs. the old four-column ILIKE scan.
+
+Generates a synthetic user table, builds ``users_fts`` and runs the same
+substring queries through both the previous ``search_users`` query (OR of
+leading-wildcard ILIKEs, unranked) and UserSearchIndex.search (ranked), for
+rare and common terms, email domains, misses and short prefixes. The old
+query is only fast when it can stop after the first page of matches; misses
+and rare terms scan the whole table.
+
+Usage (from apps/servers):
+    python -m benchmarks.bench_user_search --users 1000000
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.base import Base
+from app.models import meal_plan, rating, recipe, user  # noqa: F401
+from app.models.user import User
+from app.services.search_service import UserSearchIndex
+from benchmarks._common import percentile, print_table, temp_sqlite_path
+
+FIRST_NAMES = ["james", "mary", "robert", "patricia", "john", "jennifer", "michael", "linda", "priya",
+               "arjun", "wei", "mei", "carlos", "sofia", "ahmed", "fatima", "olga", "ivan", "yuki", "kenji"]
+LAST_NAMES = ["smith", "johnson", "williams", "brown", "garcia", "sharma", "patel", "chen", "wang",
+              "kumar", "rossi", "muller", "tanaka", "silva", "novak", "kowalski", "ivanova", "haddad"]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "example.org", "proton.me", "recipehub.dev"]
+
+QUERIES = ["johnson", "priya", "sharma", "chen4", "arjun_kumar", "proton", "xyzzy", "tanaka77", "ma", "ol"]
+
+
+def generate(db_path: str, count: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(7)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = 20_000
+    for start in range(1, count + 1, batch):
+        rows = []
+        for uid in range(start, min(start + batch, count + 1)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            username = f"{first}_{last}{uid}"
+            rows.append((uid, username, f"{username}@{rng.choice(DOMAINS)}", "x",
+                         first.title(), last.title(), rng.random() > 0.02))
+        conn.executemany(
+            "INSERT INTO users (id, username, email, password_hash, first_name, last_name, is_active) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+    conn.close()
+
+
+async def legacy_search(db: AsyncSession, query: str, limit: int) -> list:
+    """The pre-index search_users query"""
+    result = await db.execute(
+        select(User).where(
+            User.is_active == True,
+            or_(
+                User.username.ilike(f"%{query}%"),
+                User.email.ilike(f"%{query}%"),
+                User.first_name.ilike(f"%{query}%"),
+                User.last_name.ilike(f"%{query}%")
+            )
+        ).offset(0).limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def measure(db_path: str, rounds: int, legacy_rounds: int, limit: int) -> list:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    rows = []
+    async with AsyncSession(engine) as db:
+        index = UserSearchIndex(db)
+        started = time.perf_counter()
+        await index.rebuild()
+        await db.commit()
+        print(f"index rebuild: {time.perf_counter() - started:.1f}s")
+
+        fts_all, legacy_all = [], []
+        for q in QUERIES:
+            fts, legacy = [], []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                hits, _ = await index.search(q, limit)
+                fts.append(time.perf_counter() - started)
+                db.expunge_all()
+            for _ in range(legacy_rounds):
+                started = time.perf_counter()
+                await legacy_search(db, q, limit)
+                legacy.append(time.perf_counter() - started)
+                db.expunge_all()
+            fts_all.extend(fts)
+            legacy_all.extend(legacy)
+            rows.append({
+                "query": q,
+                "hits": len(hits),
+                "index_p50_ms": percentile(fts, 50) * 1000,
+                "index_p99_ms": percentile(fts, 99) * 1000,
+                "ilike_p50_ms": percentile(legacy, 50) * 1000,
+                "ilike_p99_ms": percentile(legacy, 99) * 1000,
+            })
+
+    await engine.dispose()
+    rows.append({
+        "query": "(all)",
+        "hits": "",
+        "index_p50_ms": percentile(fts_all, 50) * 1000,
+        "index_p99_ms": percentile(fts_all, 99) * 1000,
+        "ilike_p50_ms": percentile(legacy_all, 50) * 1000,
+        "ilike_p99_ms": percentile(legacy_all, 99) * 1000,
+    })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--legacy-rounds", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with temp_sqlite_path() as db_path:
+        started = time.perf_counter()
+        generate(db_path, args.users)
+        print(f"generated {args.users} users in {time.perf_counter() - started:.1f}s")
+        print_table(asyncio.run(measure(db_path, args.rounds, args.legacy_rounds, args.limit)))
+
+
+if __name__ == "__main__":
+    main()
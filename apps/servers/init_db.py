@@ -3,6 +3,7 @@
 Database initialization script for Recipe Hub
 """
 
+import asyncio
 import sys
 import os
 
@@ -12,17 +13,20 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 from app.core.database import engine
 from app.models.base import Base
 from app.models.user import User
-# Import other models when they are created
-# from app.models.recipe import Recipe
-# from app.models.rating import Rating
+from app.models.recipe import Recipe
+from app.models.rating import Rating
+from app.models.meal_plan import MealPlan, PlannedMeal, ShoppingList, ShoppingListItem
+from app.models.token import RevokedToken
+from app.models.image import Image
 
-def init_db():
+async def init_db():
     """Initialize the database by creating all tables"""
     print("Creating database tables...")
     
     try:
         # Create all tables
-        Base.metadata.create_all(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         print("✅ Database tables created successfully!")
         
         # Print created tables
@@ -35,4 +39,4 @@ def init_db():
         sys.exit(1)
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    asyncio.run(init_db())
\ No newline at end of file
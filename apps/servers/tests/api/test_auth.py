@@ -0,0 +1,139 @@
+"""
+Token lifecycle as clients see it: refresh token rotation, logout and
+account deactivation each cut off the tokens issued before them.
+"""
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.revocation import deny_list
+from app.models.user import User
+from app.services.user_service import PRINCIPAL_CACHE, UserService
+from tests.conftest import sign_in
+
+pytestmark = pytest.mark.anyio
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+async def refresh(client, tokens: dict):
+    return await client.post("/api/v1/users/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+
+async def test_refresh_token_is_single_use(make_client):
+    client = await make_client("alice")
+    tokens = await sign_in(client, "alice")
+
+    response = await refresh(client, tokens)
+    assert response.status_code == 200, response.text
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert (await client.get("/api/v1/users/me", headers=bearer(rotated))).status_code == 200
+
+    # Replaying the rotated-out token is refused; its successor still works
+    assert (await refresh(client, tokens)).status_code == 401
+    assert (await refresh(client, rotated)).status_code == 200
+
+
+async def test_access_token_is_not_a_refresh_token(make_client):
+    client = await make_client("alice")
+    tokens = await sign_in(client, "alice")
+
+    response = await client.post("/api/v1/users/refresh", json={"refresh_token": tokens["access_token"]})
+    assert response.status_code == 401
+
+
+async def test_logout_revokes_the_session_tokens(make_client):
+    client = await make_client("alice")
+    tokens = await sign_in(client, "alice")
+    other = await sign_in(await make_client(), "alice")
+
+    response = await client.post("/api/v1/users/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200, response.text
+
+    assert (await client.get("/api/v1/users/me")).status_code == 401
+    assert (await refresh(client, tokens)).status_code == 401
+    # Another session of the same user is untouched
+    assert (await client.get("/api/v1/users/me", headers=bearer(other))).status_code == 200
+
+
+async def test_logout_twice_is_refused(make_client):
+    client = await make_client("alice")
+    tokens = await sign_in(client, "alice")
+    assert (await client.post("/api/v1/users/logout", json={"refresh_token": tokens["refresh_token"]})).status_code == 200
+
+    assert (await client.post("/api/v1/users/logout", json={})).status_code == 401
+
+
+async def make_admin(make_client, engine):
+    admin = await make_client("admin")
+    async with AsyncSession(engine) as db:
+        await db.execute(update(User).where(User.username == "admin").values(is_superuser=True))
+        await db.commit()
+    PRINCIPAL_CACHE.clear()
+    return admin
+
+
+async def test_deactivation_revokes_every_earlier_token(make_client, engine):
+    client = await make_client("alice")
+    tokens = await sign_in(client, "alice")
+    admin = await make_admin(make_client, engine)
+
+    user_id = tokens["user"]["id"]
+    response = await admin.put(f"/api/v1/users/admin/users/{user_id}/deactivate")
+    assert response.status_code == 200, response.text
+    assert (await client.get("/api/v1/users/me")).status_code == 401
+    assert (await refresh(client, tokens)).status_code == 401
+
+    # Tokens issued before the deactivation stay revoked after reactivation
+    response = await admin.put(f"/api/v1/users/admin/users/{user_id}/activate")
+    assert response.status_code == 200, response.text
+    assert (await client.get("/api/v1/users/me")).status_code == 401
+    assert (await refresh(client, tokens)).status_code == 401
+
+
+async def test_self_deactivation_revokes_the_session(make_client):
+    client = await make_client("alice")
+    tokens = await sign_in(client, "alice")
+
+    assert (await client.delete("/api/v1/users/me")).status_code == 200
+    assert (await client.get("/api/v1/users/me")).status_code == 401
+    assert (await refresh(client, tokens)).status_code == 401
+
+
+async def test_tokens_issued_right_after_reactivation_are_accepted(make_client, engine):
+    client = await make_client("alice")
+    tokens = await sign_in(client, "alice")
+    admin = await make_admin(make_client, engine)
+    user_id = tokens["user"]["id"]
+    assert (await admin.put(f"/api/v1/users/admin/users/{user_id}/deactivate")).status_code == 200
+    assert (await admin.put(f"/api/v1/users/admin/users/{user_id}/activate")).status_code == 200
+
+    # Usually within the second of the deactivation
+    fresh = await sign_in(client, "alice")
+    assert (await client.get("/api/v1/users/me")).status_code == 200
+    assert (await refresh(client, fresh)).status_code == 200
+
+
+async def test_deactivation_on_another_worker_reaches_cached_principals(make_client, engine, monkeypatch):
+    monkeypatch.setattr(deny_list, "session_factory", lambda: AsyncSession(engine))
+    monkeypatch.setattr(deny_list, "_last_id", 0)
+    client = await make_client("alice")
+    tokens = await sign_in(client, "alice")
+    assert (await client.get("/api/v1/meal-plans")).status_code == 200
+    user_id = tokens["user"]["id"]
+    cached = PRINCIPAL_CACHE.get(user_id)
+    assert cached is not None
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        await UserService.deactivate_user(db, await db.get(User, user_id))
+    # As if the deactivation ran on another worker: this one still has the principal
+    PRINCIPAL_CACHE.set(user_id, cached)
+    assert (await client.get("/api/v1/meal-plans")).status_code == 200
+
+    await deny_list.sync()
+    assert PRINCIPAL_CACHE.get(user_id) is None
+    assert (await client.get("/api/v1/meal-plans")).status_code == 401
@@ -0,0 +1,197 @@
+"""
+Meal plans as their owners see them when recipes and planned meals change
+underneath: the plan and its shopping list must stay consistent.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+WEEK = {"start_date": "2026-01-05T00:00:00", "end_date": "2026-01-12T00:00:00"}
+
+
+async def create_recipe(client, name: str, ingredients: list, servings: int = 2) -> int:
+    response = await client.post("/api/v1/recipes", json={
+        "name": name, "servings": servings,
+        "ingredients": [{"name": item, "amount": amount} for item, amount in ingredients],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def create_plan(client) -> int:
+    response = await client.post("/api/v1/meal-plans", json={"name": "Week", **WEEK})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def plan_meal(client, plan_id: int, recipe_id: int, servings: int = 2, day: int = 5) -> int:
+    response = await client.post(f"/api/v1/meal-plans/{plan_id}/meals", json={
+        "recipe_id": recipe_id, "meal_date": f"2026-01-{day:02d}T19:00:00", "meal_type": "dinner", "servings": servings,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def shopping_list(client, plan_id: int) -> dict:
+    """The plan's shopping list as {(item name, unit): base quantity}"""
+    response = await client.get(f"/api/v1/meal-plans/{plan_id}/shopping-list")
+    assert response.status_code == 200, response.text
+    return {(item["ingredient_name"], item["unit"]): item["base_quantity"] for item in response.json()["items"]}
+
+
+async def test_deleting_a_planned_recipe_removes_it_from_meal_plans(make_client):
+    alice, bob = await make_client("alice"), await make_client("bob")
+    curry = await create_recipe(alice, "Chicken curry", [("chicken breast", "400 g"), ("rice", "200 g")])
+    pilaf = await create_recipe(bob, "Pilaf", [("rice", "300 g")])
+    plan = await create_plan(bob)
+    await plan_meal(bob, plan, curry)
+    kept = await plan_meal(bob, plan, pilaf)
+    await bob.post(f"/api/v1/meal-plans/{plan}/shopping-list")
+
+    response = await alice.delete(f"/api/v1/recipes/{curry}")
+    assert response.status_code == 204, response.text
+
+    meals = (await bob.get(f"/api/v1/meal-plans/{plan}/meals")).json()
+    assert [meal["id"] for meal in meals] == [kept]
+    assert await shopping_list(bob, plan) == {("rice", "g"): 300.0}
+
+
+async def test_deleting_a_user_removes_their_recipes_from_meal_plans(make_client, engine):
+    alice, bob = await make_client("alice"), await make_client("bob")
+    curry = await create_recipe(alice, "Chicken curry", [("chicken breast", "400 g")])
+    plan = await create_plan(bob)
+    await plan_meal(bob, plan, curry)
+    await bob.post(f"/api/v1/meal-plans/{plan}/shopping-list")
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = (await db.execute(select(User).where(User.username == "alice"))).scalars().one()
+        assert await UserService.delete_user(db, user)
+
+    assert (await bob.get(f"/api/v1/meal-plans/{plan}/meals")).json() == []
+    assert await shopping_list(bob, plan) == {}
+
+
+async def rebuilt_shopping_list(client, plan_id: int) -> dict:
+    """The shopping list regenerated from scratch, for comparison with the incrementally kept one"""
+    response = await client.post(f"/api/v1/meal-plans/{plan_id}/shopping-list")
+    assert response.status_code == 201, response.text
+    return {(item["ingredient_name"], item["unit"]): item["base_quantity"] for item in response.json()["items"]}
+
+
+@pytest.fixture
+async def cook(make_client):
+    """A signed-in user with two recipes sharing rice and an empty shopping list for a plan"""
+    client = await make_client("cook")
+    curry = await create_recipe(client, "Chicken curry", [
+        ("chicken breast", "400 g"), ("rice", "200 g"), ("salt", "To taste"),
+    ])
+    pilaf = await create_recipe(client, "Pilaf", [("rice", "0.3 kg"), ("onion", "1")])
+    plan = await create_plan(client)
+    await client.post(f"/api/v1/meal-plans/{plan}/shopping-list")
+    return SimpleNamespace(client=client, curry=curry, pilaf=pilaf, plan=plan)
+
+
+async def test_planning_meals_adds_to_the_shopping_list(cook):
+    await plan_meal(cook.client, cook.plan, cook.curry)
+    assert await shopping_list(cook.client, cook.plan) == {
+        ("chicken breast", "g"): 400.0, ("rice", "g"): 200.0, ("salt", "count"): None,
+    }
+
+    # Twice the recipe's servings, and sharing the rice with the curry
+    await plan_meal(cook.client, cook.plan, cook.pilaf, servings=4, day=6)
+    expected = {
+        ("chicken breast", "g"): 400.0, ("rice", "g"): 800.0, ("salt", "count"): None, ("onion", "count"): 2.0,
+    }
+    assert await shopping_list(cook.client, cook.plan) == expected
+    assert await rebuilt_shopping_list(cook.client, cook.plan) == expected
+
+
+async def test_changing_servings_rescales_the_shopping_list(cook):
+    curry = await plan_meal(cook.client, cook.plan, cook.curry)
+    await plan_meal(cook.client, cook.plan, cook.pilaf, day=6)
+
+    response = await cook.client.put(f"/api/v1/planned-meals/{curry}", json={"servings": 1})
+    assert response.status_code == 200, response.text
+
+    expected = {
+        ("chicken breast", "g"): 200.0, ("rice", "g"): 400.0, ("salt", "count"): None, ("onion", "count"): 1.0,
+    }
+    assert await shopping_list(cook.client, cook.plan) == expected
+    assert await rebuilt_shopping_list(cook.client, cook.plan) == expected
+
+
+async def test_changing_the_recipe_swaps_its_ingredients(cook):
+    meal = await plan_meal(cook.client, cook.plan, cook.curry)
+    await plan_meal(cook.client, cook.plan, cook.curry, day=6)
+
+    response = await cook.client.put(f"/api/v1/planned-meals/{meal}", json={"recipe_id": cook.pilaf})
+    assert response.status_code == 200, response.text
+
+    expected = {
+        ("chicken breast", "g"): 400.0, ("rice", "g"): 500.0, ("salt", "count"): None, ("onion", "count"): 1.0,
+    }
+    assert await shopping_list(cook.client, cook.plan) == expected
+    assert await rebuilt_shopping_list(cook.client, cook.plan) == expected
+
+
+async def test_removing_meals_takes_their_items_off_the_shopping_list(cook):
+    curry = await plan_meal(cook.client, cook.plan, cook.curry)
+    pilaf = await plan_meal(cook.client, cook.plan, cook.pilaf, day=6)
+
+    response = await cook.client.delete(f"/api/v1/planned-meals/{curry}")
+    assert response.status_code == 204, response.text
+    # The shared rice goes down, the curry's own items go away
+    assert await shopping_list(cook.client, cook.plan) == {("rice", "g"): 300.0, ("onion", "count"): 1.0}
+
+    response = await cook.client.delete(f"/api/v1/planned-meals/{pilaf}")
+    assert response.status_code == 204, response.text
+    assert await shopping_list(cook.client, cook.plan) == {}
+
+
+async def test_purchased_items_stay_purchased_while_meals_change(cook):
+    await plan_meal(cook.client, cook.plan, cook.curry)
+    items = (await cook.client.get(f"/api/v1/meal-plans/{cook.plan}/shopping-list")).json()["items"]
+    rice = next(item["id"] for item in items if item["ingredient_name"] == "rice")
+    response = await cook.client.patch(f"/api/v1/shopping-items/{rice}/purchase", params={"is_purchased": True})
+    assert response.status_code == 200, response.text
+
+    await plan_meal(cook.client, cook.plan, cook.pilaf, day=6)
+
+    items = (await cook.client.get(f"/api/v1/meal-plans/{cook.plan}/shopping-list")).json()["items"]
+    purchased = {item["ingredient_name"]: item["is_purchased"] for item in items}
+    assert purchased == {"chicken breast": False, "rice": True, "salt": False, "onion": False}
+
+
+def meal(recipe_id: int, day: int = 5) -> dict:
+    return {"recipe_id": recipe_id, "meal_date": f"2026-01-{day:02d}T19:00:00", "meal_type": "dinner"}
+
+
+async def test_planning_unknown_recipes_is_refused(cook):
+    missing = cook.pilaf + 100
+    response = await cook.client.post(f"/api/v1/meal-plans/{cook.plan}/meals/bulk", json={"meals": [
+        meal(cook.curry), meal(missing, day=6), meal(cook.pilaf, day=7), meal(missing + 1, day=8),
+    ]})
+    assert response.status_code == 422, response.text
+    assert response.json()["detail"] == f"Recipe not found: {missing}, {missing + 1}"
+
+    response = await cook.client.post(f"/api/v1/meal-plans/{cook.plan}/meals", json=meal(missing))
+    assert response.status_code == 422, response.text
+
+    planned = await plan_meal(cook.client, cook.plan, cook.curry)
+    response = await cook.client.put(f"/api/v1/planned-meals/{planned}", json={"recipe_id": missing})
+    assert response.status_code == 422, response.text
+
+    # Nothing of the refused requests was kept
+    meals = (await cook.client.get(f"/api/v1/meal-plans/{cook.plan}/meals")).json()
+    assert [(item["id"], item["recipe_id"]) for item in meals] == [(planned, cook.curry)]
+    assert await shopping_list(cook.client, cook.plan) == {
+        ("chicken breast", "g"): 400.0, ("rice", "g"): 200.0, ("salt", "count"): None,
+    }
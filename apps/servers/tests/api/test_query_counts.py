@@ -0,0 +1,197 @@
+"""
+Query-count regression tests: a read endpoint must issue the same number of
+SQL statements whatever its page or result size, so an accidental lazy load
+(1 + N queries) fails here instead of in production.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+import httpx
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app
+from app.models.meal_plan import MealPlan, PlannedMeal
+from app.models.recipe import Recipe, RecipeIngredient
+from app.models.user import User
+from app.services.auth_service import AuthService
+from tests.conftest import PASSWORD, sign_in
+
+SMALL, LARGE = 2, 40
+
+pytestmark = pytest.mark.anyio
+
+
+class QueryCounter:
+    """Counts statements sent to the database while ``counting()`` is active"""
+
+    def __init__(self, engine):
+        self.statements: List[str] = []
+        self._active = False
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self._active:
+            self.statements.append(statement)
+
+    @contextmanager
+    def counting(self) -> Iterator[List[str]]:
+        self.statements, self._active = [], True
+        try:
+            yield self.statements
+        finally:
+            self._active = False
+
+
+@pytest.fixture
+async def seeded(engine):
+    """One user with LARGE meal plans of LARGE planned meals each, over LARGE recipes"""
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = User(username="counter", email="counter@example.org", password_hash=AuthService.get_password_hash(PASSWORD))
+        db.add(user)
+        recipes = [
+            Recipe(name=f"Recipe {n}", servings=2, ingredients=[
+                RecipeIngredient(position=0, name="chicken breast", amount="200 g"),
+                RecipeIngredient(position=1, name="rice", amount="1 cup"),
+            ])
+            for n in range(LARGE)
+        ]
+        db.add_all(recipes)
+        await db.flush()
+        start = datetime(2026, 1, 5)
+        plans = [
+            MealPlan(
+                name=f"Plan {n}", user_id=user.id, start_date=start, end_date=start + timedelta(days=7),
+                planned_meals=[
+                    PlannedMeal(recipe_id=recipe.id, meal_date=start + timedelta(days=m % 7), meal_type="dinner")
+                    for m, recipe in enumerate(recipes)
+                ]
+            )
+            for n in range(LARGE)
+        ]
+        # The first plan is the small one for detail endpoints
+        plans[0].planned_meals = plans[0].planned_meals[:SMALL]
+        db.add_all(plans)
+        await db.commit()
+        return {"small_plan": plans[0].id, "large_plan": plans[1].id, "recipes": [r.id for r in recipes]}
+
+
+@pytest.fixture
+async def client(app_db, seeded):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await sign_in(client, "counter")
+        # Every test starts with the principal cached
+        await client.get("/api/v1/users/me")
+        yield client
+
+
+@pytest.fixture
+def counter(engine):
+    return QueryCounter(engine)
+
+
+async def count(client, counter, method: str, url: str, expected_status: int = 200, **kwargs) -> int:
+    with counter.counting() as statements:
+        response = await client.request(method, url, **kwargs)
+    assert response.status_code == expected_status, response.text
+    return len(statements)
+
+
+@pytest.mark.parametrize("query", ["", "&include_recipes=true"])
+async def test_meal_plan_list_is_constant_in_page_size(client, counter, query):
+    small = await count(client, counter, "GET", f"/api/v1/meal-plans?limit={SMALL}{query}")
+    large = await count(client, counter, "GET", f"/api/v1/meal-plans?limit={LARGE}{query}")
+    assert small == large
+
+
+@pytest.mark.parametrize("query", ["", "?include_recipes=true"])
+async def test_meal_plan_detail_is_constant_in_meal_count(client, counter, seeded, query):
+    small = await count(client, counter, "GET", f"/api/v1/meal-plans/{seeded['small_plan']}{query}")
+    large = await count(client, counter, "GET", f"/api/v1/meal-plans/{seeded['large_plan']}{query}")
+    assert small == large
+
+
+async def test_meal_plan_detail_is_one_query(client, counter, seeded):
+    # The plan, its meals and their recipes come back joined in the same
+    # single query that finds nothing for an unknown plan
+    missing = await count(client, counter, "GET", "/api/v1/meal-plans/0?include_recipes=true", expected_status=404)
+    detail = await count(client, counter, "GET", f"/api/v1/meal-plans/{seeded['large_plan']}?include_recipes=true")
+    assert detail == missing
+
+
+async def test_planned_meals_are_constant_in_meal_count(client, counter, seeded):
+    small = await count(client, counter, "GET", f"/api/v1/meal-plans/{seeded['small_plan']}/meals?include_recipes=true")
+    large = await count(client, counter, "GET", f"/api/v1/meal-plans/{seeded['large_plan']}/meals?include_recipes=true")
+    assert small == large
+
+
+async def test_included_recipes_are_serialized(client, seeded):
+    response = await client.get(f"/api/v1/meal-plans/{seeded['small_plan']}?include_recipes=true")
+    meals = response.json()["planned_meals"]
+    assert len(meals) == SMALL and all(meal["recipe"]["name"].startswith("Recipe ") for meal in meals)
+
+    response = await client.get(f"/api/v1/meal-plans/{seeded['small_plan']}")
+    assert all(meal["recipe"] is None for meal in response.json()["planned_meals"])
+
+
+async def test_recipe_list_is_constant_in_page_size(client, counter):
+    small = await count(client, counter, "GET", f"/api/v1/recipes?limit={SMALL}")
+    large = await count(client, counter, "GET", f"/api/v1/recipes?limit={LARGE}")
+    assert small == large
+
+
+async def test_top_recipes_are_constant_in_page_size(client, counter):
+    small = await count(client, counter, "GET", f"/api/v1/recipes/top?limit={SMALL}")
+    large = await count(client, counter, "GET", f"/api/v1/recipes/top?limit={LARGE}&tag=quick")
+    assert small == large
+
+
+async def test_nutrition_batch_is_constant_in_id_count(client, counter, seeded):
+    # Warm the recipe_nutrition cache so both calls read it
+    await client.post("/api/v1/nutrition/batch", json={"recipe_ids": seeded["recipes"]})
+    small = await count(client, counter, "POST", "/api/v1/nutrition/batch", json={
+        "recipe_ids": seeded["recipes"][:SMALL], "meal_plan_ids": [seeded["small_plan"]]
+    })
+    large = await count(client, counter, "POST", "/api/v1/nutrition/batch", json={
+        "recipe_ids": seeded["recipes"], "meal_plan_ids": [seeded["small_plan"], seeded["large_plan"]]
+    })
+    assert small == large
+
+
+async def test_meal_calendar_is_constant_in_range(client, counter):
+    small = await count(client, counter, "GET", "/api/v1/meal-plans/calendar?from=2026-01-05&to=2026-01-05")
+    large = await count(client, counter, "GET", "/api/v1/meal-plans/calendar?from=2026-01-01&to=2026-01-31")
+    assert small == large
+
+
+async def test_bulk_planned_meals_are_constant_in_meal_count(client, counter, seeded):
+    def meals(n: int) -> dict:
+        return {"meals": [
+            {"recipe_id": recipe_id, "meal_date": "2026-01-06T12:00:00", "meal_type": "lunch"}
+            for recipe_id in seeded["recipes"][:n]
+        ]}
+
+    url = f"/api/v1/meal-plans/{seeded['small_plan']}/meals/bulk"
+    small = await count(client, counter, "POST", url, expected_status=201, json=meals(SMALL))
+    large = await count(client, counter, "POST", url, expected_status=201, json=meals(LARGE))
+    assert small == large
+
+
+async def test_authentication_is_served_from_the_principal_cache(client, counter):
+    # With the principal cached a missing plan costs only the plan lookup itself
+    assert await count(client, counter, "GET", "/api/v1/meal-plans/0", expected_status=404) == 1
+
+
+async def test_login_is_one_query(client, counter):
+    # The user lookup is the only statement; last_login goes through the write-behind buffer
+    assert await count(client, counter, "POST", "/api/v1/users/login", json={
+        "username_or_email": "Counter@Example.org", "password": PASSWORD
+    }) == 1
+
+
+async def test_revoked_token_is_refused_without_a_query(client, counter):
+    await client.post("/api/v1/users/logout", json={})
+    assert await count(client, counter, "GET", "/api/v1/meal-plans/0", expected_status=401) == 0
@@ -0,0 +1,132 @@
+"""
+The running rating totals on recipes, recipe tags and authors, checked
+against aggregates recomputed from the ratings table after every write.
+"""
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+def expected_score(count: int, total: float) -> float:
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (weight * settings.RATING_PRIOR_MEAN + total) / (count + weight) if count else 0.0
+
+
+async def assert_totals_match_ratings(engine) -> None:
+    async with AsyncSession(engine) as db:
+        recipes = (await db.execute(text(
+            "SELECT r.id, r.rating_count, r.rating_sum, r.rating_score,"
+            " (SELECT count(*) FROM ratings WHERE recipe_id = r.id),"
+            " (SELECT coalesce(sum(rating), 0) FROM ratings WHERE recipe_id = r.id)"
+            " FROM recipes r"
+        ))).all()
+        for recipe_id, count, total, score, actual_count, actual_total in recipes:
+            assert (count, total) == (actual_count, actual_total), f"recipe {recipe_id}"
+            assert score == pytest.approx(expected_score(actual_count, actual_total)), f"recipe {recipe_id}"
+
+        stale_tags = (await db.execute(text(
+            "SELECT t.recipe_id, t.tag FROM recipe_tags t JOIN recipes r ON r.id = t.recipe_id"
+            " WHERE t.rating_score != r.rating_score"
+        ))).all()
+        assert stale_tags == []
+
+        users = (await db.execute(text(
+            "SELECT u.username, u.rating_count, u.rating_sum,"
+            " (SELECT count(*) FROM ratings g JOIN recipes r ON r.id = g.recipe_id WHERE r.user_id = u.id),"
+            " (SELECT coalesce(sum(g.rating), 0) FROM ratings g JOIN recipes r ON r.id = g.recipe_id"
+            "  WHERE r.user_id = u.id)"
+            " FROM users u"
+        ))).all()
+        for username, count, total, actual_count, actual_total in users:
+            assert (count, total) == (actual_count, actual_total), username
+
+
+async def create_recipe(client, name: str) -> int:
+    response = await client.post("/api/v1/recipes", json={
+        "name": name, "servings": 2, "tags": ["dinner", "quick"],
+        "ingredients": [{"name": "rice", "amount": "200 g"}],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def rate(client, recipe_id: int, value: float) -> None:
+    response = await client.put(f"/api/v1/recipes/{recipe_id}/rating", json={"rating": value})
+    assert response.status_code == 200, response.text
+
+
+@pytest.fixture
+async def kitchen(make_client):
+    alice, bob, carol = await make_client("alice"), await make_client("bob"), await make_client("carol")
+    curry, pilaf = await create_recipe(alice, "Curry"), await create_recipe(alice, "Pilaf")
+    stew = await create_recipe(bob, "Stew")
+    return alice, bob, carol, curry, pilaf, stew
+
+
+async def test_creating_ratings(kitchen, engine):
+    alice, bob, carol, curry, pilaf, stew = kitchen
+    await assert_totals_match_ratings(engine)
+
+    await rate(bob, curry, 4.5)
+    await rate(carol, curry, 2)
+    await rate(carol, pilaf, 5)
+    await rate(alice, stew, 3.5)
+
+    await assert_totals_match_ratings(engine)
+    summary = (await bob.get(f"/api/v1/recipes/{curry}/ratings/summary")).json()
+    assert (summary["rating_count"], summary["average_rating"]) == (2, 3.25)
+
+
+async def test_updating_ratings(kitchen, engine):
+    alice, bob, carol, curry, pilaf, stew = kitchen
+    await rate(bob, curry, 4.5)
+    await rate(carol, curry, 2)
+
+    await rate(bob, curry, 1)
+    await rate(carol, curry, 2)  # unchanged value
+
+    await assert_totals_match_ratings(engine)
+
+
+async def test_deleting_ratings(kitchen, engine):
+    alice, bob, carol, curry, pilaf, stew = kitchen
+    await rate(bob, curry, 4.5)
+    await rate(carol, curry, 2)
+    await rate(carol, pilaf, 5)
+
+    assert (await carol.delete(f"/api/v1/recipes/{curry}/rating")).status_code == 204
+    assert (await carol.delete(f"/api/v1/recipes/{pilaf}/rating")).status_code == 204
+    assert (await carol.delete(f"/api/v1/recipes/{pilaf}/rating")).status_code == 404
+
+    await assert_totals_match_ratings(engine)
+
+
+async def test_deleting_a_rated_recipe(kitchen, engine):
+    alice, bob, carol, curry, pilaf, stew = kitchen
+    await rate(bob, curry, 4.5)
+    await rate(carol, curry, 2)
+    await rate(carol, pilaf, 5)
+
+    assert (await alice.delete(f"/api/v1/recipes/{curry}")).status_code == 204
+
+    await assert_totals_match_ratings(engine)
+
+
+async def test_deleting_a_rating_user(kitchen, engine):
+    alice, bob, carol, curry, pilaf, stew = kitchen
+    await rate(carol, curry, 2)
+    await rate(carol, stew, 4)
+    await rate(bob, curry, 5)
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = (await db.execute(select(User).where(User.username == "carol"))).scalars().one()
+        assert await UserService.delete_user(db, user)
+
+    await assert_totals_match_ratings(engine)
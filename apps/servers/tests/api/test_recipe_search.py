@@ -0,0 +1,59 @@
+"""
+Recipe search staying in step with recipe and author deletions: the index
+must never return, or count, recipes that are gone.
+"""
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_recipe(client, name: str) -> int:
+    response = await client.post("/api/v1/recipes", json={
+        "name": name, "servings": 2, "ingredients": [{"name": "chicken", "amount": "400 g"}],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def search(client, q: str, limit: int = 10) -> dict:
+    response = await client.get("/api/v1/recipes/search", params={"q": q, "limit": limit})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_deleting_an_author_drops_their_recipes_from_search(make_client, engine):
+    alice, bob = await make_client("alice"), await make_client("bob")
+    for n in range(3):
+        await create_recipe(alice, f"Chicken curry {n}")
+    kept = await create_recipe(bob, "Chicken curry deluxe")
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = (await db.execute(select(User).where(User.username == "alice"))).scalars().one()
+        assert await UserService.delete_user(db, user)
+
+    results = await search(bob, "curry", limit=1)
+    assert results["total"] == 1
+    assert [hit["id"] for hit in results["items"]] == [kept]
+
+    async with AsyncSession(engine) as db:
+        orphans = (await db.execute(text(
+            "SELECT rowid FROM recipes_fts WHERE rowid NOT IN (SELECT id FROM recipes)"
+        ))).all()
+    assert orphans == []
+
+
+async def test_deleting_a_recipe_drops_it_from_search(make_client):
+    alice = await make_client("alice")
+    gone = await create_recipe(alice, "Chicken curry")
+    kept = await create_recipe(alice, "Chicken curry deluxe")
+
+    assert (await alice.delete(f"/api/v1/recipes/{gone}")).status_code == 204
+
+    results = await search(alice, "curry")
+    assert (results["total"], [hit["id"] for hit in results["items"]]) == (1, [kept])
@@ -0,0 +1,74 @@
+"""
+Deleting recipes and meal plans: every dependent row goes with them,
+whether the ORM or the database's ON DELETE CASCADE removes it.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.api.test_meal_plans import create_plan, plan_meal
+
+pytestmark = pytest.mark.anyio
+
+# Tables with a recipe_id column referencing recipes
+RECIPE_CHILDREN = ("recipe_ingredients", "recipe_tags", "recipe_nutrition", "ratings", "planned_meals")
+
+
+async def foreign_key_violations(engine) -> list:
+    async with AsyncSession(engine) as db:
+        return (await db.execute(text("PRAGMA foreign_key_check"))).all()
+
+
+async def test_foreign_keys_are_enforced(engine):
+    async with AsyncSession(engine) as db:
+        assert (await db.execute(text("PRAGMA foreign_keys"))).scalar() == 1
+
+
+async def test_deleting_a_recipe_leaves_no_orphans(make_client, engine):
+    alice, bob = await make_client("alice"), await make_client("bob")
+    response = await alice.post("/api/v1/recipes", json={
+        "name": "Chicken curry", "servings": 2, "tags": ["dinner"],
+        "ingredients": [{"name": "rice", "amount": "200 g"}, {"name": "chicken", "amount": "400 g"}],
+    })
+    assert response.status_code == 201, response.text
+    curry = response.json()["id"]
+    assert (await bob.put(f"/api/v1/recipes/{curry}/rating", json={"rating": 4})).status_code == 200
+    assert (await bob.post("/api/v1/nutrition/batch", json={"recipe_ids": [curry]})).status_code == 200
+    plan = await create_plan(bob)
+    await plan_meal(bob, plan, curry)
+    await bob.post(f"/api/v1/meal-plans/{plan}/shopping-list")
+
+    async with AsyncSession(engine) as db:
+        for table in RECIPE_CHILDREN:
+            count = (await db.execute(text(f"SELECT count(*) FROM {table} WHERE recipe_id = :id"), {"id": curry})).scalar()
+            assert count, f"test setup left {table} empty"
+
+    assert (await alice.delete(f"/api/v1/recipes/{curry}")).status_code == 204
+
+    async with AsyncSession(engine) as db:
+        for table in RECIPE_CHILDREN:
+            count = (await db.execute(text(f"SELECT count(*) FROM {table} WHERE recipe_id = :id"), {"id": curry})).scalar()
+            assert count == 0, table
+        items = (await db.execute(text("SELECT count(*) FROM shopping_list_items"))).scalar()
+        assert items == 0
+    assert await foreign_key_violations(engine) == []
+
+
+async def test_deleting_a_meal_plan_with_a_shopping_list(make_client, engine):
+    alice = await make_client("alice")
+    response = await alice.post("/api/v1/recipes", json={
+        "name": "Pilaf", "servings": 2, "ingredients": [{"name": "rice", "amount": "300 g"}],
+    })
+    pilaf = response.json()["id"]
+    plan = await create_plan(alice)
+    await plan_meal(alice, plan, pilaf)
+    await alice.post(f"/api/v1/meal-plans/{plan}/shopping-list")
+
+    response = await alice.delete(f"/api/v1/meal-plans/{plan}")
+    assert response.status_code == 204, response.text
+
+    async with AsyncSession(engine) as db:
+        for table in ("planned_meals", "shopping_lists", "shopping_list_items"):
+            assert (await db.execute(text(f"SELECT count(*) FROM {table}"))).scalar() == 0, table
+    assert await foreign_key_violations(engine) == []
@@ -0,0 +1,86 @@
+"""
+The application starting and shutting down on a database created by the
+init scripts, each run in its own interpreter so settings pick up the
+database URL.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.main import app  # noqa: F401  registers every model, as in production
+from app.models.base import Base
+
+SERVER_ROOT = Path(__file__).resolve().parents[2]
+
+RUN_LIFESPAN = """
+import asyncio
+from app.main import app, lifespan
+
+async def main():
+    async with lifespan(app):
+        pass
+
+asyncio.run(main())
+"""
+
+
+FETCH_MEDIA = """
+import asyncio
+import httpx
+from app.main import app, lifespan
+
+async def main():
+    async with lifespan(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            print((await client.get("/media/originals/ab/missing.png")).status_code)
+
+asyncio.run(main())
+"""
+
+
+def run(args, database_url: str, **env) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=SERVER_ROOT,
+        env={**os.environ, "DATABASE_URL": database_url, **env},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+@pytest.mark.parametrize("init_script", [["init_db.py"], ["-m", "app.core.init_db"]])
+def test_app_starts_on_a_database_created_by_init_db(tmp_path, init_script):
+    database_path = tmp_path / "recipe_hub.db"
+    database_url = f"sqlite:///{database_path}"
+
+    created = run(init_script, database_url)
+    assert created.returncode == 0, created.stdout + created.stderr
+    with closing(sqlite3.connect(database_path)) as conn:
+        tables = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'"))
+    assert set(Base.metadata.tables) - set(tables) == set()
+    # Deny list syncs rely on revoked token ids never being reused
+    assert "AUTOINCREMENT" in tables["revoked_tokens"]
+
+    started = run(["-c", RUN_LIFESPAN], database_url, UPLOAD_DIR=str(tmp_path / "uploads"),
+                  UPLOAD_TMP_DIR=str(tmp_path / "uploads-tmp"))
+    assert started.returncode == 0, started.stderr
+
+
+def test_media_on_a_fresh_deploy(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'recipe_hub.db'}"
+    assert run(["init_db.py"], database_url).returncode == 0
+    upload_dir = tmp_path / "media" / "uploads"
+
+    # No upload yet, so the served directory does not exist until startup
+    fetched = run(["-c", FETCH_MEDIA], database_url, UPLOAD_DIR=str(upload_dir),
+                  UPLOAD_TMP_DIR=str(tmp_path / "media" / "uploads-tmp"))
+    assert fetched.returncode == 0, fetched.stderr
+    assert fetched.stdout.split() == ["404"]
+    assert upload_dir.is_dir()
@@ -0,0 +1,123 @@
+"""
+Image uploads and their background renders, including renders that never
+finished: a crashed worker or a failed render must not leave an image
+stuck for good.
+"""
+
+import hashlib
+import io
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image as PILImage
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.image import Image
+from app.services.image_service import ImagePipeline, image_pipeline, original_path, variant_dir
+
+pytestmark = pytest.mark.anyio
+
+
+def png_bytes(color=(200, 40, 40)) -> bytes:
+    buffer = io.BytesIO()
+    PILImage.new("RGB", (320, 200), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    path = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(path))
+    monkeypatch.setattr(settings, "UPLOAD_TMP_DIR", str(tmp_path / "uploads-tmp"))
+    monkeypatch.setattr(settings, "IMAGE_VARIANT_WIDTHS", [160])
+    return path
+
+
+@pytest.fixture
+async def pipeline(engine, monkeypatch):
+    """The application's pipeline, writing outcomes to the test database"""
+    monkeypatch.setattr(image_pipeline, "session_factory", lambda: AsyncSession(engine))
+    yield image_pipeline
+    await image_pipeline.stop()
+
+
+async def add_image(engine, data: bytes, status: str, age: timedelta = timedelta(0)) -> Image:
+    sha256 = hashlib.sha256(data).hexdigest()
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        image = Image(sha256=sha256, content_type="image/png", extension=".png", size=len(data), status=status)
+        db.add(image)
+        await db.flush()
+        image.updated_at = datetime.utcnow() - age
+        await db.commit()
+        return image
+
+
+async def image_status(engine, sha256: str) -> str:
+    async with AsyncSession(engine) as db:
+        return (await db.execute(select(Image.status).where(Image.sha256 == sha256))).scalar()
+
+
+async def test_start_renders_images_left_processing(engine, upload_dir):
+    data = png_bytes()
+    image = await add_image(engine, data, "processing")
+    path = original_path(image.sha256, ".png")
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(data)
+
+    pipeline = ImagePipeline(lambda: AsyncSession(engine), workers=1)
+    await pipeline.start()
+    await pipeline.stop()
+
+    assert await image_status(engine, image.sha256) == "ready"
+    assert sorted(os.listdir(variant_dir(image.sha256))) == ["160.jpeg", "160.webp"]
+
+
+@pytest.mark.parametrize("status, age", [("failed", timedelta(0)), ("processing", timedelta(hours=1))])
+async def test_reupload_renders_a_failed_or_stuck_image_again(make_client, engine, upload_dir, pipeline, status, age):
+    client = await make_client("alice")
+    data = png_bytes()
+    # Neither the variants nor, here, even the original made it to disk
+    image = await add_image(engine, data, status, age)
+
+    response = await client.post("/api/v1/uploads/images", content=data, headers={"Content-Type": "image/png"})
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "processing"
+
+    await pipeline.stop()
+    assert await image_status(engine, image.sha256) == "ready"
+    assert os.path.exists(original_path(image.sha256, ".png"))
+
+
+async def test_upload_in_progress_is_not_under_the_served_directory(make_client, upload_dir, pipeline):
+    client = await make_client("alice")
+    data = png_bytes()
+    partial, served = [], []
+
+    async def body():
+        yield data[:100]
+        partial.extend(os.listdir(settings.UPLOAD_TMP_DIR))
+        served.extend(upload_dir.rglob("*"))
+        yield data[100:]
+
+    response = await client.post("/api/v1/uploads/images", content=body(), headers={"Content-Type": "image/png"})
+    assert response.status_code == 201, response.text
+    assert len(partial) == 1 and served == []
+    assert os.listdir(settings.UPLOAD_TMP_DIR) == []
+    assert os.path.exists(original_path(response.json()["sha256"], ".png"))
+
+
+async def test_reupload_leaves_a_recent_render_alone(make_client, engine, upload_dir, pipeline):
+    client = await make_client("alice")
+    data = png_bytes()
+    image = await add_image(engine, data, "processing")
+
+    response = await client.post("/api/v1/uploads/images", content=data, headers={"Content-Type": "image/png"})
+    assert response.status_code == 200, response.text
+
+    await pipeline.stop()
+    assert await image_status(engine, image.sha256) == "processing"
+    assert not os.path.exists(variant_dir(image.sha256))
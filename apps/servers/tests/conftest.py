@@ -1 +1,80 @@
-print('conftest.py')
\ No newline at end of file
+"""
+Shared fixtures: a throwaway SQLite database per test and API clients on
+the application, signed in as fresh users.
+"""
+
+from typing import AsyncIterator, Callable, Awaitable, List, Optional
+
+import httpx
+import pytest
+
+from app.core.database import create_engine_from_settings, get_db
+from app.main import app
+from app.models.base import Base
+from app.services.user_service import PRINCIPAL_CACHE, PROFILE_CACHE
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PASSWORD = "Passw0rdX"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_engine_from_settings(f"sqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def app_db(engine) -> AsyncIterator[None]:
+    """Point the application's ``get_db`` at the test database"""
+    async def override_get_db():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    # User ids repeat across test databases, so nothing cached may leak over
+    PRINCIPAL_CACHE.clear()
+    PROFILE_CACHE.clear()
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+async def sign_in(client: httpx.AsyncClient, username: str, password: str = PASSWORD) -> dict:
+    """Log in and send the new access token with every later request; returns the token response"""
+    response = await client.post("/api/v1/users/login", json={"username_or_email": username, "password": password})
+    assert response.status_code == 200, response.text
+    tokens = response.json()
+    client.headers["Authorization"] = f"Bearer {tokens['access_token']}"
+    return tokens
+
+
+@pytest.fixture
+async def make_client(app_db) -> AsyncIterator[Callable[..., Awaitable[httpx.AsyncClient]]]:
+    """
+    ``await make_client("alice")`` registers alice and returns a client signed
+    in as her; ``await make_client()`` returns an anonymous one.
+    """
+    clients: List[httpx.AsyncClient] = []
+
+    async def make(username: Optional[str] = None) -> httpx.AsyncClient:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        clients.append(client)
+        if username:
+            response = await client.post("/api/v1/users/register", json={
+                "username": username, "email": f"{username}@example.org",
+                "password": PASSWORD, "password_confirm": PASSWORD,
+            })
+            assert response.status_code == 201, response.text
+            await sign_in(client, username)
+        return client
+
+    yield make
+    for client in clients:
+        await client.aclose()
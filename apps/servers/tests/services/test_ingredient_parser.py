@@ -0,0 +1,81 @@
+import pytest
+
+from app.services.ingredient_parser import canonical_name, parse_ingredient
+
+
+@pytest.mark.parametrize("amount, quantity, unit", [
+    ("200 gms", 200.0, "g"),
+    ("200 grms", 200.0, "g"),
+    ("200g", 200.0, "g"),
+    ("1.5 kgs", 1.5, "kg"),
+    ("500 mls", 500.0, "ml"),
+    ("1 ltr", 1.0, "l"),
+    ("2 tbsp.", 2.0, "tbsp"),
+    ("1 T", 1.0, "tbsp"),
+    ("1 t", 1.0, "tsp"),
+    ("1 teaspoonful", 1.0, "tsp"),
+    ("8 ozs", 8.0, "oz"),
+    ("1 1/2 cups", 1.5, "cup"),
+    ("2-3 cloves", 2.5, "clove"),
+    ("½ cup", 0.5, "cup"),
+    ("a pinch", 1.0, "pinch"),
+])
+def test_separate_amount_units(amount, quantity, unit):
+    parsed = parse_ingredient("Paneer", amount)
+
+    assert (parsed.quantity, parsed.unit) == (quantity, unit)
+    assert parsed.name == "Paneer"
+    assert parsed.amount == amount
+
+
+@pytest.mark.parametrize("amount", ["2", "3 nos", "2 medium", "4 whole"])
+def test_separate_amount_without_a_unit_counts_items(amount):
+    parsed = parse_ingredient("Eggs", amount)
+
+    assert parsed.unit is None
+    assert parsed.quantity == float(amount.split()[0])
+
+
+@pytest.mark.parametrize("amount, unit", [("2 bowls", "bowl"), ("1 bowl", "bowl"), ("3 cartons", "carton")])
+def test_unknown_unit_is_kept_rather_than_counted(amount, unit):
+    parsed = parse_ingredient("Rice", amount)
+
+    assert parsed.unit == unit
+
+
+def test_unquantified_amount_becomes_a_note():
+    parsed = parse_ingredient("Salt", "To taste")
+
+    assert (parsed.quantity, parsed.unit, parsed.notes) == (None, None, "To taste")
+
+
+@pytest.mark.parametrize("line, quantity, unit, name, notes", [
+    ("2 1/2 cups all-purpose flour, sifted", 2.5, "cup", "all-purpose flour", "sifted"),
+    ("200 gms paneer", 200.0, "g", "paneer", ""),
+    ("2 large eggs", 2.0, None, "large eggs", ""),
+    ("a pinch of salt", 1.0, "pinch", "salt", ""),
+    ("4 cloves", 4.0, None, "cloves", ""),
+    ("3 cloves garlic (minced)", 3.0, "clove", "garlic", "minced"),
+    ("Salt to taste", None, None, "Salt", "to taste"),
+])
+def test_full_lines(line, quantity, unit, name, notes):
+    parsed = parse_ingredient(line)
+
+    assert (parsed.quantity, parsed.unit, parsed.name, parsed.notes) == (quantity, unit, name, notes)
+
+
+def test_juice_of():
+    parsed = parse_ingredient("Juice of 1 lemon")
+
+    assert (parsed.quantity, parsed.unit, parsed.name) == (1.0, None, "lemon juice")
+
+
+@pytest.mark.parametrize("name, canonical", [
+    ("2 Large Eggs", "2 egg"),
+    ("Fresh tomatoes, diced", "tomato"),
+    ("Honey or agave syrup", "honey"),
+    ("Asparagus", "asparagus"),
+    ("Cherries", "cherry"),
+])
+def test_canonical_name(name, canonical):
+    assert canonical_name(name) == canonical
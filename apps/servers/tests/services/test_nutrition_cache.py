@@ -0,0 +1,77 @@
+import asyncio
+
+import numpy as np
+import pytest
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import create_engine_from_settings
+from app.models.recipe import RecipeNutrition
+from app.services.nutrition_service import NutritionService, get_nutrition_engine
+from tests.api.test_ratings import create_recipe
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def recipes(make_client, engine):
+    """Two recipes with no cached totals"""
+    client = await make_client("alice")
+    ids = [await create_recipe(client, "Curry"), await create_recipe(client, "Pilaf")]
+    async with AsyncSession(engine) as db:
+        await db.execute(text("DELETE FROM recipe_nutrition"))
+        await db.commit()
+    return ids
+
+
+async def cached_versions(engine) -> dict:
+    async with AsyncSession(engine) as db:
+        return dict((await db.execute(text("SELECT recipe_id, version FROM recipe_nutrition"))).all())
+
+
+async def summaries(engine, recipe_ids):
+    async with AsyncSession(engine) as db:
+        service = NutritionService(db)
+        recipes, _ = await service.batch(recipe_ids, [], user_id=0)
+        # The reader's own session is left without writes to commit
+        assert not db.new and not db.dirty
+        return recipes
+
+
+async def test_reads_cache_recomputed_totals(engine, recipes):
+    first = await summaries(engine, recipes)
+
+    assert await cached_versions(engine) == dict.fromkeys(recipes, get_nutrition_engine().version)
+    assert await summaries(engine, recipes) == first
+
+
+async def test_concurrent_reads_of_uncached_recipes(engine, recipes):
+    results = await asyncio.gather(*(summaries(engine, recipes) for _ in range(4)))
+
+    assert all(result == results[0] for result in results)
+    assert set(await cached_versions(engine)) == set(recipes)
+
+
+async def test_reads_succeed_on_a_read_only_database(engine, recipes, tmp_path):
+    read_only = create_engine_from_settings(f"sqlite:///{tmp_path / 'test.db'}", pragmas={"query_only": "ON"})
+    try:
+        recipes_read = await summaries(read_only, recipes)
+    finally:
+        await read_only.dispose()
+
+    assert set(recipes_read) == set(recipes)
+    assert await cached_versions(engine) == {}
+
+
+async def test_current_rows_are_not_overwritten(engine, recipes):
+    await summaries(engine, recipes)
+    # As if a recipe update stored new totals while a read was recomputing
+    marker = np.full(len(get_nutrition_engine().nutrients), 7.0, dtype="<f8").tobytes()
+    async with AsyncSession(engine) as db:
+        await db.execute(update(RecipeNutrition).values(totals=marker))
+        await db.commit()
+        service = NutritionService(db)
+        await service._cache(await service.recipe_vectors(recipes))
+
+        totals = (await db.execute(text("SELECT DISTINCT totals FROM recipe_nutrition"))).scalars().all()
+    assert totals == [marker]
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.revocation import TokenDenyList
+
+pytestmark = pytest.mark.anyio
+
+
+def claims(jti: str) -> dict:
+    return {"jti": jti, "sub": "1", "exp": int(time.time()) + 3600}
+
+
+@pytest.fixture
+def sessions(engine):
+    return lambda: AsyncSession(engine, expire_on_commit=False)
+
+
+async def test_revoked_once_and_remembered(sessions):
+    deny_list = TokenDenyList(sessions, sync_interval=60)
+    async with sessions() as db:
+        assert await deny_list.revoke(db, claims("a"))
+        assert not await deny_list.revoke(db, claims("a"))
+    assert "a" in deny_list
+
+
+async def test_concurrent_revocations_let_one_through(sessions):
+    deny_list = TokenDenyList(sessions, sync_interval=60)
+
+    async def revoke():
+        async with sessions() as db:
+            return await deny_list.revoke(db, claims("a"))
+
+    assert sorted(await asyncio.gather(revoke(), revoke())) == [False, True]
+
+
+async def test_revocation_by_another_worker_is_refused_and_synced(sessions):
+    ours, theirs = TokenDenyList(sessions, sync_interval=60), TokenDenyList(sessions, sync_interval=60)
+    async with sessions() as db:
+        assert await theirs.revoke(db, claims("a"))
+    async with sessions() as db:
+        assert not await ours.revoke(db, claims("a"))
+
+    await ours.sync()
+    assert "a" in ours
+
+
+async def test_failed_commit_is_not_remembered(sessions, engine):
+    deny_list = TokenDenyList(sessions, sync_interval=60)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE revoked_tokens"))
+
+    async with sessions() as db:
+        with pytest.raises(OperationalError):
+            await deny_list.revoke(db, claims("a"))
+    assert "a" not in deny_list
+    assert len(deny_list) == 0
+
+
+async def test_ids_freed_by_a_purge_are_not_reused(sessions):
+    ours, theirs = TokenDenyList(sessions, sync_interval=60), TokenDenyList(sessions, sync_interval=60)
+    async with sessions() as db:
+        await theirs.revoke(db, claims("a"))
+        await theirs.revoke(db, claims("b"))
+    await ours.sync()
+
+    # Another worker purges the newest row at startup, then revokes a token
+    async with sessions() as db:
+        await db.execute(text("DELETE FROM revoked_tokens WHERE jti = 'b'"))
+        await db.commit()
+        await theirs.revoke(db, claims("c"))
+
+    await ours.sync()
+    assert "c" in ours
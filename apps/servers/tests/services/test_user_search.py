@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.services.search_service import UserSearchIndex
+
+pytestmark = pytest.mark.anyio
+
+# username, first name, active; in id order
+USERS = [
+    ("annx1", None, False),
+    ("annx2", None, False),
+    ("annx3", None, False),
+    ("joann", None, True),
+    ("bob", "Ann", True),
+    ("anna2", None, True),
+    ("ann", None, True),
+    ("anna1", None, True),
+    ("carol", None, True),
+]
+EXPECTED = ["ann", "anna2", "anna1", "bob", "joann"]
+
+
+@pytest.fixture
+async def db(engine):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all(
+            User(username=username, email=f"{username}@example.org", password_hash="x",
+                 first_name=first_name, is_active=active)
+            for username, first_name, active in USERS
+        )
+        await session.flush()
+        await UserSearchIndex(session).rebuild()
+        await session.commit()
+        yield session
+
+
+async def test_matches_are_ranked_and_inactive_users_skipped(db):
+    rows, next_cursor = await UserSearchIndex(db).search("ann", limit=10)
+
+    assert [user.username for user, _ in rows] == EXPECTED
+    assert [rank for _, rank in rows] == [0, 1, 1, 2, 3]
+    assert next_cursor is None
+
+
+async def test_inactive_matches_do_not_crowd_out_a_page(db):
+    # The inactive annx* users sort first by id within the prefix tier
+    rows, _ = await UserSearchIndex(db).search("an", limit=3)
+
+    assert [user.username for user, _ in rows] == ["anna2", "ann", "anna1"]
+
+
+async def test_cursor_pages_cover_every_match(db):
+    index = UserSearchIndex(db)
+    seen, cursor = [], None
+    while True:
+        rows, cursor = await index.search("ann", limit=2, cursor=cursor)
+        seen += [user.username for user, _ in rows]
+        if cursor is None:
+            break
+
+    assert seen == EXPECTED
+
+
+async def test_offset_pages_cover_every_match(db):
+    index = UserSearchIndex(db)
+    pages = [await index.search("ann", limit=2, offset=offset) for offset in (0, 2, 4)]
+
+    assert [user.username for rows, _ in pages for user, _ in rows] == EXPECTED
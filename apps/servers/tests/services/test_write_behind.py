@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.write_behind import WriteBehindBuffer
+from app.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+LOGIN = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def user_id(engine) -> int:
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = User(username="alice", email="alice@example.org", password_hash="x")
+        db.add(user)
+        await db.commit()
+        return user.id
+
+
+@pytest.fixture
+def slow_sessions(engine):
+    """A session factory whose writes wait for ``release``, signalling ``started``"""
+    started, release = asyncio.Event(), asyncio.Event()
+
+    class SlowSession(AsyncSession):
+        async def execute(self, *args, **kwargs):
+            started.set()
+            await release.wait()
+            return await super().execute(*args, **kwargs)
+
+    return (lambda: SlowSession(engine)), started, release
+
+
+async def last_login(engine, user_id: int):
+    async with AsyncSession(engine) as db:
+        value = (await db.execute(select(User.last_login).where(User.id == user_id))).scalar()
+        return value and value.replace(tzinfo=timezone.utc)
+
+
+async def test_stop_waits_for_the_flush_in_progress(engine, user_id, slow_sessions):
+    factory, started, release = slow_sessions
+    buffer = WriteBehindBuffer(factory, interval=60, max_entries=1)
+    buffer.start()
+    buffer.set(User.last_login, user_id, LOGIN)
+    await started.wait()
+
+    stopping = asyncio.create_task(buffer.stop())
+    await asyncio.sleep(0.05)
+    assert not stopping.done()
+    release.set()
+    await stopping
+
+    assert await last_login(engine, user_id) == LOGIN
+    assert len(buffer) == 0
+
+
+async def test_cancelled_flush_keeps_its_batch(engine, user_id, slow_sessions):
+    factory, started, _ = slow_sessions
+    buffer = WriteBehindBuffer(factory, interval=60, max_entries=100)
+    buffer.set(User.last_login, user_id, LOGIN)
+
+    flushing = asyncio.create_task(buffer.flush())
+    await started.wait()
+    flushing.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flushing
+    assert len(buffer) == 1
+
+    buffer.session_factory = lambda: AsyncSession(engine)
+    assert await buffer.flush() == 1
+    assert await last_login(engine, user_id) == LOGIN
+
+
+async def test_newer_value_wins_over_a_restored_batch(engine, user_id, slow_sessions):
+    factory, started, _ = slow_sessions
+    buffer = WriteBehindBuffer(factory, interval=60, max_entries=100)
+    buffer.set(User.last_login, user_id, LOGIN)
+
+    flushing = asyncio.create_task(buffer.flush())
+    await started.wait()
+    later = LOGIN.replace(hour=13)
+    buffer.set(User.last_login, user_id, later)
+    flushing.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flushing
+
+    buffer.session_factory = lambda: AsyncSession(engine)
+    await buffer.flush()
+    assert await last_login(engine, user_id) == later
+
+
+@pytest.fixture
+def failing_sessions(engine):
+    """A session factory whose writes fail, counting the attempts, until ``healthy`` is set"""
+    attempts, healthy = [], asyncio.Event()
+
+    class FailingSession(AsyncSession):
+        async def execute(self, *args, **kwargs):
+            if not healthy.is_set():
+                attempts.append(asyncio.get_running_loop().time())
+                raise OperationalError("UPDATE users", {}, Exception("database is locked"))
+            return await super().execute(*args, **kwargs)
+
+    return (lambda: FailingSession(engine)), attempts, healthy
+
+
+async def test_failing_flushes_back_off(engine, user_id, failing_sessions):
+    factory, attempts, healthy = failing_sessions
+    # One pending row already reaches max_entries, so every restore re-arms the wake
+    buffer = WriteBehindBuffer(factory, interval=0.4, max_entries=1)
+    buffer.start()
+    buffer.set(User.last_login, user_id, LOGIN)
+    await asyncio.sleep(1.0)
+
+    # 0.1 + 0.2 + 0.4 + 0.4 ... seconds apart, rather than back to back
+    assert 3 <= len(attempts) <= 6
+    gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+    assert all(gap >= 0.09 for gap in gaps)
+    assert max(gaps) <= 0.5
+    assert len(buffer) == 1 and buffer.failures == len(attempts)
+
+    healthy.set()
+    await asyncio.sleep(0.5)
+    assert buffer.failures == 0 and len(buffer) == 0
+    assert await last_login(engine, user_id) == LOGIN
+    await buffer.stop()
+
+
+async def test_stop_interrupts_a_backoff(user_id, failing_sessions):
+    factory, attempts, _ = failing_sessions
+    buffer = WriteBehindBuffer(factory, interval=30, max_entries=1)
+    buffer.start()
+    buffer.set(User.last_login, user_id, LOGIN)
+    while len(attempts) < 3:
+        await asyncio.sleep(0.05)
+
+    await asyncio.wait_for(buffer.stop(), 1)
+    # The final flush failed too, and kept the row
+    assert len(buffer) == 1